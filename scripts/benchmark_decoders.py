@@ -0,0 +1,102 @@
+"""Time the table-driven thermostat decoder against the if/elif chain it replaced.
+
+Usage: python scripts/benchmark_decoders.py [iterations]
+"""
+
+import sys
+import timeit
+
+from wyzeapy.services.thermostat_service import (
+    FanMode,
+    HVACMode,
+    HVACState,
+    Preset,
+    TemperatureUnit,
+    Thermostat,
+    decode_thermostat,
+)
+from wyzeapy.types import ThermostatProps
+
+# A typical get_iot_prop response: every ThermostatProps key plus a few unknown ones
+PROPS = {
+    "app_version": "1.2.3",
+    "iot_state": "connected",
+    "setup_state": "1",
+    "current_scenario": "home",
+    "protect_time": "0",
+    "cool_sp": "74",
+    "emheat": "0",
+    "time2temp_val": "0",
+    "save_comfort_balance": "1",
+    "query_schedule": "0",
+    "working_state": "idle",
+    "wiring_logic_id": "1",
+    "w_city_id": "123",
+    "fan_mode": "auto",
+    "temperature": "71.5",
+    "humidity": "45",
+    "kid_lock": "0",
+    "calibrate_humidity": "0",
+    "heat_sp": "64",
+    "calibrate_temperature": "0",
+    "mode_sys": "auto",
+    "w_lat": "0",
+    "config_scenario": "0",
+    "fancirc_time": "0",
+    "w_lon": "0",
+    "dev_hold": "0",
+    "temp_unit": "F",
+    "asw_hold": "0",
+    "threshold_temper": "1",
+    "sensor_state": "ok",
+    "battery": "100",
+}
+
+
+def decode_chain(thermostat, properties):
+    device_props = []
+    for property in properties:
+        try:
+            device_props.append((ThermostatProps(property), properties[property]))
+        except ValueError:
+            pass
+    for prop, value in device_props:
+        if prop == ThermostatProps.TEMP_UNIT:
+            thermostat.temp_unit = TemperatureUnit(value)
+        elif prop == ThermostatProps.COOL_SP:
+            thermostat.cool_set_point = int(value)
+        elif prop == ThermostatProps.HEAT_SP:
+            thermostat.heat_set_point = int(value)
+        elif prop == ThermostatProps.FAN_MODE:
+            thermostat.fan_mode = FanMode(value)
+        elif prop == ThermostatProps.MODE_SYS:
+            thermostat.hvac_mode = HVACMode(value)
+        elif prop == ThermostatProps.CURRENT_SCENARIO:
+            thermostat.preset = Preset(value)
+        elif prop == ThermostatProps.TEMPERATURE:
+            thermostat.temperature = float(value)
+        elif prop == ThermostatProps.IOT_STATE:
+            thermostat.available = value == "connected"
+        elif prop == ThermostatProps.HUMIDITY:
+            thermostat.humidity = int(value)
+        elif prop == ThermostatProps.WORKING_STATE:
+            thermostat.hvac_state = HVACState(value)
+    return thermostat
+
+
+def main():
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    thermostat = Thermostat({"mac": "T1", "product_type": "Thermostat"})
+
+    chain = timeit.timeit(lambda: decode_chain(thermostat, PROPS), number=iterations)
+    table = timeit.timeit(
+        lambda: decode_thermostat(thermostat, PROPS.items()), number=iterations
+    )
+
+    print(f"if/elif chain: {chain / iterations * 1e6:8.2f} us per response")
+    print(f"decoder table: {table / iterations * 1e6:8.2f} us per response")
+    print(f"speedup:       {chain / table:8.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+"""Compare per-object memory of devices and events against their old __dict__ layout.
+
+Usage: python scripts/benchmark_memory.py [count]
+"""
+
+import sys
+import tracemalloc
+
+from wyzeapy.services.camera_service import Camera
+from wyzeapy.types import Device, Event
+
+
+class DictDevice:
+    """The previous layout: every key copied onto __dict__, plus raw_dict."""
+
+    def __init__(self, dictionary):
+        self.available = False
+        self.raw_dict = dictionary
+        for k, v in dictionary.items():
+            setattr(self, k, v)
+
+
+class DictCamera(DictDevice):
+    def __init__(self, dictionary):
+        super().__init__(dictionary)
+        self.last_event = None
+        self.last_event_ts = 1700000000000
+        self.on = True
+        self.siren = False
+        self.floodlight = False
+        self.garage = False
+
+
+class DictEvent:
+    def __init__(self, dictionary):
+        for k, v in dictionary.items():
+            setattr(self, k, v)
+
+
+def device_entry(i):
+    return {
+        "mac": f"MAC{i:08d}",
+        "product_type": "Camera",
+        "product_model": "WYZE_CAKP2JFUS",
+        "nickname": f"Camera {i}",
+        "device_params": {"ip": "192.168.1.2", "power_switch": 1},
+        "hardware_ver": "0.0.0.0",
+        "firmware_ver": "4.36.11.5859",
+        "conn_state": 1,
+        "conn_state_ts": 1700000000000,
+        "push_switch": 1,
+        "is_in_auto": 0,
+        "event_master_switch": 1,
+        "parent_device_mac": "",
+        "enr": "",
+        "timezone_name": "America/New_York",
+        "binding_ts": 1600000000000,
+        "user_role": 1,
+        "device_type": "Camera",
+    }
+
+
+def event_entry(i):
+    return {
+        "event_id": f"event-{i}",
+        "device_mac": f"MAC{i % 50:08d}",
+        "device_model": "WYZE_CAKP2JFUS",
+        "event_category": 1,
+        "event_value": "13",
+        "event_ts": 1700000000000 + i,
+        "event_ack_result": 0,
+        "is_feedback_correct": 0,
+        "is_feedback_face": 0,
+        "is_feedback_person": 0,
+        "file_list": [],
+        "event_params": {},
+        "recognized_instance_list": [],
+        "tag_list": [],
+        "read_state": 0,
+    }
+
+
+def measure(cls, entries):
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    objects = [cls(entry) for entry in entries]
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    allocated = sum(stat.size_diff for stat in after.compare_to(before, "filename"))
+    # The list holding the objects is not part of their size
+    allocated -= sys.getsizeof(objects)
+    return allocated / len(objects)
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    devices = [device_entry(i) for i in range(count)]
+    events = [event_entry(i) for i in range(count)]
+
+    for name, old, new, entries in (
+        ("Device", DictDevice, Device, devices),
+        ("Camera", DictCamera, Camera, devices),
+        ("Event", DictEvent, Event, events),
+    ):
+        old_size = measure(old, entries)
+        new_size = measure(new, entries)
+        print(
+            f"{name:6}: {old_size:7.0f} -> {new_size:7.0f} bytes per object "
+            f"({1 - new_size / old_size:.0%} smaller)"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -3,7 +3,9 @@
 #  of the attached license. You should have received a copy of
 #  the license with this file. If not, please write to:
 #  katie@mulliken.net to receive a copy
+import asyncio
 import logging
+import time
 from inspect import iscoroutinefunction
 from typing import List, Optional, Set, Callable
 
@@ -19,6 +21,7 @@ from .services.switch_service import SwitchService, SwitchUsageService
 from .services.thermostat_service import ThermostatService
 from .services.irrigation_service import IrrigationService
 from .services.wall_switch_service import WallSwitchService
+from .snapshot import MIN_TOKEN_LIFE, Snapshot, SnapshotStore, token_fingerprint
 from .wyze_auth_lib import WyzeAuthLib, Token
 
 _LOGGER = logging.getLogger(__name__)
@@ -42,9 +45,9 @@ class Wyzeapy:
     """
 
     # _client: Client
-    _auth_lib: WyzeAuthLib
+    _auth_lib: Optional[WyzeAuthLib] = None
 
-    def __init__(self):
+    def __init__(self, snapshot_path: Optional[str] = None):
         self._bulb_service = None
         self._switch_service = None
         self._camera_service = None
@@ -62,21 +65,67 @@ class Wyzeapy:
         self._api_key = None
         self._service: Optional[BaseService] = None
         self._token_callbacks: List[Callable] = []
+        self._snapshot_store = SnapshotStore(snapshot_path) if snapshot_path else None
+        self._snapshot: Optional[Snapshot] = None
 
     @classmethod
-    async def create(cls):
+    async def create(cls, snapshot_path: Optional[str] = None):
         """
         Creates and initializes the Wyzeapy class asynchronously.
 
-        This factory method provides a way to instantiate the class using async/await syntax,
-        though it's currently a simple implementation that may be expanded in the future.
+        This factory method provides a way to instantiate the class using async/await
+        syntax, though it's currently a simple implementation that may be expanded in
+        the future.
+
+        The client owns a pooled HTTP session once logged in. Use it as an async
+        context manager, or call `close()` when done, to release the connections.
+
+        **Args:**
+        * `snapshot_path` (Optional[str], optional): File used to warm-start the client.
+          When set, `close()` and `save_snapshot()` save discovery, device state, the
+          HMS id and the token refresh time there, and the next `login()` serves them
+          immediately while revalidating in the background. Defaults to None.
 
         **Returns:**
             `Wyzeapy`: A new instance of the Wyzeapy class ready for authentication.
+
+        **Example:**
+        ```python
+        async with await Wyzeapy.create() as wyze:
+            await wyze.login(email, password, key_id, api_key)
+        ```
         """
-        self = cls()
+        self = cls(snapshot_path)
+        return self
+
+    async def close(self):
+        """Closes the pooled HTTP sessions used for the Wyze API and local bulbs.
+
+        **Example:**
+        ```python
+        wyze = await Wyzeapy.create()
+        ...
+        await wyze.close()
+        ```
+        """
+        if self._snapshot_store is not None:
+            try:
+                await self.save_snapshot()
+            except OSError as e:
+                _LOGGER.warning(f"Could not save snapshot: {e}")
+        if self._bulb_service is not None:
+            await self._bulb_service.close()
+        if self._hms_service is not None:
+            await self._hms_service.close()
+        if self._auth_lib is not None:
+            await self._auth_lib.close()
+
+    async def __aenter__(self):
         return self
 
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
     async def login(
         self, email, password, key_id, api_key, token: Optional[Token] = None
     ):
@@ -84,18 +133,21 @@ class Wyzeapy:
         Authenticates with the Wyze API and retrieves the user's access token.
 
         This method handles the authentication process, including token management
-        and service initialization. If two-factor authentication is enabled on the account,
-        it will raise an exception requiring the use of `login_with_2fa()` instead.
+        and service initialization. If two-factor authentication is enabled on the
+        account, it will raise an exception requiring the use of `login_with_2fa()`
+        instead.
 
         **Args:**
         * `email` (str): User's email address for Wyze account
         * `password` (str): User's password for Wyze account
         * `key_id` (str): Key ID for third-party API access
         * `api_key` (str): API Key for third-party API access
-        * `token` (Optional[Token], optional): Existing token from a previous session. Defaults to None.
+        * `token` (Optional[Token], optional): Existing token from a previous session.
+          Defaults to None.
 
         **Raises:**
-        * `TwoFactorAuthenticationEnabled`: When the account has 2FA enabled and requires verification
+        * `TwoFactorAuthenticationEnabled`: When the account has 2FA enabled and
+          requires verification
         """
 
         self._email = email
@@ -103,21 +155,86 @@ class Wyzeapy:
         self._key_id = key_id
         self._api_key = api_key
 
+        if self._snapshot_store is not None:
+            self._snapshot = self._snapshot_store.load()
+        refresh_time = None
+        if token and self._snapshot is not None:
+            refresh_time = self._snapshot.refresh_time_for(token)
+            if refresh_time is not None:
+                token = Token(token.access_token, token.refresh_token, refresh_time)
+
         try:
             self._auth_lib = await WyzeAuthLib.create(
                 email, password, key_id, api_key, token, self.execute_token_callbacks
             )
             if token:
-                # User token supplied, refresh on startup
-                await self._auth_lib.refresh()
+                if (
+                    refresh_time is not None
+                    and refresh_time - time.time() > MIN_TOKEN_LIFE
+                ):
+                    _LOGGER.debug(
+                        "Saved token is still fresh, skipping startup refresh"
+                    )
+                else:
+                    # User token supplied, refresh on startup
+                    await self._auth_lib.refresh()
             else:
                 await self._auth_lib.get_token_with_username_password(
                     email, password, key_id, api_key
                 )
+            self._auth_lib.start_token_refresher()
             self._service = BaseService(self._auth_lib)
+            self._warm_start()
         except TwoFactorAuthenticationEnabled as error:
             raise error
 
+    def _warm_start(self):
+        if self._snapshot is not None:
+            self._service.warm_start(
+                self._snapshot.devices, self._snapshot.states, self._snapshot.saved_at
+            )
+
+    async def save_snapshot(self):
+        """Saves discovery, device state, the HMS id and the token refresh time.
+
+        Does nothing unless the client was created with a `snapshot_path` and
+        has logged in. The file is replaced atomically and is readable only by
+        its owner; no credentials are written to it.
+
+        **Example:**
+        ```python
+        wyze = await Wyzeapy.create(snapshot_path="/var/lib/wyze/snapshot.json")
+        await wyze.login(email, password, key_id, api_key, token)
+        ...
+        await wyze.save_snapshot()
+        ```
+        """
+        if self._snapshot_store is None or self._service is None:
+            return
+        devices, states = self._service.device_snapshot()
+        if not devices:
+            return
+        if self._hms_service is not None:
+            hms_id = self._hms_service.hms_id
+        elif self._snapshot is not None:
+            # The HMS service was never used, so the saved id was not revalidated
+            hms_id = self._snapshot.hms_id
+        else:
+            hms_id = None
+        token = self._auth_lib.token
+        snapshot = Snapshot(
+            devices,
+            states,
+            hms_id=hms_id,
+            token_fingerprint=(
+                token_fingerprint(token) if token and token.access_token else None
+            ),
+            token_refresh_time=token.refresh_time if token else None,
+        )
+        await asyncio.get_running_loop().run_in_executor(
+            None, self._snapshot_store.save, snapshot
+        )
+
     async def login_with_2fa(self, verification_code) -> Token:
         """
         Completes the login process for accounts with two-factor authentication enabled.
@@ -136,7 +253,9 @@ class Wyzeapy:
         _LOGGER.debug(f"Verification Code: {verification_code}")
 
         await self._auth_lib.get_token_with_2fa(verification_code)
+        self._auth_lib.start_token_refresher()
         self._service = BaseService(self._auth_lib)
+        self._warm_start()
         return self._auth_lib.token
 
     async def execute_token_callbacks(self, token: Token):
@@ -157,7 +276,8 @@ class Wyzeapy:
 
     def register_for_token_callback(self, callback_function):
         """
-        Registers a callback function to be called whenever the user's token is modified.
+        Registers a callback function to be called whenever the user's token is
+        modified.
 
         This allows external components to be notified of token changes for persistence
         or other token-dependent operations.
@@ -183,7 +303,8 @@ class Wyzeapy:
         This stops the specified callback from receiving token updates.
 
         **Args:**
-        * `callback_function`: The callback function to remove from the notification list
+        * `callback_function`: The callback function to remove from the notification
+          list
         """
         self._token_callbacks.remove(callback_function)
 
@@ -206,11 +327,7 @@ class Wyzeapy:
         """
 
         devices = await self._service.get_object_list()
-        device_ids = set()
-        for device in devices:
-            device_ids.add(device.mac)
-
-        return device_ids
+        return self._service._registry_for(devices).macs
 
     @property
     async def notifications_are_on(self) -> bool:
@@ -262,11 +379,12 @@ class Wyzeapy:
         cls, email: str, password: str, key_id: str, api_key: str
     ) -> bool:
         """
-        Validates if the provided credentials can successfully authenticate with the Wyze API.
+        Validates if the provided credentials can successfully authenticate with the
+        Wyze API.
 
-        This method attempts to log in with the provided credentials and returns whether
-        the authentication was successful. It's useful for validating credentials without
-        needing to handle the full login process.
+        This method attempts to log in with the provided credentials and returns
+        whether the authentication was successful. It's useful for validating
+        credentials without needing to handle the full login process.
 
         **Args:**
         * `email` (str): The user's email address
@@ -279,7 +397,9 @@ class Wyzeapy:
 
         **Example:**
         ```python
-        is_valid = await Wyzeapy.valid_login("user@example.com", "password123", "key_id", "api_key")
+        is_valid = await Wyzeapy.valid_login(
+            "user@example.com", "password123", "key_id", "api_key"
+        )
         if is_valid:
             print("Credentials are valid")
         else:
@@ -288,9 +408,12 @@ class Wyzeapy:
         """
 
         self = cls()
-        await self.login(email, password, key_id, api_key)
-
-        return not self._auth_lib.should_refresh
+        try:
+            await self.login(email, password, key_id, api_key)
+            return not self._auth_lib.should_refresh
+        finally:
+            # Stop the token refresher and close the session login opened
+            await self.close()
 
     @property
     async def bulb_service(self) -> BulbService:
@@ -322,7 +445,8 @@ class Wyzeapy:
         for controlling and monitoring Wyze plugs and switches.
 
         **Returns:**
-        * `SwitchService`: An instance of the switch service for interacting with Wyze switches
+        * `SwitchService`: An instance of the switch service for interacting with Wyze
+          switches
 
         **Example:**
         ```python
@@ -344,7 +468,8 @@ class Wyzeapy:
         for controlling and monitoring Wyze cameras.
 
         **Returns:**
-        * `CameraService`: An instance of the camera service for interacting with Wyze cameras
+        * `CameraService`: An instance of the camera service for interacting with Wyze
+          cameras
 
         **Example:**
         ```python
@@ -366,7 +491,8 @@ class Wyzeapy:
         for controlling and monitoring Wyze thermostats.
 
         **Returns:**
-        * `ThermostatService`: An instance of the thermostat service for interacting with Wyze thermostats
+        * `ThermostatService`: An instance of the thermostat service for interacting
+          with Wyze thermostats
 
         **Example:**
         ```python
@@ -388,7 +514,8 @@ class Wyzeapy:
         for controlling and monitoring the Wyze home security system.
 
         **Returns:**
-        * `HMSService`: An instance of the HMS service for interacting with Wyze home monitoring
+        * `HMSService`: An instance of the HMS service for interacting with Wyze home
+          monitoring
 
         **Example:**
         ```python
@@ -399,7 +526,8 @@ class Wyzeapy:
         """
 
         if self._hms_service is None:
-            self._hms_service = await HMSService.create(self._auth_lib)
+            hms_id = self._snapshot.hms_id if self._snapshot is not None else None
+            self._hms_service = await HMSService.create(self._auth_lib, hms_id)
         return self._hms_service
 
     @property
@@ -432,7 +560,8 @@ class Wyzeapy:
         for monitoring Wyze sensors such as contact sensors, motion sensors, etc.
 
         **Returns:**
-        * `SensorService`: An instance of the sensor service for interacting with Wyze sensors
+        * `SensorService`: An instance of the sensor service for interacting with Wyze
+          sensors
 
         **Example:**
         ```python
@@ -470,7 +599,8 @@ class Wyzeapy:
         for controlling and monitoring Wyze wall switches.
 
         **Returns:**
-        * `WallSwitchService`: An instance of the wall switch service for interacting with Wyze wall switches
+        * `WallSwitchService`: An instance of the wall switch service for interacting
+          with Wyze wall switches
 
         **Example:**
         ```python
@@ -492,7 +622,8 @@ class Wyzeapy:
         for retrieving usage statistics from Wyze switches and plugs.
 
         **Returns:**
-        * `SwitchUsageService`: An instance of the switch usage service for accessing Wyze switch usage data
+        * `SwitchUsageService`: An instance of the switch usage service for accessing
+          Wyze switch usage data
 
         **Example:**
         ```python
@@ -0,0 +1,154 @@
+#  Copyright (c) 2021. Mulliken, LLC - All Rights Reserved
+#  You may use, distribute and modify this code under the terms
+#  of the attached license. You should have received a copy of
+#  the license with this file. If not, please write to:
+#  katie@mulliken.net to receive a copy
+import contextlib
+import contextvars
+import logging
+import time
+from enum import Enum
+from typing import Dict, Iterator, Optional, Set
+from urllib.parse import urlsplit
+
+from .exceptions import CircuitOpenError
+
+_LOGGER = logging.getLogger(__name__)
+"""
+Per-host circuit breakers for the Wyze cloud backends.
+
+After `failure_threshold` consecutive failures a host's circuit opens and
+requests to it fail immediately with `CircuitOpenError`. Once `cooldown` has
+passed a single request is let through as a probe; its outcome closes the
+circuit again or restarts the cooldown.
+"""
+
+FAILURE_THRESHOLD = 5
+COOLDOWN = 30.0
+
+_hosts_used: contextvars.ContextVar[Optional[Set[str]]] = contextvars.ContextVar(
+    "wyzeapy_hosts_used", default=None
+)
+
+
+@contextlib.contextmanager
+def track_hosts() -> Iterator[Set[str]]:
+    """Collect the hosts contacted by requests made inside the block."""
+    hosts: Set[str] = set()
+    token = _hosts_used.set(hosts)
+    try:
+        yield hosts
+    finally:
+        _hosts_used.reset(token)
+
+
+class CircuitState(Enum):
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    """Failure tracking for a single host."""
+
+    def __init__(
+        self,
+        host: str,
+        failure_threshold: int = FAILURE_THRESHOLD,
+        cooldown: float = COOLDOWN,
+    ):
+        self.host = host
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.failures = 0
+        self.opened = 0
+        self._opened_at: Optional[float] = None
+        self._probing = False
+
+    @property
+    def state(self) -> CircuitState:
+        if self._opened_at is None:
+            return CircuitState.CLOSED
+        if time.monotonic() - self._opened_at < self.cooldown:
+            return CircuitState.OPEN
+        return CircuitState.HALF_OPEN
+
+    def retry_in(self) -> float:
+        """Seconds until the next probe may be sent."""
+        if self._opened_at is None:
+            return 0.0
+        return max(0.0, self._opened_at + self.cooldown - time.monotonic())
+
+    def before_request(self) -> None:
+        """Let a request through or raise `CircuitOpenError`."""
+        state = self.state
+        if state is CircuitState.OPEN or (
+            state is CircuitState.HALF_OPEN and self._probing
+        ):
+            raise CircuitOpenError(self.host, self.retry_in())
+        if state is CircuitState.HALF_OPEN:
+            self._probing = True
+
+    def record_success(self) -> None:
+        if self._opened_at is not None:
+            _LOGGER.info("%s is answering again, closing its circuit", self.host)
+        self.failures = 0
+        self._opened_at = None
+        self._probing = False
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        if self._probing or (
+            self._opened_at is None and self.failures >= self.failure_threshold
+        ):
+            _LOGGER.warning(
+                "%s failed %s times, failing fast for %.0fs",
+                self.host,
+                self.failures,
+                self.cooldown,
+            )
+            self.opened += 1
+            self._opened_at = time.monotonic()
+        self._probing = False
+
+    def release_probe(self) -> None:
+        """Give up a probe that ended without an outcome, e.g. when cancelled."""
+        self._probing = False
+
+
+class CircuitBreakers:
+    """One `CircuitBreaker` per host, created on first use."""
+
+    def __init__(
+        self, failure_threshold: int = FAILURE_THRESHOLD, cooldown: float = COOLDOWN
+    ):
+        """
+        :param failure_threshold: Consecutive failures that open a host's circuit.
+        :param cooldown: Seconds an open circuit fails fast before probing.
+        """
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self._breakers: Dict[str, CircuitBreaker] = {}
+
+    def for_host(self, host: str) -> CircuitBreaker:
+        breaker = self._breakers.get(host)
+        if breaker is None:
+            breaker = CircuitBreaker(host, self.failure_threshold, self.cooldown)
+            self._breakers[host] = breaker
+        return breaker
+
+    def for_url(self, url: str) -> CircuitBreaker:
+        """The breaker for the URL's host, recording it for `track_hosts`."""
+        host = urlsplit(url).hostname or ""
+        hosts = _hosts_used.get()
+        if hosts is not None:
+            hosts.add(host)
+        return self.for_host(host)
+
+    def is_open(self, host: str) -> bool:
+        """Whether requests to `host` are currently failing fast."""
+        breaker = self._breakers.get(host)
+        return breaker is not None and breaker.state is CircuitState.OPEN
+
+    def states(self) -> Dict[str, CircuitState]:
+        return {host: breaker.state for host, breaker in self._breakers.items()}
@@ -0,0 +1,78 @@
+#  Copyright (c) 2021. Mulliken, LLC - All Rights Reserved
+#  You may use, distribute and modify this code under the terms
+#  of the attached license. You should have received a copy of
+#  the license with this file. If not, please write to:
+#  katie@mulliken.net to receive a copy
+"""
+Pluggable JSON codec used to encode request bodies and decode API responses.
+
+`orjson` is used when it is installed; otherwise the standard library `json`
+module is used. A different codec can be installed with `set_codec`.
+"""
+
+import json
+from typing import Any, Callable, Optional, Union
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - exercised only without orjson installed
+    orjson = None
+
+
+class JsonCodec:
+    """A named pair of compact JSON encode/decode functions.
+
+    Attributes:
+        name: Human readable codec name, used for logging.
+        dumps: Serializes an object to a compact JSON string (no whitespace).
+        loads: Parses JSON from `bytes` or `str`.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        dumps: Callable[[Any], str],
+        loads: Callable[[Union[bytes, str]], Any],
+    ):
+        self.name = name
+        self.dumps = dumps
+        self.loads = loads
+
+    def __repr__(self) -> str:
+        return "<JsonCodec: {}>".format(self.name)
+
+
+def _stdlib_dumps(obj: Any) -> str:
+    return json.dumps(obj, separators=(",", ":"))
+
+
+STDLIB_CODEC = JsonCodec("json", _stdlib_dumps, json.loads)
+
+ORJSON_CODEC: Optional[JsonCodec] = None
+if orjson is not None:
+    ORJSON_CODEC = JsonCodec(
+        "orjson", lambda obj: orjson.dumps(obj).decode("utf-8"), orjson.loads
+    )
+
+_codec: JsonCodec = ORJSON_CODEC or STDLIB_CODEC
+
+
+def get_codec() -> JsonCodec:
+    """Return the codec currently used by the library."""
+    return _codec
+
+
+def set_codec(codec: JsonCodec) -> None:
+    """Replace the codec used for request bodies and responses."""
+    global _codec
+    _codec = codec
+
+
+def dumps(obj: Any) -> str:
+    """Serialize `obj` to a compact JSON string with the active codec."""
+    return _codec.dumps(obj)
+
+
+def loads(data: Union[bytes, str]) -> Any:
+    """Parse JSON `data` with the active codec."""
+    return _codec.loads(data)
@@ -34,3 +34,12 @@ class UnknownApiError(Exception):
 
 class TwoFactorAuthenticationEnabled(Exception):
     """Raised when two-factor authentication is required for login."""
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of sending a request to a backend that keeps failing."""
+
+    def __init__(self, host: str, retry_in: float):
+        self.host = host
+        self.retry_in = retry_in
+        super().__init__(f"Circuit open for {host}, retrying in {retry_in:.0f}s")
@@ -0,0 +1,52 @@
+#  Copyright (c) 2021. Mulliken, LLC - All Rights Reserved
+#  You may use, distribute and modify this code under the terms
+#  of the attached license. You should have received a copy of
+#  the license with this file. If not, please write to:
+#  katie@mulliken.net to receive a copy
+import contextlib
+import contextvars
+from enum import IntEnum
+from typing import Iterator
+
+"""
+Request priority classes used to order requests waiting for the rate limiter.
+
+The priority is carried in a context variable, so it follows a call through
+every await and into tasks created while it is set.
+"""
+
+
+class RequestPriority(IntEnum):
+    """Dispatch order for queued requests; lower values go first."""
+
+    INTERACTIVE = 0
+    """Commands issued by a user, such as unlocking a door."""
+    READ = 1
+    """On-demand reads, the default for requests without a priority."""
+    BACKGROUND = 2
+    """Routine polling from the update loop and subscriptions."""
+
+
+_priority: contextvars.ContextVar[RequestPriority] = contextvars.ContextVar(
+    "wyzeapy_request_priority", default=RequestPriority.READ
+)
+
+
+def current_priority() -> RequestPriority:
+    """The priority of requests made from the current context."""
+    return _priority.get()
+
+
+@contextlib.contextmanager
+def request_priority(priority: RequestPriority) -> Iterator[None]:
+    """Send requests made inside the block with `priority`.
+
+    Example:
+        with request_priority(RequestPriority.BACKGROUND):
+            await service.update(device)
+    """
+    token = _priority.set(priority)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
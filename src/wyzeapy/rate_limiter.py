@@ -0,0 +1,293 @@
+#  Copyright (c) 2021. Mulliken, LLC - All Rights Reserved
+#  You may use, distribute and modify this code under the terms
+#  of the attached license. You should have received a copy of
+#  the license with this file. If not, please write to:
+#  katie@mulliken.net to receive a copy
+import asyncio
+import logging
+import time
+from typing import Any, Dict, List, Mapping, NamedTuple, Optional
+from urllib.parse import urlsplit
+
+from .priority import RequestPriority, current_priority
+
+_LOGGER = logging.getLogger(__name__)
+"""
+Token-bucket limits for every request sent to the Wyze cloud.
+
+All requests made by `WyzeAuthLib` take a token from their host's bucket, for
+hosts with their own limit, and then from the global bucket. Requests waiting for
+a token are served by `RequestPriority`. Responses that show the account is
+being throttled pause the buckets with an exponential backoff.
+"""
+
+
+class RateLimit(NamedTuple):
+    """Sustained `rate` in requests per second, with bursts of up to `burst`."""
+
+    rate: float
+    burst: int
+
+
+# Wyze allows roughly 300 requests per 5 minutes per account on the main API,
+# which its own bucket enforces; the other backends get their own quotas
+DEFAULT_HOST_LIMITS: Dict[str, RateLimit] = {
+    "api.wyzecam.com": RateLimit(rate=1.0, burst=20),
+    "wyze-earth-service.wyzecam.com": RateLimit(rate=0.5, burst=10),
+    "devicemgmt-service-beta.wyze.com": RateLimit(rate=0.5, burst=10),
+    "yd-saas-toc.wyzecam.com": RateLimit(rate=0.5, burst=10),
+    "hms.api.wyze.com": RateLimit(rate=0.2, burst=5),
+}
+# The global bucket is a backstop on total traffic, not a quota of its own: it
+# allows every host its full limit at once, so one busy host never rations the
+# others, and only caps requests to hosts without a limit of their own
+DEFAULT_GLOBAL_LIMIT = RateLimit(
+    rate=sum(limit.rate for limit in DEFAULT_HOST_LIMITS.values()),
+    burst=sum(limit.burst for limit in DEFAULT_HOST_LIMITS.values()),
+)
+
+BACKOFF_BASE = 1.0
+BACKOFF_MAX = 60.0
+PRIORITY_AGING = 10.0
+
+
+class _Waiter:
+    def __init__(self, priority: RequestPriority, enqueued: float):
+        self.priority = priority
+        self.enqueued = enqueued
+        self.future = asyncio.get_running_loop().create_future()
+
+    def rank(self, now: float) -> float:
+        # Every PRIORITY_AGING seconds spent waiting promotes a request one class
+        return self.priority - (now - self.enqueued) / PRIORITY_AGING
+
+
+class TokenBucket:
+    """Async token bucket that hands out tokens by request priority.
+
+    When tokens run out, waiting requests are served highest priority first,
+    so a queued command overtakes queued background polls. Waiting requests
+    age into higher classes over time, so background work is never starved.
+    """
+
+    def __init__(self, limit: RateLimit):
+        self.limit = limit
+        self._tokens = float(limit.burst)
+        self._updated = time.monotonic()
+        self._blocked_until = 0.0
+        self._waiters: List[_Waiter] = []
+        self._dispatcher: Optional[asyncio.Task] = None
+
+    def _refill(self, now: float):
+        elapsed = now - self._updated
+        self._updated = now
+        self._tokens = min(
+            float(self.limit.burst), self._tokens + elapsed * self.limit.rate
+        )
+
+    async def acquire(self, priority: RequestPriority = RequestPriority.READ) -> float:
+        """Take one token, waiting for it if needed.
+
+        :param priority: Order in which this request is served while waiting
+        :return: Seconds spent waiting
+        """
+        now = time.monotonic()
+        self._refill(now)
+        if not self._waiters and self._blocked_until <= now and self._tokens >= 1:
+            self._tokens -= 1
+            return 0.0
+
+        waiter = _Waiter(priority, now)
+        self._waiters.append(waiter)
+        if self._dispatcher is None or self._dispatcher.done():
+            self._dispatcher = asyncio.get_running_loop().create_task(self._dispatch())
+        try:
+            await waiter.future
+        except asyncio.CancelledError:
+            if waiter in self._waiters:
+                self._waiters.remove(waiter)
+            raise
+        return time.monotonic() - now
+
+    async def _dispatch(self):
+        while self._waiters:
+            now = time.monotonic()
+            self._refill(now)
+            wait = self._blocked_until - now
+            if wait <= 0:
+                if self._tokens >= 1:
+                    waiter = min(self._waiters, key=lambda w: (w.rank(now), w.enqueued))
+                    self._waiters.remove(waiter)
+                    # A cancelled waiter gives its place up without using a token
+                    if not waiter.future.done():
+                        self._tokens -= 1
+                        waiter.future.set_result(None)
+                    continue
+                wait = (1 - self._tokens) / self.limit.rate
+            await asyncio.sleep(wait)
+
+    def pause(self, seconds: float):
+        """Hand out no tokens for the next `seconds`."""
+        self._blocked_until = max(self._blocked_until, time.monotonic() + seconds)
+
+
+class QueueStats:
+    """Counts requests and how long they waited for the rate limiter.
+
+    Attributes:
+        requests: Requests that passed through the limiter.
+        delayed: Requests that had to wait for a token.
+        total_wait: Seconds spent waiting across all requests.
+        max_wait: Longest single wait in seconds.
+    """
+
+    def __init__(self):
+        self.requests = 0
+        self.delayed = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    @property
+    def average_wait(self) -> float:
+        """Mean seconds a request waited in the queue."""
+        if self.requests == 0:
+            return 0.0
+        return self.total_wait / self.requests
+
+    def record_wait(self, wait: float):
+        self.requests += 1
+        if wait > 0:
+            self.delayed += 1
+            self.total_wait += wait
+            self.max_wait = max(self.max_wait, wait)
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "requests": self.requests,
+            "delayed": self.delayed,
+            "total_wait": self.total_wait,
+            "average_wait": self.average_wait,
+            "max_wait": self.max_wait,
+        }
+
+
+class RateLimiterStats(QueueStats):
+    """Queue-wait counters overall and per priority class, plus throttling.
+
+    Attributes:
+        throttled: Responses that signalled throttling.
+        by_priority: `QueueStats` for each `RequestPriority`.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.throttled = 0
+        self.by_priority: Dict[RequestPriority, QueueStats] = {
+            priority: QueueStats() for priority in RequestPriority
+        }
+
+    def record_wait(
+        self, wait: float, priority: RequestPriority = RequestPriority.READ
+    ):
+        super().record_wait(wait)
+        self.by_priority[priority].record_wait(wait)
+
+    def as_dict(self) -> Dict[str, Any]:
+        stats = super().as_dict()
+        stats["throttled"] = self.throttled
+        stats["by_priority"] = {
+            priority.name.lower(): queue.as_dict()
+            for priority, queue in self.by_priority.items()
+        }
+        return stats
+
+    def __repr__(self) -> str:
+        return "<RateLimiterStats: {}>".format(self.as_dict())
+
+
+class RateLimiter:
+    """Global and per-host token buckets with backoff on throttling.
+
+    Attributes:
+        stats: Queue-wait and throttling counters.
+    """
+
+    def __init__(
+        self,
+        global_limit: Optional[RateLimit] = DEFAULT_GLOBAL_LIMIT,
+        host_limits: Optional[Mapping[str, RateLimit]] = None,
+    ):
+        """
+        :param global_limit: Limit shared by every request, or None for no global limit.
+        :param host_limits: Limits per hostname; defaults to `DEFAULT_HOST_LIMITS`.
+        """
+        if host_limits is None:
+            host_limits = DEFAULT_HOST_LIMITS
+        self._global = TokenBucket(global_limit) if global_limit else None
+        self._hosts = {host: TokenBucket(limit) for host, limit in host_limits.items()}
+        self._consecutive_throttles = 0
+        self.stats = RateLimiterStats()
+
+    async def acquire(
+        self, url: str, priority: Optional[RequestPriority] = None
+    ) -> float:
+        """Wait until a request to `url` is within every applicable limit.
+
+        :param url: The request URL; its hostname selects the host bucket
+        :param priority: Defaults to the priority of the current context
+        :return: Seconds spent waiting
+        """
+        if priority is None:
+            priority = current_priority()
+        wait = 0.0
+        # The host token comes first, so a request waiting on a slow host
+        # does not hold global capacity that requests to other hosts could use
+        bucket = self._hosts.get(urlsplit(url).hostname or "")
+        if bucket is not None:
+            wait += await bucket.acquire(priority)
+        if self._global is not None:
+            wait += await self._global.acquire(priority)
+        self.stats.record_wait(wait, priority)
+        return wait
+
+    def observe(self, url: str, status: int, headers: Mapping[str, str]) -> bool:
+        """Inspect a response and back off if it shows we are being throttled.
+
+        A `429` status or an exhausted `X-RateLimit-Remaining` header counts as
+        throttling. The pause honours `Retry-After` when the server sends one
+        and otherwise doubles with every consecutive throttled response.
+
+        :return: True if the response was throttled
+        """
+        remaining = _parse_number(headers.get("X-RateLimit-Remaining"))
+        if status != 429 and (remaining is None or remaining > 0):
+            self._consecutive_throttles = 0
+            return False
+
+        retry_after = _parse_number(headers.get("Retry-After"))
+        if retry_after is None:
+            retry_after = min(
+                BACKOFF_MAX, BACKOFF_BASE * 2**self._consecutive_throttles
+            )
+        self._consecutive_throttles += 1
+        self.stats.throttled += 1
+        _LOGGER.warning(
+            "Throttled by %s, pausing requests for %.1fs",
+            urlsplit(url).hostname,
+            retry_after,
+        )
+        if self._global is not None:
+            self._global.pause(retry_after)
+        bucket = self._hosts.get(urlsplit(url).hostname or "")
+        if bucket is not None:
+            bucket.pause(retry_after)
+        return True
+
+
+def _parse_number(value: Any) -> Optional[float]:
+    if not isinstance(value, (str, int, float)):
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        return None
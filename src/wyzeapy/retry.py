@@ -0,0 +1,183 @@
+#  Copyright (c) 2021. Mulliken, LLC - All Rights Reserved
+#  You may use, distribute and modify this code under the terms
+#  of the attached license. You should have received a copy of
+#  the license with this file. If not, please write to:
+#  katie@mulliken.net to receive a copy
+import asyncio
+import contextlib
+import contextvars
+import logging
+import random
+from typing import Any, Awaitable, Callable, Dict, Iterator, Optional, TypeVar
+
+from aiohttp import ClientConnectionError
+
+_LOGGER = logging.getLogger(__name__)
+"""
+Retry policy for requests that fail with transient network errors.
+
+Only requests that are safe to send twice are retried: HTTP methods that are
+idempotent by definition, and requests made inside `idempotent()`, which the
+read-only service wrappers use. Retries draw from a per-client budget that
+grows with the number of requests sent, so an outage cannot turn every call
+into several.
+"""
+
+IDEMPOTENT_METHODS = frozenset({"GET", "HEAD", "OPTIONS", "PUT", "DELETE"})
+
+T = TypeVar("T")
+
+_idempotent: contextvars.ContextVar[bool] = contextvars.ContextVar(
+    "wyzeapy_idempotent", default=False
+)
+
+
+def is_idempotent() -> bool:
+    """Whether requests made from the current context may be sent again."""
+    return _idempotent.get()
+
+
+@contextlib.contextmanager
+def idempotent(value: bool = True) -> Iterator[None]:
+    """Mark requests made inside the block as safe (or unsafe) to retry."""
+    token = _idempotent.set(value)
+    try:
+        yield
+    finally:
+        _idempotent.reset(token)
+
+
+def is_transient(error: BaseException) -> bool:
+    """Classify an error as a transient network failure worth retrying."""
+    return isinstance(error, (ClientConnectionError, asyncio.TimeoutError))
+
+
+class RetryPolicy:
+    """How often and how long to wait between attempts.
+
+    Waits use exponential backoff with full jitter: the n-th retry waits a
+    random time between 0 and `min(max_delay, base_delay * 2 ** n)`.
+    """
+
+    def __init__(
+        self, max_attempts: int = 3, base_delay: float = 0.5, max_delay: float = 8.0
+    ):
+        """
+        :param max_attempts: Total attempts per request, including the first.
+        :param base_delay: Upper bound of the first wait in seconds.
+        :param max_delay: Cap on the upper bound of any wait in seconds.
+        """
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+    def backoff(self, retry: int) -> float:
+        """Seconds to wait before retry number `retry`, counting from 0."""
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2**retry))
+
+
+class RetryBudget:
+    """Caps retries at a fraction of requests sent, plus a small reserve.
+
+    Every request adds `ratio` to the balance, up to `reserve`, and every retry
+    spends 1. When the balance runs out requests fail without retrying.
+    """
+
+    def __init__(self, ratio: float = 0.2, reserve: float = 10.0):
+        """
+        :param ratio: Retries earned per request sent.
+        :param reserve: Maximum (and initial) retry balance.
+        """
+        self.ratio = ratio
+        self.reserve = reserve
+        self._balance = reserve
+
+    @property
+    def balance(self) -> float:
+        return self._balance
+
+    def deposit(self):
+        self._balance = min(self.reserve, self._balance + self.ratio)
+
+    def withdraw(self) -> bool:
+        if self._balance < 1:
+            return False
+        self._balance -= 1
+        return True
+
+
+class RetryStats:
+    """Counts retries by cause.
+
+    Attributes:
+        requests: Requests sent through the retry engine.
+        network_retries: Retries after a transient network error.
+        token_replays: Calls replayed after refreshing an expired token.
+        budget_exhausted: Retries skipped because the budget was empty.
+        gave_up: Requests that still failed after their last attempt.
+    """
+
+    def __init__(self):
+        self.requests = 0
+        self.network_retries = 0
+        self.token_replays = 0
+        self.budget_exhausted = 0
+        self.gave_up = 0
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "requests": self.requests,
+            "network_retries": self.network_retries,
+            "token_replays": self.token_replays,
+            "budget_exhausted": self.budget_exhausted,
+            "gave_up": self.gave_up,
+        }
+
+    def __repr__(self) -> str:
+        return "<RetryStats: {}>".format(self.as_dict())
+
+
+class Retrier:
+    """Runs requests under a `RetryPolicy` and a shared `RetryBudget`.
+
+    Attributes:
+        policy: Attempts and backoff per request.
+        budget: Retry allowance shared by every request of a client.
+        stats: Retry counters.
+    """
+
+    def __init__(
+        self,
+        policy: Optional[RetryPolicy] = None,
+        budget: Optional[RetryBudget] = None,
+    ):
+        self.policy = policy or RetryPolicy()
+        self.budget = budget or RetryBudget()
+        self.stats = RetryStats()
+
+    async def run(self, call: Callable[[], Awaitable[T]], retryable: bool) -> T:
+        """Await `call()`, retrying transient failures if `retryable`.
+
+        :param call: Sends the request; called once per attempt
+        :param retryable: Whether the request is safe to send more than once
+        """
+        self.stats.requests += 1
+        self.budget.deposit()
+        retry = 0
+        while True:
+            try:
+                return await call()
+            except Exception as e:
+                if not retryable or not is_transient(e):
+                    raise
+                if retry + 1 >= self.policy.max_attempts:
+                    self.stats.gave_up += 1
+                    raise
+                if not self.budget.withdraw():
+                    self.stats.budget_exhausted += 1
+                    raise
+                delay = self.policy.backoff(retry)
+                retry += 1
+                self.stats.network_retries += 1
+                _LOGGER.debug(f"Retrying after {type(e).__name__} in {delay:.2f}s")
+                await asyncio.sleep(delay)
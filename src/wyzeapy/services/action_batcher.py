@@ -0,0 +1,141 @@
+#  Copyright (c) 2021. Mulliken, LLC - All Rights Reserved
+#  You may use, distribute and modify this code under the terms
+#  of the attached license. You should have received a copy of
+#  the license with this file. If not, please write to:
+#  katie@mulliken.net to receive a copy
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence, Set, Tuple
+
+from ..exceptions import ParameterError, UnknownApiError
+from ..types import Device
+
+_LOGGER = logging.getLogger(__name__)
+"""
+Collects run_action_list actions for many devices into shared requests.
+"""
+
+ACTION_LIST_BATCH_SIZE = 20
+
+Change = Tuple[Device, List[Dict[Any, Any]]]
+
+
+class ActionBatcher:
+    """Groups `set_mesh_property` actions submitted close together.
+
+    Actions submitted within `window` seconds of the first pending action are
+    sent as one `run_action_list` request. A batch is sent early once it holds
+    `max_actions` devices. A second action for a device that is still pending
+    is merged into the first one, with later values winning. If the API rejects
+    a batch, each device in it is retried on its own.
+
+    Attributes:
+        actions: Number of actions submitted.
+        requests: Number of `run_action_list` requests sent.
+    """
+
+    def __init__(
+        self,
+        send: Callable[[Sequence[Change]], Awaitable[None]],
+        window: float = 0.0,
+        max_actions: int = ACTION_LIST_BATCH_SIZE,
+    ):
+        """
+        :param send: Coroutine function that posts a list of (device, plist) pairs.
+        :param window: Seconds to wait for more actions before sending a batch.
+        :param max_actions: Maximum number of devices per request.
+        """
+        self._send = send
+        self.window = window
+        self.max_actions = max_actions
+        self._pending: Dict[str, Tuple[Change, asyncio.Future]] = {}
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+        self._tasks: Set[asyncio.Task] = set()
+        self.actions = 0
+        self.requests = 0
+
+    async def submit(self, device: Device, plist: List[Dict[Any, Any]]) -> None:
+        """Queue an action for `device` and wait until it has been sent.
+
+        :param device: The mesh bulb or light strip to change
+        :param plist: A list of properties [{"pid": pid, "pvalue": pvalue},...]
+        """
+        self.actions += 1
+        loop = asyncio.get_running_loop()
+        if device.mac in self._pending:
+            (_, pending_plist), future = self._pending[device.mac]
+            merge_plist(pending_plist, plist)
+        else:
+            future = loop.create_future()
+            self._pending[device.mac] = ((device, list(plist)), future)
+
+        if len(self._pending) >= self.max_actions:
+            self._flush()
+        elif self._flush_handle is None:
+            self._flush_handle = loop.call_later(self.window, self._flush)
+
+        await asyncio.shield(future)
+
+    def _flush(self):
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        batch, self._pending = self._pending, {}
+        task = asyncio.get_running_loop().create_task(self._send_batch(batch))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _send_batch(self, batch: Dict[str, Tuple[Change, asyncio.Future]]):
+        if not batch:
+            return
+        entries = list(batch.values())
+        try:
+            self.requests += 1
+            await self._send([change for change, _ in entries])
+        except (UnknownApiError, ParameterError) as e:
+            if len(entries) == 1:
+                _set_exception(entries[0][1], e)
+                return
+            _LOGGER.debug(
+                f"Batch of {len(entries)} actions rejected, retrying each: {e}"
+            )
+            for change, future in entries:
+                try:
+                    self.requests += 1
+                    await self._send([change])
+                except Exception as e:
+                    _set_exception(future, e)
+                else:
+                    _set_result(future)
+            return
+        except Exception as e:
+            for _, future in entries:
+                _set_exception(future, e)
+            return
+
+        for _, future in entries:
+            _set_result(future)
+
+
+def merge_plist(target: List[Dict[Any, Any]], plist: List[Dict[Any, Any]]):
+    """Merge `plist` into `target` in place.
+
+    Later values for a pid replace earlier ones; new pids are appended.
+    """
+    positions = {item["pid"]: index for index, item in enumerate(target)}
+    for item in plist:
+        if item["pid"] in positions:
+            target[positions[item["pid"]]] = item
+        else:
+            positions[item["pid"]] = len(target)
+            target.append(item)
+
+
+def _set_result(future: asyncio.Future):
+    if not future.done():
+        future.set_result(None)
+
+
+def _set_exception(future: asyncio.Future, exception: BaseException):
+    if not future.done():
+        future.set_exception(exception)
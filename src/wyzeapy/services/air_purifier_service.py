@@ -4,6 +4,7 @@ from enum import Enum
 from typing import Any, Dict, List
 
 from .base_service import BaseService
+from .decoders import Field, compile_decoder, is_connected, is_one
 from ..exceptions import UnknownApiError
 from ..types import AirPurifierProps, Device, DeviceTypes, PropertyIDs
 
@@ -23,6 +24,19 @@ class AirPurifierFanMode(Enum):
 
 
 class AirPurifier(Device):
+    __slots__ = (
+        "on",
+        "fan_mode",
+        "aqi",
+        "max_hourly_aqi",
+        "max_hourly_aqi_start_time",
+        "max_hourly_aqi_end_time",
+        "air_quality_updated_at",
+        "app_version",
+        "sn",
+        "wifi_mac",
+    )
+
     def __init__(self, dictionary: Dict[Any, Any]):
         super().__init__(dictionary)
 
@@ -38,40 +52,36 @@ class AirPurifier(Device):
         self.sn: str | None = None
         self.wifi_mac: str | None = None
 
+    def is_active(self) -> bool:
+        return self.on
+
+
+AIR_PURIFIER_PROPERTY_FIELDS = {
+    PropertyIDs.ON: Field("on", is_one),
+    PropertyIDs.AVAILABLE: Field("available", is_one),
+}
+AIR_PURIFIER_IOT_FIELDS = {
+    AirPurifierProps.IOT_STATE: Field("available", is_connected),
+    AirPurifierProps.FAN_MODE: Field("fan_mode"),
+    AirPurifierProps.APP_VERSION: Field("app_version"),
+    AirPurifierProps.SN: Field("sn"),
+    AirPurifierProps.WIFI_MAC: Field("wifi_mac"),
+}
+
+decode_air_purifier_properties = compile_decoder(AIR_PURIFIER_PROPERTY_FIELDS)
+decode_air_purifier_iot = compile_decoder(AIR_PURIFIER_IOT_FIELDS)
+
 
 class AirPurifierService(BaseService):
     async def update(self, air_purifier: AirPurifier) -> AirPurifier:
         """Update the air purifier with latest data from Wyze API."""
         device_info = await self._get_property_list(air_purifier)
-        for property_id, value in device_info:
-            if property_id == PropertyIDs.ON:
-                air_purifier.on = value == "1"
-            elif property_id == PropertyIDs.AVAILABLE:
-                air_purifier.available = value == "1"
+        decode_air_purifier_properties(air_purifier, device_info)
 
         properties = (await self._air_purifier_get_iot_prop(air_purifier))["data"][
             "props"
         ]
-
-        device_props = []
-        for prop_key, prop_value in properties.items():
-            try:
-                prop = AirPurifierProps(prop_key)
-                device_props.append((prop, prop_value))
-            except ValueError as err:
-                _LOGGER.debug(f"{err} with value {prop_value}")
-
-        for prop, value in device_props:
-            if prop == AirPurifierProps.IOT_STATE:
-                air_purifier.available = value == "connected"
-            elif prop == AirPurifierProps.FAN_MODE:
-                air_purifier.fan_mode = value
-            elif prop == AirPurifierProps.APP_VERSION:
-                air_purifier.app_version = value
-            elif prop == AirPurifierProps.SN:
-                air_purifier.sn = value
-            elif prop == AirPurifierProps.WIFI_MAC:
-                air_purifier.wifi_mac = value
+        decode_air_purifier_iot(air_purifier, properties.items())
 
         if self._should_update_air_quality(air_purifier):
             try:
@@ -109,17 +119,14 @@ class AirPurifierService(BaseService):
         )
 
     async def get_air_purifiers(self) -> List[AirPurifier]:
-        if self._devices is None:
-            self._devices = await self.get_object_list()
-
+        registry = await self._get_registry()
         air_purifiers = [
             device
-            for device in self._devices
+            for device in registry.by_model(*AIR_PURIFIER_MODELS)
             if device.type is DeviceTypes.COMMON
-            and device.product_model in AIR_PURIFIER_MODELS
         ]
 
-        return [AirPurifier(air_purifier.raw_dict) for air_purifier in air_purifiers]
+        return self._typed(AirPurifier, air_purifiers)
 
     async def turn_on(self, air_purifier: AirPurifier):
         await self._set_property(air_purifier, PropertyIDs.ON.value, "1")
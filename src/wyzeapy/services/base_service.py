@@ -4,14 +4,34 @@
 #  the license with this file. If not, please write to:
 #  katie@mulliken.net to receive a copy
 import asyncio
+import functools
 import json
 import logging
 import time
-from typing import List, Tuple, Any, Dict, Optional
+import weakref
+from typing import (
+    List,
+    Tuple,
+    Any,
+    Callable,
+    Dict,
+    Hashable,
+    Iterator,
+    Optional,
+    Sequence,
+)
 
 import aiohttp
 
+from .device_registry import DeviceRegistry, DiscoveryDiff
+from .identity_map import IdentityMap
+from .local_control import LocalControlClient
+from .read_cache import MISSING, ReadCache
+from .single_flight import SingleFlight
 from .update_manager import DeviceUpdater, UpdateManager
+from .write_queue import Sender, WriteQueue
+from .. import codec
+from ..circuit_breaker import CircuitBreakers
 from ..const import (
     PHONE_SYSTEM_TYPE,
     APP_VERSION,
@@ -27,6 +47,7 @@ from ..const import (
     WEB_APP_ID,
     WEB_APP_INFO,
 )
+from ..exceptions import AccessTokenError, ParameterError, UnknownApiError
 from ..crypto import olive_create_signature, web_create_signature
 from ..payload_factory import (
     olive_create_hms_patch_payload,
@@ -45,6 +66,8 @@ from ..payload_factory import (
     olive_create_post_payload_irrigation_quickrun,
     olive_create_get_payload_irrigation_schedule_runs,
 )
+from ..priority import RequestPriority, request_priority
+from ..retry import idempotent
 from ..types import PropertyIDs, Device, DeviceMgmtToggleType
 from ..utils import (
     check_for_errors_standard,
@@ -63,13 +86,141 @@ including authentication, device discovery, and automatic updates.
 
 _LOGGER = logging.getLogger(__name__)
 
+# Devices packed into one device_list/set_property_list request
+DEVICE_LIST_BATCH_SIZE = 20
+
+_PROPERTY_IDS = {prop.value: prop for prop in PropertyIDs}
+
+# Seconds to wait before retrying a failed background discovery refresh
+SNAPSHOT_RETRY_DELAY = 60.0
+
+# Seconds a discovery snapshot is reused by services in bulk state mode
+BULK_STATE_TTL = 5.0
+
+# Seconds a cached device state read stays fresh
+STATE_READ_TTL = 5.0
+LOCK_READ_TTL = 2.0
+
+
+def _request_key(value: Any) -> Hashable:
+    """Build a hashable identity for a request argument; devices key on MAC."""
+    if isinstance(value, Device):
+        return ("device", value.mac)
+    if isinstance(value, dict):
+        return tuple(sorted((key, _request_key(item)) for key, item in value.items()))
+    if isinstance(value, (list, tuple, set)):
+        return tuple(_request_key(item) for item in value)
+    return value
+
+
+def _devices_in(value: Any) -> Iterator[Device]:
+    """Yield the devices among request arguments, including (device, plist) pairs."""
+    if isinstance(value, Device):
+        yield value
+    elif isinstance(value, (list, tuple)):
+        for item in value:
+            yield from _devices_in(item)
+
+
+async def _replay_on_token_expiry(service: "BaseService", call):
+    """Await `call()`, refreshing the token and replaying once if it expired.
+
+    The API rejects requests with an expired token before acting on them, so
+    commands are as safe to replay as reads.
+    """
+    token = service._auth_lib.token
+    access_token = token.access_token if token is not None else None
+    try:
+        return await call()
+    except AccessTokenError:
+        if access_token is None:
+            raise
+        _LOGGER.debug("Access token rejected, refreshing and replaying the call")
+        await service._auth_lib.refresh_expired(access_token)
+        return await call()
+
+
+def _read_request(method=None, *, ttl: Optional[float] = None):
+    """Coalesce concurrent identical calls to a read-only API wrapper.
+
+    Calls are keyed per account on the wrapper (and therefore the endpoint),
+    the device and the remaining parameters. Requests made by the wrapper are
+    retried on transient network errors, and the call is replayed once after
+    a token refresh if the token has expired.
+
+    With `ttl`, results are also kept in the account's `ReadCache` for that
+    many seconds, until a command writes to the device.
+    """
+    if method is None:
+        return functools.partial(_read_request, ttl=ttl)
+
+    @functools.wraps(method)
+    async def wrapper(self, *args, **kwargs):
+        key = (
+            method.__qualname__,
+            id(self._auth_lib),
+            _request_key(args),
+            _request_key(kwargs),
+        )
+
+        async def call():
+            with idempotent():
+                return await method(self, *args, **kwargs)
+
+        if ttl is None:
+            return await BaseService._single_flight.do(
+                key, lambda: _replay_on_token_expiry(self, call)
+            )
+
+        cache = self.read_cache
+        result = cache.get(key)
+        if result is not MISSING:
+            return result
+        device = next(_devices_in(args), None)
+        mac = device.mac if device is not None else None
+        generation = cache.generation(mac)
+        result = await BaseService._single_flight.do(
+            key, lambda: _replay_on_token_expiry(self, call)
+        )
+        cache.put(key, result, ttl, mac, generation)
+        return result
+
+    return wrapper
+
+
+def _command(method):
+    """Send the requests made by a state-changing API wrapper as interactive.
+
+    Commands then overtake queued reads and background polls at the rate
+    limiter. They are never retried on network errors, since the first
+    attempt may have been applied, but are replayed once after a token
+    refresh if the token has expired. Cached reads of the devices passed
+    to the command are invalidated once it finishes.
+    """
+
+    @functools.wraps(method)
+    async def wrapper(self, *args, **kwargs):
+        async def call():
+            with request_priority(RequestPriority.INTERACTIVE):
+                return await method(self, *args, **kwargs)
+
+        try:
+            return await _replay_on_token_expiry(self, call)
+        finally:
+            # Cached reads of the devices written to are no longer current
+            for device in _devices_in(args):
+                self.read_cache.invalidate_device(device.mac)
+
+    return wrapper
+
 
 class BaseService:
     """Base service class providing common functionality for all Wyze device services.
 
-    This abstract base class provides shared infrastructure for interacting with Wyze devices
-    including authentication, API communication, device discovery, and automatic updates.
-    All device-specific service classes (BulbService, SwitchService, etc.) inherit from this class.
+    This abstract base class provides shared infrastructure for interacting with Wyze
+    devices including authentication, API communication, device discovery, and
+    automatic updates. All device-specific service classes (BulbService, SwitchService,
+    etc.) inherit from this class.
 
     **Key Features:**
     * Device discovery and caching via `get_object_list()`
@@ -91,19 +242,30 @@ class BaseService:
     bulb_service.register_updater(device, interval=30)
     ```
 
-    **Note:** This class is not meant to be instantiated directly - use device-specific services instead.
+    **Note:** This class is not meant to be instantiated directly - use device-specific
+    services instead.
     """
 
     _devices: Optional[List[Device]] = None
+    _registry: Optional[DeviceRegistry] = None
+    _discovery_listeners: List[Callable[[DiscoveryDiff], None]] = []
+    _identity_map: IdentityMap = IdentityMap()
     _last_updated_time: time = (
         0  # preload a value of 0 so that comparison will succeed on the first run
     )
-    _min_update_time = 1200  # lets let the device_params update every 20 minutes for now. This could probably reduced signicficantly.
-    _update_lock: asyncio.Lock = asyncio.Lock()  # fmt: skip
+    # lets let the device_params update every 20 minutes for now. This could probably
+    # reduced signicficantly.
+    _min_update_time = 1200
+    _snapshot_refresh: Optional[asyncio.Task] = None
+    _snapshot_retry_at: float = 0
     _update_manager: UpdateManager = UpdateManager()
     _update_loop = None
     _updater: DeviceUpdater = None
     _updater_dict = {}
+    _single_flight: SingleFlight = SingleFlight()
+    _read_caches: "weakref.WeakKeyDictionary[WyzeAuthLib, ReadCache]" = (
+        weakref.WeakKeyDictionary()
+    )
 
     def __init__(self, auth_lib: WyzeAuthLib):
         """Initialize the base service with authentication.
@@ -112,6 +274,52 @@ class BaseService:
         * `auth_lib` (WyzeAuthLib): The authentication library for API access
         """
         self._auth_lib = auth_lib
+        self._local_control = LocalControlClient()
+        self._write_queue = WriteQueue()
+        # Opt-in: decode device state from discovery instead of per-device reads
+        self.bulk_state = False
+
+    @property
+    def read_cache(self) -> ReadCache:
+        """Short-lived cache of device state reads, shared per account."""
+        cache = BaseService._read_caches.get(self._auth_lib)
+        if cache is None:
+            cache = BaseService._read_caches[self._auth_lib] = ReadCache()
+        return cache
+
+    @property
+    def circuit_breakers(self) -> CircuitBreakers:
+        """Per-host circuit breakers of the underlying auth client."""
+        return self._auth_lib.circuit_breakers
+
+    @property
+    def local_control(self) -> LocalControlClient:
+        """The LAN client used for local bulb commands and its latency metrics."""
+        return self._local_control
+
+    @property
+    def write_queue(self) -> WriteQueue:
+        """Per-device queue that merges rapid successive property writes.
+
+        Set `write_queue.window` to hold the first write of a burst briefly so
+        that more changes can be merged into it.
+        """
+        return self._write_queue
+
+    async def _queue_write(
+        self, device: Device, plist: List[Dict[Any, Any]], send: Sender
+    ):
+        """Send `plist` with `send(device, plist)` through the device's write queue."""
+        await self._write_queue.submit(device, plist, send)
+
+    async def close(self):
+        """Stop background local-control probes and close LAN connections."""
+        await self._local_control.close()
+
+    @property
+    def single_flight(self) -> SingleFlight:
+        """Counters for reads that were coalesced with an identical in-flight read."""
+        return BaseService._single_flight
 
     @staticmethod
     async def start_update_manager():
@@ -139,7 +347,8 @@ class BaseService:
 
         **Args:**
         * `device` (Device): The device to register for automatic updates
-        * `interval` (int): Update interval in seconds
+        * `interval` (int): Requested update interval in seconds. The effective
+          interval adapts to how volatile the device is; see `update_interval`.
 
         **Example:**
         ```python
@@ -169,6 +378,23 @@ class BaseService:
             BaseService._update_manager.del_updater(self._updater_dict[device])
             del self._updater_dict[device]
 
+    def update_interval(self, device: Device) -> Optional[float]:
+        """Return the effective automatic update interval of a device.
+
+        The interval given to `register_updater` is shortened while the device
+        is active or its updates keep changing its state, and lengthened while
+        it is idle, within the global request budget.
+
+        **Args:**
+        * `device` (Device): A device registered with `register_updater`
+
+        **Returns:**
+        * `Optional[float]`: Seconds between updates, or None if not registered
+        """
+        updater = self._updater_dict.get(device)
+        return None if updater is None else updater.interval
+
+    @_command
     async def set_push_info(self, on: bool):
         """Set push info for the user.
 
@@ -194,6 +420,7 @@ class BaseService:
 
         check_for_errors_standard(self, response_json)
 
+    @_read_request
     async def get_user_profile(self) -> Dict[Any, Any]:
         """Get user profile.
 
@@ -221,6 +448,7 @@ class BaseService:
 
         return response_json
 
+    @_read_request
     async def get_object_list(self) -> List[Device]:
         """Discover and retrieve all devices associated with the Wyze account.
 
@@ -259,29 +487,172 @@ class BaseService:
 
         check_for_errors_standard(self, response_json)
         # Cache the devices so that update calls can pull more recent device_params
-        BaseService._devices = [
-            Device(device) for device in response_json["data"]["device_list"]
-        ]
+        entries = response_json["data"]["device_list"]
+        previous = BaseService._registry or DeviceRegistry([])
+        BaseService._registry, diff = previous.merge(entries)
+        BaseService._devices = BaseService._registry.devices
+        BaseService._last_updated_time = time.time()
+        if diff:
+            _LOGGER.debug(f"Discovery changed: {diff}")
+            for listener in list(BaseService._discovery_listeners):
+                try:
+                    listener(diff)
+                except Exception:
+                    _LOGGER.exception("Discovery listener failed")
 
         return BaseService._devices
 
+    def warm_start(
+        self,
+        entries: List[Dict[str, Any]],
+        states: Dict[str, Dict[str, Any]],
+        taken_at: float,
+    ):
+        """Serve a saved discovery and device state until fresh ones arrive.
+
+        Nothing is replaced if discovery has already run. A discovery refresh
+        is started in the background either way.
+
+        :param entries: The raw `device_list` of the saved discovery.
+        :param states: Saved decoded state by MAC and class name, applied to typed
+            device objects created from the unchanged saved entries.
+        :param taken_at: When the saved discovery was made, as a Unix timestamp.
+        """
+        if BaseService._registry is None:
+            BaseService._registry, _ = DeviceRegistry([]).merge(entries)
+            BaseService._devices = BaseService._registry.devices
+            BaseService._last_updated_time = taken_at
+            BaseService._identity_map.seed(states, entries)
+        self._refresh_snapshot_in_background()
+
+    def device_snapshot(
+        self,
+    ) -> Tuple[List[Dict[str, Any]], Dict[str, Dict[str, Any]]]:
+        """The raw discovery entries and decoded device state, for `warm_start`."""
+        registry = BaseService._registry
+        entries = [device.raw_dict for device in registry] if registry else []
+        return entries, BaseService._identity_map.states()
+
+    @staticmethod
+    def add_discovery_listener(callback: Callable[[DiscoveryDiff], None]):
+        """Call `callback` with a `DiscoveryDiff` whenever discovery finds changes.
+
+        Devices whose discovery entry is unchanged keep their object identity
+        across discoveries; the diff lists the added, removed and re-parsed ones.
+
+        **Example:**
+        ```python
+        def on_change(diff):
+            for device in diff.added:
+                print(f"New device: {device.nickname}")
+
+        BaseService.add_discovery_listener(on_change)
+        ```
+        """
+        BaseService._discovery_listeners.append(callback)
+
+    @staticmethod
+    def remove_discovery_listener(callback: Callable[[DiscoveryDiff], None]):
+        """Stop calling a callback added with `add_discovery_listener`."""
+        if callback in BaseService._discovery_listeners:
+            BaseService._discovery_listeners.remove(callback)
+
+    def _registry_for(self, devices: List[Device]) -> DeviceRegistry:
+        """Return the registry indexing `devices`, reusing the discovery one."""
+        registry = BaseService._registry
+        if registry is not None and registry.devices is devices:
+            return registry
+        return DeviceRegistry(devices)
+
+    def _typed(self, cls: type, devices: Sequence[Device]) -> list:
+        """Return the canonical `cls` object for each device.
+
+        Repeated calls hand back the same objects, so everything holding a
+        device shares one copy of its state.
+        """
+        return [
+            BaseService._identity_map.get(cls, device.raw_dict) for device in devices
+        ]
+
+    async def _get_registry(self) -> DeviceRegistry:
+        """Return the latest device registry, running discovery on first use."""
+        registry = BaseService._registry
+        if registry is None:
+            registry = self._registry_for(await self.get_object_list())
+        return registry
+
+    @property
+    def snapshot_interval(self) -> float:
+        """Seconds after which `get_updated_params` refreshes device discovery."""
+        return BaseService._min_update_time
+
+    @snapshot_interval.setter
+    def snapshot_interval(self, seconds: float):
+        BaseService._min_update_time = seconds
+
+    @property
+    def snapshot_age(self) -> Optional[float]:
+        """Seconds since the device params snapshot was taken, or None without one."""
+        if BaseService._registry is None:
+            return None
+        return time.time() - BaseService._last_updated_time
+
     async def get_updated_params(
         self, device_mac: str = None
     ) -> Dict[str, Optional[Any]]:
         """Get updated params for a device.
 
+        Params are served from the last discovery snapshot without waiting.
+        Once the snapshot is older than `snapshot_interval`, discovery is
+        refreshed by a single background task; only the very first call waits
+        for discovery to complete.
+
         :param device_mac: The device mac to get updated params for.
         :return: Updated params for the device.
         """
-        if time.time() - BaseService._last_updated_time >= BaseService._min_update_time:
+        if BaseService._registry is None:
             await self.get_object_list()
-            BaseService._last_updated_time = time.time()
-        ret_params = {}
-        for dev in BaseService._devices:
-            if dev.mac == device_mac:
-                ret_params = dev.device_params
-        return ret_params
+        elif (
+            self.snapshot_age >= BaseService._min_update_time
+            and time.time() >= BaseService._snapshot_retry_at
+        ):
+            self._refresh_snapshot_in_background()
+        device = BaseService._registry.get(device_mac)
+        return device.device_params if device is not None else {}
+
+    async def _discovered_device(self, device_mac: str) -> Optional[Device]:
+        """The device as reported by a discovery at most `BULK_STATE_TTL` seconds old.
+
+        Devices updated in the same polling round share one get_object_list call.
+
+        :param device_mac: The device mac to look up.
+        :return: The discovered device, or None if discovery does not list it.
+        """
+        age = self.snapshot_age
+        if age is None or age >= BULK_STATE_TTL:
+            await self.get_object_list()
+        return BaseService._registry.get(device_mac)
+
+    def _refresh_snapshot_in_background(self):
+        """Start a discovery refresh unless one is already running."""
+        loop = asyncio.get_running_loop()
+        task = BaseService._snapshot_refresh
+        if task is not None and not task.done() and task.get_loop() is loop:
+            return
+        BaseService._snapshot_refresh = loop.create_task(self._refresh_snapshot())
 
+    async def _refresh_snapshot(self):
+        try:
+            with request_priority(RequestPriority.BACKGROUND):
+                await self.get_object_list()
+        except Exception:
+            BaseService._snapshot_retry_at = time.time() + SNAPSHOT_RETRY_DELAY
+            _LOGGER.warning(
+                "Refreshing device params failed, serving the previous snapshot",
+                exc_info=True,
+            )
+
+    @_read_request(ttl=STATE_READ_TTL)
     async def _get_property_list(self, device: Device) -> List[Tuple[PropertyIDs, Any]]:
         """Wraps the api.wyzecam.com/app/v2/device/get_property_list endpoint
 
@@ -312,16 +683,14 @@ class BaseService:
 
         check_for_errors_standard(self, response_json)
         properties = response_json["data"]["property_list"]
-        property_list = []
-        for prop in properties:
-            try:
-                property_id = PropertyIDs(prop["pid"])
-                property_list.append((property_id, prop["value"]))
-            except ValueError:
-                pass
-
-        return property_list
+        # Unknown pids are dropped with a dict lookup rather than a failed enum parse
+        return [
+            (_PROPERTY_IDS[prop["pid"]], prop["value"])
+            for prop in properties
+            if prop["pid"] in _PROPERTY_IDS
+        ]
 
+    @_command
     async def _set_property_list(self, device: Device, plist: List[Dict[str, str]]):
         """Wraps the api.wyzecam.com/app/v2/device/set_property_list endpoint
 
@@ -355,17 +724,65 @@ class BaseService:
     async def _set_device_list_property_list(
         self, device: Device, plist: List[Dict[str, str]]
     ):
-        """Wraps the api.wyzecam.com/app/v2/device_list/set_property_list (bulk) endpoint.
+        """Wraps the api.wyzecam.com/app/v2/device_list/set_property_list (bulk)
+        endpoint.
 
-        Current bulb firmware (e.g. WLPA19) silently ignores the P3 power property sent to
-        the single-device ``device/set_property_list`` endpoint (the server returns
-        ``code 1 / SUCCESS`` but the bulb no-ops). The Wyze app drives power through this
-        bulk ``device_list`` endpoint, which the firmware honors. Verified on-device
-        against real ``get_property_list`` reads, both directions.
+        Current bulb firmware (e.g. WLPA19) silently ignores the P3 power property sent
+        to the single-device ``device/set_property_list`` endpoint (the server returns
+        ``code 1 / SUCCESS`` but the bulb no-ops). The Wyze app drives power through
+        this bulk ``device_list`` endpoint, which the firmware honors. Verified
+        on-device against real ``get_property_list`` reads, both directions.
 
         :param device: The device for which to set the property(ies)
         :param plist: A list of properties [{"pid": pid, "pvalue": pvalue},...]
         """
+        await self._post_device_list_property_list([(device, plist)])
+
+    async def _set_many_device_list_property_lists(
+        self,
+        changes: Sequence[Tuple[Device, List[Dict[str, str]]]],
+        batch_size: int = DEVICE_LIST_BATCH_SIZE,
+    ) -> List[Device]:
+        """Set property lists for many devices through device_list/set_property_list.
+
+        Changes are packed into one request per `batch_size` devices. If the API
+        rejects a batch, each device in it is retried on its own so that one bad
+        device does not fail the others.
+
+        :param changes: (device, plist) pairs to apply
+        :param batch_size: Maximum number of devices per request
+        :return: Devices whose properties could not be set
+        """
+        failed = []
+        for start in range(0, len(changes), batch_size):
+            batch = changes[start : start + batch_size]
+            try:
+                await self._post_device_list_property_list(batch)
+                continue
+            except (UnknownApiError, ParameterError) as e:
+                if len(batch) == 1:
+                    _LOGGER.warning(
+                        f"Failed to set properties on {batch[0][0].mac}: {e}"
+                    )
+                    failed.append(batch[0][0])
+                    continue
+                _LOGGER.debug(
+                    f"Batch of {len(batch)} devices rejected, retrying each: {e}"
+                )
+
+            for device, plist in batch:
+                try:
+                    await self._post_device_list_property_list([(device, plist)])
+                except (UnknownApiError, ParameterError) as e:
+                    _LOGGER.warning(f"Failed to set properties on {device.mac}: {e}")
+                    failed.append(device)
+
+        return failed
+
+    @_command
+    async def _post_device_list_property_list(
+        self, changes: Sequence[Tuple[Device, List[Dict[str, str]]]]
+    ):
         await self._auth_lib.refresh_if_should()
 
         payload = {
@@ -384,6 +801,7 @@ class BaseService:
                     "device_model": device.product_model,
                     "property_list": plist,
                 }
+                for device, plist in changes
             ],
         }
 
@@ -399,6 +817,16 @@ class BaseService:
         :param device: The device for which to run the action list
         :param plist: A list of properties [{"pid": pid, "pvalue": pvalue},...]
         """
+        await self._run_action_lists([(device, plist)])
+
+    @_command
+    async def _run_action_lists(
+        self, changes: Sequence[Tuple[Device, List[Dict[Any, Any]]]]
+    ):
+        """Run set_mesh_property actions for many devices in one request.
+
+        :param changes: (device, plist) pairs, one action is sent per pair
+        """
         await self._auth_lib.refresh_if_should()
 
         payload = {
@@ -418,6 +846,7 @@ class BaseService:
                     "provider_key": device.product_model,
                     "action_key": "set_mesh_property",
                 }
+                for device, plist in changes
             ],
         }
 
@@ -427,18 +856,31 @@ class BaseService:
 
         check_for_errors_standard(self, response_json)
 
-    async def _get_event_list(self, count: int) -> Dict[Any, Any]:
+    @_read_request
+    async def _get_event_list(
+        self,
+        count: int,
+        begin_time: Optional[int] = None,
+        end_time: Optional[int] = None,
+    ) -> Dict[Any, Any]:
         """Wraps the api.wyzecam.com/app/v2/device/get_event_list endpoint
 
         :param count: Number of events to gather
+        :param begin_time: Earliest event time in ms, defaults to one hour ago
+        :param end_time: Latest event time in ms, defaults to now
         :return: Response from the server after being validated
         """
 
         await self._auth_lib.refresh_if_should()
 
+        if begin_time is None:
+            begin_time = int((time.time() - (60 * 60)) * 1000)
+        if end_time is None:
+            end_time = int(time.time() * 1000)
+
         payload = {
             "phone_id": PHONE_ID,
-            "begin_time": int((time.time() - (60 * 60)) * 1000),
+            "begin_time": begin_time,
             "event_type": "",
             "app_name": APP_NAME,
             "count": count,
@@ -449,7 +891,7 @@ class BaseService:
             "device_mac_list": [],
             "event_tag_list": [],
             "sv": "782ced6909a44d92a1f70d582bbe88be",
-            "end_time": int(time.time() * 1000),
+            "end_time": end_time,
             "phone_system_type": PHONE_SYSTEM_TYPE,
             "app_ver": APP_VER,
             "ts": 1623612037763,
@@ -464,6 +906,7 @@ class BaseService:
         check_for_errors_standard(self, response_json)
         return response_json
 
+    @_command
     async def _run_action(self, device: Device, action: str):
         """Wraps the api.wyzecam.com/app/v2/auto/run_action endpoint
 
@@ -496,8 +939,10 @@ class BaseService:
 
         check_for_errors_standard(self, response_json)
 
+    @_command
     async def _run_action_devicemgmt(self, device: Device, type: str, value: str):
-        """Wraps the devicemgmt-service-beta.wyze.com/device-management/api/action/run_action endpoint
+        """Wraps the devicemgmt-service-beta.wyze.com
+        /device-management/api/action/run_action endpoint
 
         :param device: The device for which to run the action
         :param type: The type of action to run
@@ -516,7 +961,8 @@ class BaseService:
                 "productModel": device.product_model,
                 "type": "DEVICE",
             },
-            "transactionId": "0a5b20591fedd4du1b93f90743ba0csd",  # OG cam needs this (doesn't matter what the value is)
+            # OG cam needs this (doesn't matter what the value is)
+            "transactionId": "0a5b20591fedd4du1b93f90743ba0csd",
         }
 
         headers = {
@@ -531,10 +977,12 @@ class BaseService:
 
         check_for_errors_iot(self, response_json)
 
+    @_command
     async def _set_toggle(
         self, device: Device, toggleType: DeviceMgmtToggleType, state: str
     ):
-        """Wraps the ai-subscription-service-beta.wyzecam.com/v4/subscription-service/toggle-management endpoint
+        """Wraps the ai-subscription-service-beta.wyzecam.com
+        /v4/subscription-service/toggle-management endpoint
 
         :param device: The device for which to get the state
         :param toggleType: Enum for the toggle type
@@ -578,8 +1026,10 @@ class BaseService:
 
         check_for_errors_devicemgmt(self, response_json)
 
+    @_read_request(ttl=STATE_READ_TTL)
     async def _get_iot_prop_devicemgmt(self, device: Device) -> Dict[str, Any]:
-        """Wraps the devicemgmt-service-beta.wyze.com/device-management/api/device-property/get_iot_prop endpoint
+        """Wraps the devicemgmt-service-beta.wyze.com
+        /device-management/api/device-property/get_iot_prop endpoint
 
         :param device: The device for which to get the state
         :return: Response from the server after being validated
@@ -611,6 +1061,7 @@ class BaseService:
 
         return response_json
 
+    @_command
     async def _set_property(self, device: Device, pid: str, pvalue: str):
         """Wraps the api.wyzecam.com/app/v2/device/set_property endpoint
 
@@ -642,6 +1093,7 @@ class BaseService:
 
         check_for_errors_standard(self, response_json)
 
+    @_command
     async def _monitoring_profile_active(self, hms_id: str, home: int, away: int):
         """Wraps the hms.api.wyze.com/api/v1/monitoring/v1/profile/active endpoint
 
@@ -670,8 +1122,10 @@ class BaseService:
         )
         check_for_errors_hms(self, response_json)
 
+    @_read_request
     async def _get_plan_binding_list_by_user(self) -> Dict[Any, Any]:
-        """Wraps the wyze-membership-service.wyzecam.com/platform/v2/membership/get_plan_binding_list_by_user endpoint
+        """Wraps the wyze-membership-service.wyzecam.com
+        /platform/v2/membership/get_plan_binding_list_by_user endpoint
 
         :return: The response to gathering the plan for the current user
         """
@@ -696,6 +1150,7 @@ class BaseService:
         check_for_errors_hms(self, response_json)
         return response_json
 
+    @_command
     async def _disable_reme_alarm(self, hms_id: str) -> None:
         """
         Wraps the hms.api.wyze.com/api/v1/reme-alarm endpoint
@@ -712,6 +1167,7 @@ class BaseService:
 
         check_for_errors_hms(self, response_json)
 
+    @_read_request
     async def _monitoring_profile_state_status(self, hms_id: str) -> Dict[Any, Any]:
         """
         Wraps the hms.api.wyze.com/api/v1/monitoring/v1/profile/state-status endpoint
@@ -741,6 +1197,7 @@ class BaseService:
         check_for_errors_hms(self, response_json)
         return response_json
 
+    @_command
     async def _lock_control(self, device: Device, action: str) -> None:
         await self._auth_lib.refresh_if_should()
 
@@ -762,6 +1219,7 @@ class BaseService:
 
         check_for_errors_lock(self, response_json)
 
+    @_read_request(ttl=LOCK_READ_TTL)
     async def _get_lock_info(self, device: Device) -> Dict[str, Optional[Any]]:
         await self._auth_lib.refresh_if_should()
 
@@ -783,6 +1241,7 @@ class BaseService:
 
         return response_json
 
+    @_read_request
     async def _get_lock_ble_token(self, device: Device) -> Dict[str, Optional[Any]]:
         await self._auth_lib.refresh_if_should()
 
@@ -802,6 +1261,7 @@ class BaseService:
 
         return response_json
 
+    @_read_request
     async def _get_device_info(self, device: Device) -> Dict[Any, Any]:
         await self._auth_lib.refresh_if_should()
 
@@ -827,6 +1287,7 @@ class BaseService:
 
         return response_json
 
+    @_read_request(ttl=STATE_READ_TTL)
     async def _get_iot_prop(
         self, url: str, device: Device, keys: str
     ) -> Dict[Any, Any]:
@@ -850,6 +1311,7 @@ class BaseService:
 
         return response_json
 
+    @_read_request
     async def _get_air_prop(
         self, url: str, device: Device, prop_names: str
     ) -> Dict[Any, Any]:
@@ -875,6 +1337,7 @@ class BaseService:
 
         return response_json
 
+    @_read_request
     async def _query_air_history(
         self, url: str, device: Device, begin_time: int, last_time: int
     ) -> Dict[Any, Any]:
@@ -900,6 +1363,7 @@ class BaseService:
 
         return response_json
 
+    @_command
     async def _set_iot_prop(
         self, url: str, device: Device, prop_key: str, value: Any
     ) -> None:
@@ -908,9 +1372,9 @@ class BaseService:
         payload = olive_create_post_payload(
             device.mac, device.product_model, prop_key, value
         )
+        payload_str = codec.dumps(payload)
         signature = olive_create_signature(
-            json.dumps(payload, separators=(",", ":")),
-            self._auth_lib.token.access_token,
+            payload_str, self._auth_lib.token.access_token
         )
         headers = {
             "Accept-Encoding": "gzip",
@@ -923,8 +1387,6 @@ class BaseService:
             "signature2": signature,
         }
 
-        payload_str = json.dumps(payload, separators=(",", ":"))
-
         response_json = await self._auth_lib.post(
             url, headers=headers, data=payload_str
         )
@@ -934,6 +1396,20 @@ class BaseService:
     async def _local_bulb_command(self, bulb, plist):
         # await self._auth_lib.refresh_if_should()
 
+        if not bulb.enr:
+            await self._load_device_key(bulb)
+        if not bulb.enr:
+            # Without its key the bulb would reject the command, which is not a
+            # reason to fall back to the cloud for good
+            _LOGGER.debug(
+                "No local key for %s yet, sending through the cloud", bulb.mac
+            )
+            try:
+                await self._run_action_list(bulb, plist)
+            finally:
+                self.read_cache.invalidate_device(bulb.mac)
+            return
+
         characteristics = {
             "mac": bulb.mac.upper(),
             "index": "1",
@@ -953,19 +1429,35 @@ class BaseService:
         # JSON likes to add a second \ so we have to remove it for the bulb to be happy
         payload_str = json.dumps(payload, separators=(",", ":")).replace("\\\\", "\\")
 
-        url = "http://%s:88/device_request" % bulb.ip
-
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.post(url, data=payload_str) as response:
-                    print(await response.text())
-        except aiohttp.ClientConnectionError:
+            response = await self._local_control.send(bulb.ip, payload_str)
+            _LOGGER.debug("Local response from %s: %s", bulb.mac, response)
+        except (aiohttp.ClientError, asyncio.TimeoutError):
             _LOGGER.warning(
                 "Failed to connect to bulb %s, reverting to cloud." % bulb.mac
             )
             await self._run_action_list(bulb, plist)
             bulb.cloud_fallback = True
+            # Switch back to local control once the bulb answers again
+            self._local_control.watch(bulb)
+        finally:
+            self.read_cache.invalidate_device(bulb.mac)
 
+    async def _load_device_key(self, bulb):
+        """Take a bulb's `enr` from fresh discovery.
+
+        Entries restored from a snapshot have their keys redacted, so this
+        waits for the background discovery refresh if one is running.
+        """
+        refresh = BaseService._snapshot_refresh
+        if refresh is not None and not refresh.done():
+            await asyncio.shield(refresh)
+        registry = BaseService._registry
+        discovered = registry.get(bulb.mac) if registry is not None else None
+        if discovered is not None and discovered.raw_dict is not bulb.raw_dict:
+            bulb.load_raw(discovered.raw_dict)
+
+    @_read_request
     async def _get_plug_history(
         self, device: Device, start_time, end_time
     ) -> Dict[Any, Any]:
@@ -996,6 +1488,7 @@ class BaseService:
 
         return response_json["data"]["usage_record_list"]
 
+    @_read_request
     async def _get_zone_by_device(self, url: str, device: Device) -> Dict[Any, Any]:
         await self._auth_lib.refresh_if_should()
 
@@ -1017,15 +1510,16 @@ class BaseService:
 
         return response_json
 
+    @_command
     async def _stop_running_schedule(
         self, url: str, device: Device, action: str
     ) -> Dict[Any, Any]:
         await self._auth_lib.refresh_if_should()
 
         payload = olive_create_post_payload_irrigation_stop(device.mac, action)
+        payload_str = codec.dumps(payload)
         signature = olive_create_signature(
-            json.dumps(payload, separators=(",", ":")),
-            self._auth_lib.token.access_token,
+            payload_str, self._auth_lib.token.access_token
         )
         headers = {
             "Accept-Encoding": "gzip",
@@ -1038,7 +1532,6 @@ class BaseService:
             "signature2": signature,
         }
 
-        payload_str = json.dumps(payload, separators=(",", ":"))
         response_json = await self._auth_lib.post(
             url, headers=headers, data=payload_str
         )
@@ -1047,6 +1540,7 @@ class BaseService:
 
         return response_json
 
+    @_command
     async def _start_zone(
         self, url: str, device: Device, zone_number: int, duration: int
     ) -> Dict[Any, Any]:
@@ -1055,9 +1549,9 @@ class BaseService:
         payload = olive_create_post_payload_irrigation_quickrun(
             device.mac, zone_number, duration
         )
+        payload_str = codec.dumps(payload)
         signature = olive_create_signature(
-            json.dumps(payload, separators=(",", ":")),
-            self._auth_lib.token.access_token,
+            payload_str, self._auth_lib.token.access_token
         )
         headers = {
             "Accept-Encoding": "gzip",
@@ -1070,7 +1564,6 @@ class BaseService:
             "signature2": signature,
         }
 
-        payload_str = json.dumps(payload, separators=(",", ":"))
         response_json = await self._auth_lib.post(
             url, headers=headers, data=payload_str
         )
@@ -1079,6 +1572,7 @@ class BaseService:
 
         return response_json
 
+    @_read_request
     async def _get_schedule_runs(
         self, url: str, device: Device, limit: int = 2
     ) -> Dict[Any, Any]:
@@ -3,16 +3,37 @@
 #  of the attached license. You should have received a copy of
 #  the license with this file. If not, please write to:
 #  katie@mulliken.net to receive a copy
+import asyncio
 import logging
 import re
-from typing import Any, Dict, Optional, List
+from typing import Any, Dict, Iterable, Optional, List
 
+from .action_batcher import ActionBatcher
 from .base_service import BaseService
+from .decoders import Field, compile_decoder, int_from_float, is_one
+from ..exceptions import ParameterError, UnknownApiError
 from ..types import Device, PropertyIDs, DeviceTypes
 from ..utils import create_pid_pair
+from ..wyze_auth_lib import WyzeAuthLib
 
 _LOGGER = logging.getLogger(__name__)
 
+BULB_FIELDS = {
+    PropertyIDs.BRIGHTNESS: Field("brightness", int_from_float),
+    PropertyIDs.COLOR_TEMP: Field("color_temp", int, default=2700),
+    PropertyIDs.ON: Field("on", is_one),
+    PropertyIDs.AVAILABLE: Field("available", is_one),
+    PropertyIDs.COLOR_MODE: Field("color_mode"),
+    PropertyIDs.SUN_MATCH: Field("sun_match", is_one),
+    PropertyIDs.LIGHTSTRIP_EFFECTS: Field("effects"),
+    PropertyIDs.LIGHTSTRIP_MUSIC_MODE: Field("music_mode", is_one),
+}
+# Only mesh bulbs and light strips report a color
+COLOR_BULB_FIELDS = {**BULB_FIELDS, PropertyIDs.COLOR: Field("color")}
+
+decode_bulb = compile_decoder(BULB_FIELDS)
+decode_color_bulb = compile_decoder(COLOR_BULB_FIELDS)
+
 
 class Bulb(Device):
     """Bulb class for interacting with Wyze bulbs.
@@ -30,8 +51,16 @@ class Bulb(Device):
             print(f"Brightness: {bulb.brightness}, Color: {bulb.color}")
     """
 
-    _brightness: int = 0
-    _color_temp: int = 1800
+    __slots__ = (
+        "_brightness",
+        "_color_temp",
+        "_color",
+        "enr",
+        "on",
+        "cloud_fallback",
+        "ip",
+    )
+
     _color: Optional[str]
 
     def __init__(self, dictionary: Dict[Any, Any]):
@@ -39,6 +68,8 @@ class Bulb(Device):
 
         :param dictionary: Dictionary containing the device parameters.
         """
+        self._brightness: int = 0
+        self._color_temp: int = 1800
         self.enr: str = ""
         """Encryption string"""
         self.on: bool = False
@@ -102,6 +133,21 @@ class Bulb(Device):
 class BulbService(BaseService):
     """Bulb service for interacting with Wyze bulbs."""
 
+    def __init__(self, auth_lib: WyzeAuthLib):
+        super().__init__(auth_lib)
+        self._action_batcher = ActionBatcher(
+            lambda changes: self._run_action_lists(changes)
+        )
+
+    @property
+    def action_batcher(self) -> ActionBatcher:
+        """Groups cloud actions for mesh bulbs and light strips.
+
+        Set `action_batcher.window` to a few hundred milliseconds to combine
+        changes fired in a burst, such as a scene, into one request.
+        """
+        return self._action_batcher
+
     async def update(self, bulb: Bulb) -> Bulb:
         """Fetch and update the bulb's current state from the Wyze API.
 
@@ -113,37 +159,12 @@ class BulbService(BaseService):
         :return: Updated bulb object with current property values
         """
         # Get updated device_params
-        async with BaseService._update_lock:
-            bulb.device_params = await self.get_updated_params(bulb.mac)
+        bulb.device_params = await self.get_updated_params(bulb.mac)
 
         device_info = await self._get_property_list(bulb)
-        for property_id, value in device_info:
-            if property_id == PropertyIDs.BRIGHTNESS:
-                bulb.brightness = int(float(value))
-            elif property_id == PropertyIDs.COLOR_TEMP:
-                try:
-                    bulb.color_temp = int(value)
-                except ValueError:
-                    bulb.color_temp = 2700
-            elif property_id == PropertyIDs.ON:
-                bulb.on = value == "1"
-            elif property_id == PropertyIDs.AVAILABLE:
-                bulb.available = value == "1"
-            elif property_id == PropertyIDs.COLOR and bulb.type in [
-                DeviceTypes.LIGHTSTRIP,
-                DeviceTypes.MESH_LIGHT,
-            ]:
-                bulb.color = value
-            elif property_id == PropertyIDs.COLOR_MODE:
-                bulb.color_mode = value
-            elif property_id == PropertyIDs.SUN_MATCH:
-                bulb.sun_match = value == "1"
-            elif property_id == PropertyIDs.LIGHTSTRIP_EFFECTS:
-                bulb.effects = value
-            elif property_id == PropertyIDs.LIGHTSTRIP_MUSIC_MODE:
-                bulb.music_mode = value == "1"
-
-        return bulb
+        if bulb.type in (DeviceTypes.LIGHTSTRIP, DeviceTypes.MESH_LIGHT):
+            return decode_color_bulb(bulb, device_info)
+        return decode_bulb(bulb, device_info)
 
     async def get_bulbs(self) -> List[Bulb]:
         """Get a list of all bulbs.
@@ -154,17 +175,12 @@ class BulbService(BaseService):
 
         :return: List of Bulb objects with default property values
         """
-        if self._devices is None:
-            self._devices = await self.get_object_list()
+        registry = await self._get_registry()
+        bulbs = registry.by_type(
+            DeviceTypes.LIGHT, DeviceTypes.MESH_LIGHT, DeviceTypes.LIGHTSTRIP
+        )
 
-        bulbs = [
-            device
-            for device in self._devices
-            if device.type
-            in [DeviceTypes.LIGHT, DeviceTypes.MESH_LIGHT, DeviceTypes.LIGHTSTRIP]
-        ]
-
-        return [Bulb(bulb.raw_dict) for bulb in bulbs]
+        return self._typed(Bulb, bulbs)
 
     async def turn_on(self, bulb: Bulb, local_control, options=None):
         plist = [create_pid_pair(PropertyIDs.ON, "1")]
@@ -190,9 +206,9 @@ class BulbService(BaseService):
                     if item["pid"] == PropertyIDs.SUN_MATCH.value:
                         await self._set_property_list(bulb, [item])
                         plist.remove(item)
-                await self._run_action_list(bulb, plist)
+                await self._action_batcher.submit(bulb, plist)
             else:
-                await self._run_action_list(bulb, plist)  # Lightstrips
+                await self._action_batcher.submit(bulb, plist)  # Lightstrips
 
     async def turn_off(self, bulb: Bulb, local_control):
         plist = [create_pid_pair(PropertyIDs.ON, "0")]
@@ -205,31 +221,75 @@ class BulbService(BaseService):
             if local_control and not bulb.cloud_fallback:
                 await self._local_bulb_command(bulb, plist)
             else:
-                await self._run_action_list(bulb, plist)
+                await self._action_batcher.submit(bulb, plist)
+
+    async def set_many(
+        self, bulbs: Iterable[Bulb], plist: List[Dict[str, str]]
+    ) -> List[Bulb]:
+        """Apply the same property changes to many bulbs with batched requests.
+
+        Wi-Fi bulbs are packed into `device_list/set_property_list` requests of up
+        to `DEVICE_LIST_BATCH_SIZE` devices. Mesh bulbs and light strips are sent
+        as multi-action `run_action_list` requests through `action_batcher`.
+
+        :param bulbs: The bulbs to change
+        :param plist: A list of properties [{"pid": pid, "pvalue": pvalue},...]
+        :return: Bulbs whose change could not be applied
+        """
+        batched = []
+        mesh = []
+        for bulb in bulbs:
+            if bulb.type is DeviceTypes.LIGHT:
+                batched.append((bulb, list(plist)))
+            elif bulb.type in [DeviceTypes.MESH_LIGHT, DeviceTypes.LIGHTSTRIP]:
+                mesh.append(bulb)
+
+        results = await asyncio.gather(
+            *(self._action_batcher.submit(bulb, list(plist)) for bulb in mesh),
+            return_exceptions=True,
+        )
+        failed = []
+        for bulb, result in zip(mesh, results):
+            if isinstance(result, (UnknownApiError, ParameterError)):
+                _LOGGER.warning(f"Failed to set properties on {bulb.mac}: {result}")
+                failed.append(bulb)
+            elif isinstance(result, BaseException):
+                raise result
+
+        failed.extend(await self._set_many_device_list_property_lists(batched))
+        return failed
+
+    async def turn_on_many(self, bulbs: Iterable[Bulb]) -> List[Bulb]:
+        """Turn on many bulbs with batched requests. See `set_many`."""
+        return await self.set_many(bulbs, [create_pid_pair(PropertyIDs.ON, "1")])
+
+    async def turn_off_many(self, bulbs: Iterable[Bulb]) -> List[Bulb]:
+        """Turn off many bulbs with batched requests. See `set_many`."""
+        return await self.set_many(bulbs, [create_pid_pair(PropertyIDs.ON, "0")])
 
     async def set_color_temp(self, bulb: Bulb, color_temp: int):
         plist = [create_pid_pair(PropertyIDs.COLOR_TEMP, str(color_temp))]
 
         if bulb.type in [DeviceTypes.LIGHT]:
-            await self._set_property_list(bulb, plist)
+            await self._queue_write(bulb, plist, self._set_property_list)
         elif bulb.type in [DeviceTypes.MESH_LIGHT]:
-            await self._local_bulb_command(bulb, plist)
+            await self._queue_write(bulb, plist, self._local_bulb_command)
 
     async def set_color(self, bulb: Bulb, color: str, local_control):
         plist = [create_pid_pair(PropertyIDs.COLOR, str(color))]
         if bulb.type in [DeviceTypes.MESH_LIGHT]:
             if local_control and not bulb.cloud_fallback:
-                await self._local_bulb_command(bulb, plist)
+                await self._queue_write(bulb, plist, self._local_bulb_command)
             else:
-                await self._run_action_list(bulb, plist)
+                await self._queue_write(bulb, plist, self._action_batcher.submit)
 
     async def set_brightness(self, bulb: Device, brightness: int):
         plist = [create_pid_pair(PropertyIDs.BRIGHTNESS, str(brightness))]
 
         if bulb.type in [DeviceTypes.LIGHT]:
-            await self._set_property_list(bulb, plist)
+            await self._queue_write(bulb, plist, self._set_property_list)
         if bulb.type in [DeviceTypes.MESH_LIGHT]:
-            await self._local_bulb_command(bulb, plist)
+            await self._queue_write(bulb, plist, self._local_bulb_command)
 
     async def music_mode_on(self, bulb: Device):
         plist = [create_pid_pair(PropertyIDs.LIGHTSTRIP_MUSIC_MODE, "1")]
@@ -3,16 +3,16 @@
 #  of the attached license. You should have received a copy of
 #  the license with this file. If not, please write to:
 #  katie@mulliken.net to receive a copy
-import asyncio
 import logging
 import time
-from threading import Thread
 from typing import Any, List, Optional, Dict, Callable, Tuple
 
-from aiohttp import ClientOSError, ContentTypeError
-
 from ..exceptions import UnknownApiError
+from ..wyze_auth_lib import WyzeAuthLib
 from .base_service import BaseService
+from .decoders import Field, compile_decoder, is_one
+from .event_poller import EventPoller
+from .subscriptions import SubscriptionManager
 from ..types import (
     Device,
     DeviceTypes,
@@ -21,7 +21,7 @@ from ..types import (
     DeviceMgmtToggleProps,
     ResponseCodes,
 )
-from ..utils import return_event_for_device, create_pid_pair
+from ..utils import create_pid_pair
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -33,8 +33,41 @@ DEVICEMGMT_API_MODELS = [
     "HL_PAN4",  # Wyze Cam Pan v4
 ]  # Floodlight pro, battery cam pro, OG, and Pan v4 use a diffrent api (devicemgmt)
 
+CAMERA_FIELDS = {
+    PropertyIDs.AVAILABLE: Field("available", is_one),
+    PropertyIDs.ON: Field("on", is_one),
+    PropertyIDs.CAMERA_SIREN: Field("siren", is_one),
+    # Bulb Cam (HL_BC): '1' = ON, '2' = OFF
+    # Other cameras with accessories: same logic
+    PropertyIDs.ACCESSORY: Field("floodlight", is_one),
+    PropertyIDs.NOTIFICATION: Field("notify", is_one),
+    PropertyIDs.MOTION_DETECTION: Field("motion", is_one),
+}
+# 1 = open, 2 = closed by automation or smart platform (Alexa, Google Home, Rules),
+# 0 = closed by app
+GARAGE_CAMERA_FIELDS = {
+    **CAMERA_FIELDS,
+    PropertyIDs.ACCESSORY: (Field("floodlight", is_one), Field("garage", is_one)),
+}
+# devicemgmt capabilities, keyed by (capability name, property name)
+DEVICEMGMT_CAMERA_FIELDS = {
+    ("camera", "motion-detect-recording"): Field("motion"),
+    ("floodlight", "on"): Field("floodlight"),
+    ("spotlight", "on"): Field("floodlight"),
+    ("siren", "state"): Field("siren"),
+    ("iot-device", "push-switch"): Field("notify"),
+    ("iot-device", "iot-power"): Field("on"),
+    ("iot-device", "iot-state"): Field("available"),
+}
+
+decode_camera = compile_decoder(CAMERA_FIELDS)
+decode_garage_camera = compile_decoder(GARAGE_CAMERA_FIELDS)
+decode_devicemgmt_camera = compile_decoder(DEVICEMGMT_CAMERA_FIELDS)
+
 
 class Camera(Device):
+    __slots__ = ("last_event", "last_event_ts", "on", "siren", "floodlight", "garage")
+
     def __init__(self, dictionary: Dict[Any, Any]):
         super().__init__(dictionary)
 
@@ -47,122 +80,78 @@ class Camera(Device):
 
 
 class CameraService(BaseService):
-    _updater_thread: Optional[Thread] = None
-    _subscribers: List[Tuple[Camera, Callable[[Camera], None]]] = []
+    def __init__(self, auth_lib: WyzeAuthLib):
+        super().__init__(auth_lib)
+        self._event_poller = EventPoller(self)
+        self._subscriptions = SubscriptionManager(
+            lambda camera: self.update(camera), _LOGGER
+        )
+
+    @property
+    def _subscribers(self) -> List[Tuple[Camera, Callable[[Camera], None]]]:
+        return self._subscriptions.subscribers
+
+    @property
+    def event_poller(self) -> EventPoller:
+        """The poller that fetches camera events once per cycle for all cameras."""
+        return self._event_poller
 
     async def update(self, camera: Camera):
         # Get updated device_params
-        async with BaseService._update_lock:
-            camera.device_params = await self.get_updated_params(camera.mac)
+        camera.device_params = await self.get_updated_params(camera.mac)
 
-        # Get camera events
-        response = await self._get_event_list(10)
-        raw_events = response["data"]["event_list"]
-        latest_events = [Event(raw_event) for raw_event in raw_events]
+        # Get camera events from the account-wide poller shared by all cameras
+        latest_events = await self._event_poller.poll()
 
-        if (event := return_event_for_device(camera, latest_events)) is not None:
+        if (event := latest_events.get(camera.mac)) is not None:
             camera.last_event = event
             camera.last_event_ts = event.event_ts
 
         # Update camera state
         if camera.product_model in DEVICEMGMT_API_MODELS:  # New api
             state_response: Dict[str, Any] = await self._get_iot_prop_devicemgmt(camera)
-            for propCategory in state_response["data"]["capabilities"]:
-                if propCategory["name"] == "camera":
-                    camera.motion = propCategory["properties"][
-                        "motion-detect-recording"
-                    ]
-                if (
-                    propCategory["name"] == "floodlight"
-                    or propCategory["name"] == "spotlight"
-                ):
-                    camera.floodlight = propCategory["properties"]["on"]
-                if propCategory["name"] == "siren":
-                    camera.siren = propCategory["properties"]["state"]
-                if propCategory["name"] == "iot-device":
-                    camera.notify = propCategory["properties"]["push-switch"]
-                    camera.on = propCategory["properties"]["iot-power"]
-                    camera.available = propCategory["properties"]["iot-state"]
+            decode_devicemgmt_camera(
+                camera,
+                (
+                    ((capability["name"], name), value)
+                    for capability in state_response["data"]["capabilities"]
+                    for name, value in capability["properties"].items()
+                ),
+            )
 
         else:  # All other cam types (old api?)
             state_response: List[
                 Tuple[PropertyIDs, Any]
             ] = await self._get_property_list(camera)
-            for property, value in state_response:
-                if property is PropertyIDs.AVAILABLE:
-                    camera.available = value == "1"
-                if property is PropertyIDs.ON:
-                    camera.on = value == "1"
-                if property is PropertyIDs.CAMERA_SIREN:
-                    camera.siren = value == "1"
-                if property is PropertyIDs.ACCESSORY:
-                    # Bulb Cam (HL_BC): '1' = ON, '2' = OFF
-                    # Other cameras with accessories: same logic
-                    camera.floodlight = value == "1"
-                    if camera.device_params.get("dongle_product_model") == "HL_CGDC":
-                        camera.garage = (
-                            value == "1"
-                        )  # 1 = open, 2 = closed by automation or smart platform (Alexa, Google Home, Rules), 0 = closed by app
-                if property is PropertyIDs.NOTIFICATION:
-                    camera.notify = value == "1"
-                if property is PropertyIDs.MOTION_DETECTION:
-                    camera.motion = value == "1"
+            if camera.device_params.get("dongle_product_model") == "HL_CGDC":
+                decode_garage_camera(camera, state_response)
+            else:
+                decode_camera(camera, state_response)
 
         return camera
 
     async def register_for_updates(
-        self, camera: Camera, callback: Callable[[Camera], None]
+        self,
+        camera: Camera,
+        callback: Callable[[Camera], None],
+        interval: Optional[float] = None,
     ):
-        loop = asyncio.get_event_loop()
-        if not self._updater_thread:
-            self._updater_thread = Thread(
-                target=self.update_worker,
-                args=[
-                    loop,
-                ],
-                daemon=True,
-            )
-            self._updater_thread.start()
+        """Poll `camera` from an event-loop task and pass each update to `callback`.
 
-        self._subscribers.append((camera, callback))
+        :param camera: The camera to keep updated.
+        :param callback: Called with the updated camera after every poll.
+        :param interval: Seconds between polls, defaults to SUBSCRIPTION_INTERVAL.
+        """
+        self._subscriptions.subscribe(camera, callback, interval)
 
     async def deregister_for_updates(self, camera: Camera):
-        self._subscribers = [
-            (cam, callback)
-            for cam, callback in self._subscribers
-            if cam.mac != camera.mac
-        ]
-
-    def update_worker(self, loop):
-        while True:
-            if len(self._subscribers) < 1:
-                time.sleep(0.1)
-            else:
-                for camera, callback in self._subscribers:
-                    try:
-                        callback(
-                            asyncio.run_coroutine_threadsafe(
-                                self.update(camera), loop
-                            ).result()
-                        )
-                    except UnknownApiError as e:
-                        _LOGGER.warning(
-                            f"The update method detected an UnknownApiError: {e}"
-                        )
-                    except ClientOSError as e:
-                        _LOGGER.error(f"A network error was detected: {e}")
-                    except ContentTypeError as e:
-                        _LOGGER.error(f"Server returned unexpected ContentType: {e}")
+        self._subscriptions.unsubscribe(camera)
 
     async def get_cameras(self) -> List[Camera]:
-        if self._devices is None:
-            self._devices = await self.get_object_list()
-
-        cameras = [
-            device for device in self._devices if device.type is DeviceTypes.CAMERA
-        ]
+        registry = await self._get_registry()
+        cameras = registry.by_type(DeviceTypes.CAMERA)
 
-        return [Camera(camera.raw_dict) for camera in cameras]
+        return self._typed(Camera, cameras)
 
     async def turn_on(self, camera: Camera):
         if camera.product_model in DEVICEMGMT_API_MODELS:
@@ -0,0 +1,108 @@
+#  Copyright (c) 2021. Mulliken, LLC - All Rights Reserved
+#  You may use, distribute and modify this code under the terms
+#  of the attached license. You should have received a copy of
+#  the license with this file. If not, please write to:
+#  katie@mulliken.net to receive a copy
+from enum import Enum
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Hashable,
+    Iterable,
+    Mapping,
+    NamedTuple,
+    Tuple,
+    TypeVar,
+    Union,
+)
+
+"""
+Table-driven decoding of device property responses.
+
+Each device type declares a table mapping a raw property key to the attribute
+it sets, a converter and an optional default. `compile_decoder` turns the
+table into a single dict lookup per property, so unknown keys cost nothing
+and adding a property is one table entry.
+"""
+
+T = TypeVar("T")
+
+# Marks a field without a default: a value the converter rejects raises
+REQUIRED = object()
+
+
+def _identity(value: Any) -> Any:
+    return value
+
+
+def is_one(value: Any) -> bool:
+    """Decode the "1"/"0" flags used by the property list APIs."""
+    return value == "1"
+
+
+def is_connected(value: Any) -> bool:
+    """Decode the `iot_state` connection string of IoT devices."""
+    return value == "connected"
+
+
+def int_from_float(value: Any) -> int:
+    """Decode integers the API sometimes sends as "42.0"."""
+    return int(float(value))
+
+
+class Field(NamedTuple):
+    """How one raw property is stored on a device object.
+
+    If `convert` raises `ValueError`, the attribute is set to `default`, or the
+    error propagates when the field has no default.
+    """
+
+    attr: str
+    convert: Callable[[Any], Any] = _identity
+    default: Any = REQUIRED
+
+
+DecoderTable = Mapping[Hashable, Union[Field, Tuple[Field, ...]]]
+Decoder = Callable[[T, Iterable[Tuple[Hashable, Any]]], T]
+
+
+def compile_decoder(table: DecoderTable) -> Decoder:
+    """Compile a decoder table into a function `decode(device, items)`.
+
+    `items` are (key, value) pairs. Keys may be the enum members used in the
+    table or their raw values, so responses can be decoded without parsing
+    keys into enums first. Keys missing from the table are skipped.
+
+    **Example:**
+    ```python
+    decode = compile_decoder({PropertyIDs.ON: Field("on", is_one)})
+    decode(switch, [("P3", "1"), ("P9999", "x")])
+    ```
+    """
+    dispatch: Dict[Hashable, Tuple[Field, ...]] = {}
+    for key, fields in table.items():
+        if isinstance(fields, Field):
+            fields = (fields,)
+        dispatch[key] = fields
+        if isinstance(key, Enum):
+            dispatch[key.value] = fields
+
+    lookup = dispatch.get
+
+    def decode(device: T, items: Iterable[Tuple[Hashable, Any]]) -> T:
+        for key, value in items:
+            fields = lookup(key)
+            if fields is None:
+                continue
+            for attr, convert, default in fields:
+                try:
+                    converted = convert(value)
+                except ValueError:
+                    if default is REQUIRED:
+                        raise
+                    converted = default
+                setattr(device, attr, converted)
+        return device
+
+    return decode
@@ -0,0 +1,171 @@
+#  Copyright (c) 2021. Mulliken, LLC - All Rights Reserved
+#  You may use, distribute and modify this code under the terms
+#  of the attached license. You should have received a copy of
+#  the license with this file. If not, please write to:
+#  katie@mulliken.net to receive a copy
+import json
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+from ..types import Device, DeviceTypes
+
+"""
+Indexed in-memory registry of the devices returned by one discovery, and the
+differences between successive discoveries.
+"""
+
+
+def content_hash(raw: Dict[str, Any]) -> int:
+    """Cheap fingerprint of a discovery entry, stable across key order."""
+    return hash(json.dumps(raw, sort_keys=True, default=str))
+
+
+class DiscoveryDiff:
+    """What changed between two discoveries, by MAC address.
+
+    Attributes:
+        added: Devices that were not in the previous discovery.
+        removed: Devices from the previous discovery that are gone.
+        changed: Devices whose discovery entry changed, parsed anew.
+        renamed: The subset of `changed` whose nickname changed.
+    """
+
+    def __init__(
+        self,
+        added: Optional[List[Device]] = None,
+        removed: Optional[List[Device]] = None,
+        changed: Optional[List[Device]] = None,
+        renamed: Optional[List[Device]] = None,
+    ):
+        self.added = added or []
+        self.removed = removed or []
+        self.changed = changed or []
+        self.renamed = renamed or []
+
+    def __bool__(self) -> bool:
+        return bool(self.added or self.removed or self.changed)
+
+    def __repr__(self) -> str:
+        return "<DiscoveryDiff: {} added, {} removed, {} changed, {} renamed>".format(
+            len(self.added), len(self.removed), len(self.changed), len(self.renamed)
+        )
+
+
+class DeviceRegistry:
+    """Devices from a single `get_object_list` call, indexed for O(1) lookups.
+
+    Devices are indexed by MAC address, by `DeviceTypes` and by
+    `product_model`. Lists returned by the lookup methods keep discovery order.
+
+    **Example:**
+    ```python
+    registry = DeviceRegistry(await service.get_object_list())
+    bulb = registry.get("ABCDEF123456")
+    plugs = registry.by_type(DeviceTypes.PLUG, DeviceTypes.OUTDOOR_PLUG)
+    ```
+    """
+
+    def __init__(self, devices: Iterable[Device]):
+        self._devices: List[Device] = (
+            devices if isinstance(devices, list) else list(devices)
+        )
+        self._by_mac: Dict[str, Device] = {}
+        self._by_type: Dict[DeviceTypes, List[Device]] = {}
+        self._by_model: Dict[str, List[Device]] = {}
+        self._position: Dict[int, int] = {}
+        self._hashes: Dict[int, int] = {}
+
+        for position, device in enumerate(self._devices):
+            self._position[id(device)] = position
+            self._by_mac.setdefault(device.mac, device)
+            self._by_type.setdefault(device.type, []).append(device)
+            self._by_model.setdefault(device.product_model, []).append(device)
+
+    @property
+    def devices(self) -> List[Device]:
+        """All devices, in discovery order."""
+        return self._devices
+
+    @property
+    def macs(self) -> Set[str]:
+        """MAC addresses of every registered device."""
+        return set(self._by_mac)
+
+    def merge(
+        self, entries: Iterable[Dict[str, Any]]
+    ) -> Tuple["DeviceRegistry", DiscoveryDiff]:
+        """Build the registry for a newer discovery, reusing unchanged devices.
+
+        Entries are matched to current devices by MAC. An entry whose content
+        hash matches keeps its existing `Device` object; only new and changed
+        entries are parsed.
+
+        :param entries: The raw `device_list` of the newer discovery.
+        :return: The new registry and its difference from this one.
+        """
+        previous = {}
+        for device in self._devices:
+            previous.setdefault(device.mac, device)
+
+        diff = DiscoveryDiff()
+        devices: List[Device] = []
+        hashes: Dict[int, int] = {}
+        for raw in entries:
+            fingerprint = content_hash(raw)
+            old = previous.pop(raw.get("mac"), None)
+            if old is not None and self._hash(old) == fingerprint:
+                device = old
+            else:
+                device = Device(raw)
+                if old is None:
+                    diff.added.append(device)
+                else:
+                    diff.changed.append(device)
+                    if getattr(old, "nickname", None) != getattr(
+                        device, "nickname", None
+                    ):
+                        diff.renamed.append(device)
+            hashes[id(device)] = fingerprint
+            devices.append(device)
+        diff.removed = list(previous.values())
+
+        registry = DeviceRegistry(devices)
+        registry._hashes = hashes
+        return registry, diff
+
+    def _hash(self, device: Device) -> int:
+        fingerprint = self._hashes.get(id(device))
+        if fingerprint is None:
+            fingerprint = self._hashes[id(device)] = content_hash(device.raw_dict)
+        return fingerprint
+
+    def get(self, mac: str) -> Optional[Device]:
+        """Return the device with the given MAC address, or None."""
+        return self._by_mac.get(mac)
+
+    def by_type(self, *device_types: DeviceTypes) -> List[Device]:
+        """Return devices whose type is any of `device_types`."""
+        return self._collect(self._by_type, device_types)
+
+    def by_model(self, *product_models: str) -> List[Device]:
+        """Return devices whose product model is any of `product_models`."""
+        return self._collect(self._by_model, product_models)
+
+    def _collect(self, index: Dict, keys: Iterable) -> List[Device]:
+        groups = [index[key] for key in dict.fromkeys(keys) if key in index]
+        if len(groups) == 1:
+            return list(groups[0])
+        devices = [device for group in groups for device in group]
+        devices.sort(key=lambda device: self._position[id(device)])
+        return devices
+
+    def __contains__(self, mac: str) -> bool:
+        return mac in self._by_mac
+
+    def __iter__(self) -> Iterator[Device]:
+        return iter(self._devices)
+
+    def __len__(self) -> int:
+        return len(self._devices)
+
+    def __repr__(self) -> str:
+        return "<DeviceRegistry: {} devices>".format(len(self._devices))
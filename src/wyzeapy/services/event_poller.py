@@ -0,0 +1,121 @@
+#  Copyright (c) 2021. Mulliken, LLC - All Rights Reserved
+#  You may use, distribute and modify this code under the terms
+#  of the attached license. You should have received a copy of
+#  the license with this file. If not, please write to:
+#  katie@mulliken.net to receive a copy
+import asyncio
+import logging
+import time
+from typing import Any, Dict, Optional
+
+from ..types import Event
+from ..utils import index_events_by_mac
+
+_LOGGER = logging.getLogger(__name__)
+"""
+Account-wide camera event polling shared by every camera.
+"""
+
+EVENT_POLL_INTERVAL = 10
+EVENT_PAGE_SIZE = 20
+EVENT_MAX_PAGES = 5
+EVENT_LOOKBACK = 60 * 60
+
+
+class EventPoller:
+    """Fetches the account's event list once per cycle and indexes it by MAC.
+
+    Instead of every camera asking for the newest events on its own, the
+    poller issues one `get_event_list` query per cycle starting at a
+    since-last-seen cursor, and keeps the most recent event for each device.
+
+    Attributes:
+        polls: Number of cycles that reached the API.
+        requests: Number of `get_event_list` pages requested.
+    """
+
+    def __init__(
+        self,
+        service: Any,
+        min_interval: float = EVENT_POLL_INTERVAL,
+        page_size: int = EVENT_PAGE_SIZE,
+        max_pages: int = EVENT_MAX_PAGES,
+    ):
+        """
+        :param service: The service whose `_get_event_list` is used for queries.
+        :param min_interval: Seconds a poll result is reused before querying again.
+        :param page_size: Events requested per page.
+        :param max_pages: Maximum pages fetched per cycle when catching up.
+        """
+        self._service = service
+        self.min_interval = min_interval
+        self.page_size = page_size
+        self.max_pages = max_pages
+        self._cursor = int((time.time() - EVENT_LOOKBACK) * 1000)
+        self._latest: Dict[str, Event] = {}
+        self._last_poll: Optional[float] = None
+        self._lock = asyncio.Lock()
+        self.polls = 0
+        self.requests = 0
+
+    @property
+    def latest_events(self) -> Dict[str, Event]:
+        """The most recent known event for each device MAC."""
+        return self._latest
+
+    def latest_for(self, mac: str) -> Optional[Event]:
+        """Return the most recent known event for a device, without a request."""
+        return self._latest.get(mac)
+
+    def _is_fresh(self) -> bool:
+        return (
+            self._last_poll is not None
+            and time.monotonic() - self._last_poll < self.min_interval
+        )
+
+    async def poll(self) -> Dict[str, Event]:
+        """Fetch events newer than the cursor, at most once per `min_interval`.
+
+        :return: The most recent known event for each device MAC.
+        """
+        if self._is_fresh():
+            return self._latest
+
+        async with self._lock:
+            # Another caller may have polled while we waited for the lock
+            if self._is_fresh():
+                return self._latest
+
+            await self._fetch_new_events()
+            self._last_poll = time.monotonic()
+            self.polls += 1
+            return self._latest
+
+    async def _fetch_new_events(self) -> None:
+        end_time = None
+        newest_ts = self._cursor
+        for _ in range(self.max_pages):
+            response = await self._service._get_event_list(
+                self.page_size, begin_time=self._cursor, end_time=end_time
+            )
+            self.requests += 1
+            events = [Event(raw_event) for raw_event in response["data"]["event_list"]]
+            for mac, event in index_events_by_mac(events).items():
+                known = self._latest.get(mac)
+                if known is None or event.event_ts >= known.event_ts:
+                    self._latest[mac] = event
+
+            if not events:
+                break
+            timestamps = [event.event_ts for event in events]
+            newest_ts = max(newest_ts, max(timestamps) + 1)
+            if len(events) < self.page_size:
+                break
+            # A full page may hide older events; page backwards from the oldest
+            end_time = min(timestamps) - 1
+            if end_time < self._cursor:
+                break
+        else:
+            _LOGGER.debug("Event backlog larger than %s pages", self.max_pages)
+
+        self._cursor = newest_ts
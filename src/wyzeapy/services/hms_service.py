@@ -3,12 +3,17 @@
 #  of the attached license. You should have received a copy of
 #  the license with this file. If not, please write to:
 #  katie@mulliken.net to receive a copy
+import asyncio
+import logging
 from enum import Enum
 from typing import Optional
 
+from ..priority import RequestPriority, request_priority
 from ..wyze_auth_lib import WyzeAuthLib
 from .base_service import BaseService
 
+_LOGGER = logging.getLogger(__name__)
+
 
 class HMSMode(Enum):
     CHANGING = "changing"
@@ -26,14 +31,32 @@ class HMSService(BaseService):
         super().__init__(auth_lib)
 
         self._hms_id = None
+        self._revalidation: Optional[asyncio.Task] = None
 
     @classmethod
-    async def create(cls, auth_lib: WyzeAuthLib):
+    async def create(cls, auth_lib: WyzeAuthLib, hms_id: Optional[str] = None):
+        """
+        :param auth_lib: The authenticated client.
+        :param hms_id: A previously saved HMS id, served at once while it is
+            looked up again in the background.
+        """
         hms_service = cls(auth_lib)
-        hms_service._hms_id = await hms_service._get_hms_id()
+        if hms_id is None:
+            hms_service._hms_id = await hms_service._get_hms_id()
+        else:
+            hms_service._hms_id = hms_id
+            hms_service._revalidation = asyncio.get_running_loop().create_task(
+                hms_service._revalidate_hms_id()
+            )
 
         return hms_service
 
+    async def close(self):
+        """Stop a background HMS id lookup and close LAN connections."""
+        if self._revalidation is not None:
+            self._revalidation.cancel()
+        await super().close()
+
     @property
     def hms_id(self) -> Optional[str]:
         return self._hms_id
@@ -66,6 +89,21 @@ class HMSService(BaseService):
         if self._hms_id is not None:
             return self._hms_id
 
+        self._hms_id = await self._lookup_hms_id()
+        return self._hms_id
+
+    async def _revalidate_hms_id(self):
+        # Replace a provisional HMS id, such as one restored from a snapshot
+        try:
+            with request_priority(RequestPriority.BACKGROUND):
+                await self._auth_lib.refresh_if_should()
+                self._hms_id = await self._lookup_hms_id()
+        except Exception:
+            _LOGGER.warning(
+                "Looking up the HMS id failed, keeping the saved one", exc_info=True
+            )
+
+    async def _lookup_hms_id(self) -> Optional[str]:
         response = await self._get_plan_binding_list_by_user()
         hms_subs = response["data"]
 
@@ -73,7 +111,6 @@ class HMSService(BaseService):
             for sub in hms_subs:
                 if (devices := sub.get("deviceList")) is not None and len(devices) >= 1:
                     for device in devices:
-                        self._hms_id = str(device["device_id"])
-                        return self._hms_id
+                        return str(device["device_id"])
 
         return None
@@ -0,0 +1,131 @@
+#  Copyright (c) 2021. Mulliken, LLC - All Rights Reserved
+#  You may use, distribute and modify this code under the terms
+#  of the attached license. You should have received a copy of
+#  the license with this file. If not, please write to:
+#  katie@mulliken.net to receive a copy
+import weakref
+from typing import Any, Dict, Iterable, Iterator, Mapping, Tuple, Type, TypeVar
+
+from ..snapshot import redact
+from ..types import Device
+
+"""
+One canonical typed object per device, shared by every `get_*` call.
+"""
+
+D = TypeVar("D", bound=Device)
+
+# Decoded state values that can be written to a snapshot as they are
+_PLAIN_TYPES = (bool, int, float, str, type(None))
+_NOT_STATE = frozenset({"raw_dict", "callback_function"})
+# Attributes derived from the discovery entry, or that start from their
+# defaults on every run, which are never restored from a snapshot
+_DISCOVERY_FIELDS = frozenset({"_type", "available", "cloud_fallback", "ip"})
+
+
+def _attributes(device: Device) -> Iterator[Tuple[str, Any]]:
+    """Instance attributes of a device, from its slots and its `__dict__`."""
+    for cls in type(device).__mro__:
+        for name in cls.__dict__.get("__slots__", ()):
+            if not name.startswith("__") and hasattr(device, name):
+                yield name, getattr(device, name)
+    yield from getattr(device, "__dict__", {}).items()
+
+
+def decoded_state(device: Device) -> Dict[str, Any]:
+    """A shallow copy of a device's attributes, without its raw entry and callback."""
+    return {k: v for k, v in _attributes(device) if k not in _NOT_STATE}
+
+
+class IdentityMap:
+    """Weak map from (class, MAC) to the typed device object for that device.
+
+    Objects are held weakly, so a device nobody references any more (for
+    example one removed from the account) is garbage collected.
+
+    Attributes:
+        hits: Lookups that returned an existing object.
+        created: Objects constructed because none was alive.
+    """
+
+    def __init__(self):
+        self._objects: "weakref.WeakValueDictionary[Tuple[type, str], Device]" = (
+            weakref.WeakValueDictionary()
+        )
+        self._seeded: Dict[Tuple[str, str], Mapping[str, Any]] = {}
+        self._seeded_entries: Dict[str, Mapping[str, Any]] = {}
+        self.hits = 0
+        self.created = 0
+
+    def __len__(self) -> int:
+        return len(self._objects)
+
+    def get(self, cls: Type[D], raw: Dict[str, Any]) -> D:
+        """Return the live `cls` object for the device described by `raw`.
+
+        An existing object whose discovery entry has changed takes the new
+        values in place; state decoded by `update` is left untouched.
+
+        :param cls: The typed device class, such as `Bulb`.
+        :param raw: The device's discovery entry.
+        """
+        key = (cls, raw.get("mac"))
+        device = self._objects.get(key)
+        if device is None:
+            device = cls(raw)
+            seeded = self._seeded.pop((cls.__name__, raw.get("mac")), None)
+            # Saved state only applies to the discovery entry it was saved with
+            saved_entry = self._seeded_entries.get(raw.get("mac"))
+            if seeded and saved_entry is not None and redact(raw) == saved_entry:
+                for k, v in seeded.items():
+                    setattr(device, k, v)
+            self._objects[key] = device
+            self.created += 1
+            return device
+
+        self.hits += 1
+        if device.raw_dict is not raw:
+            device.load_raw(raw)
+        return device
+
+    def states(self) -> Dict[str, Dict[str, Dict[str, Any]]]:
+        """Decoded state of every live object, by MAC and class name.
+
+        Only attributes whose values are plain JSON types are included, and
+        none that are derived from the discovery entry.
+        """
+        states: Dict[str, Dict[str, Dict[str, Any]]] = {}
+        for (cls, mac), device in list(self._objects.items()):
+            states.setdefault(mac, {})[cls.__name__] = {
+                k: v
+                for k, v in decoded_state(device).items()
+                if k not in device.raw_dict
+                and k not in _DISCOVERY_FIELDS
+                and isinstance(v, _PLAIN_TYPES)
+            }
+        return states
+
+    def seed(
+        self,
+        states: Mapping[str, Mapping[str, Mapping[str, Any]]],
+        entries: Iterable[Mapping[str, Any]],
+    ):
+        """Apply saved state to objects when they are first created.
+
+        A saved state is dropped if its object is created from a discovery
+        entry other than the saved one, since it may no longer be accurate.
+
+        :param states: Saved state by MAC and class name, from `states()`.
+        :param entries: The redacted discovery entries the states were saved with.
+        """
+        self._seeded = {
+            (class_name, mac): state
+            for mac, by_class in states.items()
+            for class_name, state in by_class.items()
+        }
+        self._seeded_entries = {entry.get("mac"): entry for entry in entries}
+
+    def clear(self):
+        self._objects.clear()
+        self._seeded.clear()
+        self._seeded_entries.clear()
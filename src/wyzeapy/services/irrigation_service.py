@@ -69,6 +69,8 @@ class Zone:
 
 
 class Irrigation(Device):
+    __slots__ = ("RSSI", "IP", "sn", "ssid", "zones")
+
     def __init__(self, dictionary: Dict[Any, Any]):
         super().__init__(dictionary)
 
@@ -124,17 +126,14 @@ class IrrigationService(BaseService):
         return irrigation
 
     async def get_irrigations(self) -> List[Irrigation]:
-        if self._devices is None:
-            self._devices = await self.get_object_list()
-
+        registry = await self._get_registry()
         irrigations = [
             device
-            for device in self._devices
-            if device.type == DeviceTypes.IRRIGATION
-            and "BS_WK1" in device.product_model
+            for device in registry.by_type(DeviceTypes.IRRIGATION)
+            if "BS_WK1" in device.product_model
         ]
 
-        return [Irrigation(irrigation.raw_dict) for irrigation in irrigations]
+        return self._typed(Irrigation, irrigations)
 
     async def start_zone(
         self, irrigation: Device, zone_number: int, quickrun_duration: int
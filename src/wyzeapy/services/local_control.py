@@ -0,0 +1,171 @@
+#  Copyright (c) 2021. Mulliken, LLC - All Rights Reserved
+#  You may use, distribute and modify this code under the terms
+#  of the attached license. You should have received a copy of
+#  the license with this file. If not, please write to:
+#  katie@mulliken.net to receive a copy
+import asyncio
+import logging
+import time
+from typing import Any, Dict, Optional
+
+from aiohttp import ClientSession, ClientTimeout, TCPConnector
+
+from ..types import Device
+
+_LOGGER = logging.getLogger(__name__)
+"""
+Pooled LAN client for sending commands straight to bulbs on the local network.
+"""
+
+LOCAL_CONTROL_PORT = 88
+LOCAL_COMMAND_TIMEOUT = 2.0
+LOCAL_PROBE_TIMEOUT = 1.0
+LOCAL_PROBE_INTERVAL = 60
+LOCAL_KEEPALIVE_TIMEOUT = 30
+
+
+class LocalLatency:
+    """Latency and failure counters for commands sent to one bulb.
+
+    Attributes:
+        commands: Commands that got a response.
+        failures: Commands that failed or timed out.
+        last: Seconds taken by the most recent successful command.
+        max: Slowest successful command in seconds.
+    """
+
+    def __init__(self):
+        self.commands = 0
+        self.failures = 0
+        self.last = 0.0
+        self.max = 0.0
+        self._total = 0.0
+
+    @property
+    def average(self) -> float:
+        """Mean seconds per successful command."""
+        if self.commands == 0:
+            return 0.0
+        return self._total / self.commands
+
+    def record(self, elapsed: float):
+        self.commands += 1
+        self.last = elapsed
+        self.max = max(self.max, elapsed)
+        self._total += elapsed
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "commands": self.commands,
+            "failures": self.failures,
+            "last": self.last,
+            "average": self.average,
+            "max": self.max,
+        }
+
+    def __repr__(self) -> str:
+        return "<LocalLatency: {}>".format(self.as_dict())
+
+
+class LocalControlClient:
+    """Sends `device_request` commands to bulbs over kept-alive LAN connections.
+
+    One connection is kept open per bulb IP and every command is bounded by
+    `timeout`. Bulbs that fell back to the cloud can be handed to `watch`,
+    which probes them in the background and clears `cloud_fallback` once they
+    accept connections again.
+
+    Attributes:
+        latency: `LocalLatency` counters keyed by bulb IP.
+    """
+
+    def __init__(
+        self,
+        timeout: float = LOCAL_COMMAND_TIMEOUT,
+        probe_interval: float = LOCAL_PROBE_INTERVAL,
+        probe_timeout: float = LOCAL_PROBE_TIMEOUT,
+    ):
+        """
+        :param timeout: Seconds a single local command may take.
+        :param probe_interval: Seconds between health probes of a fallen back bulb.
+        :param probe_timeout: Seconds a health probe may take to connect.
+        """
+        self.timeout = timeout
+        self.probe_interval = probe_interval
+        self.probe_timeout = probe_timeout
+        self.latency: Dict[str, LocalLatency] = {}
+        self._session: Optional[ClientSession] = None
+        self._probes: Dict[str, asyncio.Task] = {}
+
+    @property
+    def session(self) -> ClientSession:
+        """The keep-alive session used for local commands, created on first use."""
+        if self._session is None or self._session.closed:
+            self._session = ClientSession(
+                connector=TCPConnector(
+                    # Bulbs handle one request at a time; reuse a single socket
+                    limit_per_host=1,
+                    keepalive_timeout=LOCAL_KEEPALIVE_TIMEOUT,
+                ),
+                timeout=ClientTimeout(total=self.timeout),
+            )
+        return self._session
+
+    async def send(self, ip: str, data: str) -> str:
+        """Post a command to a bulb and return its response body.
+
+        :param ip: IP address of the bulb
+        :param data: The serialized `device_request` payload
+        :raises aiohttp.ClientError: If the bulb could not be reached
+        :raises asyncio.TimeoutError: If the bulb did not answer within `timeout`
+        """
+        latency = self.latency.setdefault(ip, LocalLatency())
+        url = "http://%s:%s/device_request" % (ip, LOCAL_CONTROL_PORT)
+        start = time.monotonic()
+        try:
+            async with self.session.post(url, data=data) as response:
+                text = await response.text()
+        except Exception:
+            latency.failures += 1
+            raise
+        latency.record(time.monotonic() - start)
+        return text
+
+    async def probe(self, ip: str) -> bool:
+        """Check whether a bulb accepts connections on its control port."""
+        try:
+            _, writer = await asyncio.wait_for(
+                asyncio.open_connection(ip, LOCAL_CONTROL_PORT), self.probe_timeout
+            )
+        except (OSError, asyncio.TimeoutError):
+            return False
+        writer.close()
+        return True
+
+    def watch(self, bulb: Device) -> None:
+        """Probe a bulb in the background until it can be controlled locally."""
+        task = self._probes.get(bulb.mac)
+        if task is not None and not task.done():
+            return
+        self._probes[bulb.mac] = asyncio.get_running_loop().create_task(
+            self._probe_until_reachable(bulb)
+        )
+
+    async def _probe_until_reachable(self, bulb: Device) -> None:
+        while True:
+            await asyncio.sleep(self.probe_interval)
+            if await self.probe(bulb.ip):
+                _LOGGER.info(
+                    "Bulb %s is reachable again, using local control", bulb.mac
+                )
+                bulb.cloud_fallback = False
+                return
+
+    async def close(self) -> None:
+        """Stop health probes and close the local connections."""
+        for task in self._probes.values():
+            task.cancel()
+        self._probes.clear()
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
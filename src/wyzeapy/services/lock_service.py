@@ -3,6 +3,8 @@
 #  of the attached license. You should have received a copy of
 #  the license with this file. If not, please write to:
 #  katie@mulliken.net to receive a copy
+from typing import Any, Dict
+
 from .base_service import BaseService
 from ..const import FORD_APP_SECRET
 from ..types import Device, DeviceTypes
@@ -10,13 +12,25 @@ from ..utils import wyze_decrypt_cbc
 
 
 class Lock(Device):
-    unlocked = False
-    locking = False
-    unlocking = False
-    door_open = False
-    trash_mode = False
-    ble_id = None
-    ble_token = None
+    __slots__ = (
+        "unlocked",
+        "locking",
+        "unlocking",
+        "door_open",
+        "trash_mode",
+        "ble_id",
+        "ble_token",
+    )
+
+    def __init__(self, dictionary: Dict[Any, Any]):
+        self.unlocked = False
+        self.locking = False
+        self.unlocking = False
+        self.door_open = False
+        self.trash_mode = False
+        self.ble_id = None
+        self.ble_token = None
+        super().__init__(dictionary)
 
 
 class LockService(BaseService):
@@ -49,12 +63,10 @@ class LockService(BaseService):
         return lock
 
     async def get_locks(self):
-        if self._devices is None:
-            self._devices = await self.get_object_list()
-
-        locks = [device for device in self._devices if device.type is DeviceTypes.LOCK]
+        registry = await self._get_registry()
+        locks = registry.by_type(DeviceTypes.LOCK)
 
-        return [Lock(device.raw_dict) for device in locks]
+        return self._typed(Lock, locks)
 
     async def lock(self, lock: Lock):
         await self._lock_control(lock, "remoteLock")
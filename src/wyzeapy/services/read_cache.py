@@ -0,0 +1,109 @@
+#  Copyright (c) 2021. Mulliken, LLC - All Rights Reserved
+#  You may use, distribute and modify this code under the terms
+#  of the attached license. You should have received a copy of
+#  the license with this file. If not, please write to:
+#  katie@mulliken.net to receive a copy
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+"""
+Short-lived cache for device state reads.
+"""
+
+READ_CACHE_SIZE = 512
+
+# Returned by `ReadCache.get` when there is no fresh entry
+MISSING = object()
+
+
+class ReadCache:
+    """LRU cache of read results that expire after a per-entry TTL.
+
+    Entries are tagged with the MAC of the device they describe so that a
+    write to the device can drop them. Each device also has a generation
+    that writes bump; a read that started before a write refuses to store
+    its now possibly stale result.
+
+    Attributes:
+        hits: Lookups answered from the cache.
+        misses: Lookups that had to go to the network.
+        evictions: Entries dropped to stay within `max_entries`.
+        invalidations: Entries dropped because their device was written to.
+    """
+
+    def __init__(self, max_entries: int = READ_CACHE_SIZE):
+        """
+        :param max_entries: Number of entries kept before evicting the least
+            recently used one.
+        """
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Hashable, Tuple[float, Optional[str], Any]]" = (
+            OrderedDict()
+        )
+        self._generations: Dict[str, int] = {}
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: Hashable) -> Any:
+        """Return the fresh value for `key`, or `MISSING`."""
+        entry = self._entries.get(key)
+        if entry is not None:
+            expires, _, value = entry
+            if expires > time.monotonic():
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return value
+            del self._entries[key]
+        self.misses += 1
+        return MISSING
+
+    def generation(self, mac: Optional[str]) -> int:
+        """Current write generation of a device."""
+        return self._generations.get(mac, 0) if mac is not None else 0
+
+    def put(
+        self,
+        key: Hashable,
+        value: Any,
+        ttl: float,
+        mac: Optional[str] = None,
+        generation: int = 0,
+    ) -> None:
+        """Store `value` for `ttl` seconds unless the device was written since
+        `generation` was read."""
+        if self.generation(mac) != generation:
+            return
+        self._entries[key] = (time.monotonic() + ttl, mac, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def invalidate_device(self, mac: str) -> None:
+        """Drop every entry for a device and reject reads already in flight."""
+        self._generations[mac] = self._generations.get(mac, 0) + 1
+        stale = [key for key, (_, owner, _) in self._entries.items() if owner == mac]
+        for key in stale:
+            del self._entries[key]
+        self.invalidations += len(stale)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+        }
+
+    def __repr__(self) -> str:
+        return "<ReadCache: {}>".format(self.as_dict())
@@ -3,99 +3,95 @@
 #  of the attached license. You should have received a copy of
 #  the license with this file. If not, please write to:
 #  katie@mulliken.net to receive a copy
-import asyncio
 import logging
-from threading import Thread
-from typing import List, Callable, Tuple, Optional
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
-from aiohttp import ClientOSError, ContentTypeError
-
-from ..exceptions import UnknownApiError
 from .base_service import BaseService
+from .decoders import Field, compile_decoder, is_one
+from .subscriptions import SubscriptionManager
 from ..types import Device, PropertyIDs, DeviceTypes
+from ..wyze_auth_lib import WyzeAuthLib
 
 _LOGGER = logging.getLogger(__name__)
 
+# device_params key that carries each sensor type's state in discovery
+DISCOVERY_STATE_PARAMS = {
+    DeviceTypes.CONTACT_SENSOR: "open_close_state",
+    DeviceTypes.MOTION_SENSOR: "motion_state",
+}
+
+SENSOR_FIELDS = {
+    PropertyIDs.CONTACT_STATE: Field("detected", is_one),
+    PropertyIDs.MOTION_STATE: Field("detected", is_one),
+}
+
+decode_sensor = compile_decoder(SENSOR_FIELDS)
+
 
 class Sensor(Device):
-    detected: bool = False
+    __slots__ = ("detected",)
+
+    def __init__(self, dictionary: Dict[Any, Any]):
+        self.detected: bool = False
+        super().__init__(dictionary)
+
+    def is_active(self) -> bool:
+        # An open contact sensor or a motion sensor seeing motion
+        return self.detected
 
 
 class SensorService(BaseService):
-    _updater_thread: Optional[Thread] = None
-    _subscribers: List[Tuple[Sensor, Callable[[Sensor], None]]] = []
+    def __init__(self, auth_lib: WyzeAuthLib):
+        super().__init__(auth_lib)
+        self._subscriptions = SubscriptionManager(
+            lambda sensor: self.update(sensor), _LOGGER
+        )
+
+    @property
+    def _subscribers(self) -> List[Tuple[Sensor, Callable[[Sensor], None]]]:
+        return self._subscriptions.subscribers
 
     async def update(self, sensor: Sensor) -> Sensor:
+        if self.bulk_state:
+            discovered = await self._discovered_device(sensor.mac)
+            param = DISCOVERY_STATE_PARAMS.get(sensor.type)
+            if discovered is not None and param in discovered.device_params:
+                sensor.device_params = discovered.device_params
+                sensor.detected = str(discovered.device_params[param]) == "1"
+                return sensor
+
         # Get updated device_params
-        async with BaseService._update_lock:
-            sensor.device_params = await self.get_updated_params(sensor.mac)
+        sensor.device_params = await self.get_updated_params(sensor.mac)
         properties = await self._get_device_info(sensor)
-
-        for property in properties["data"]["property_list"]:
-            pid = property["pid"]
-            value = property["value"]
-
-            try:
-                if PropertyIDs(pid) == PropertyIDs.CONTACT_STATE:
-                    sensor.detected = value == "1"
-                if PropertyIDs(pid) == PropertyIDs.MOTION_STATE:
-                    sensor.detected = value == "1"
-            except ValueError:
-                pass
-
-        return sensor
+        return decode_sensor(
+            sensor,
+            (
+                (prop["pid"], prop["value"])
+                for prop in properties["data"]["property_list"]
+            ),
+        )
 
     async def register_for_updates(
-        self, sensor: Sensor, callback: Callable[[Sensor], None]
+        self,
+        sensor: Sensor,
+        callback: Callable[[Sensor], None],
+        interval: Optional[float] = None,
     ):
+        """Poll `sensor` from an event-loop task and pass each update to `callback`.
+
+        :param sensor: The sensor to keep updated.
+        :param callback: Called with the updated sensor after every poll.
+        :param interval: Seconds between polls, defaults to SUBSCRIPTION_INTERVAL.
+        """
         _LOGGER.debug(f"Registering sensor: {sensor.nickname} for updates")
-        loop = asyncio.get_event_loop()
-        if not self._updater_thread:
-            self._updater_thread = Thread(
-                target=self.update_worker,
-                args=[
-                    loop,
-                ],
-                daemon=True,
-            )
-            self._updater_thread.start()
-
-        self._subscribers.append((sensor, callback))
+        self._subscriptions.subscribe(sensor, callback, interval)
 
     async def deregister_for_updates(self, sensor: Sensor):
-        self._subscribers = [
-            (sense, callback)
-            for sense, callback in self._subscribers
-            if sense.mac != sensor.mac
-        ]
-
-    def update_worker(self, loop):
-        while True:
-            for sensor, callback in self._subscribers:
-                _LOGGER.debug(f"Providing update for {sensor.nickname}")
-                try:
-                    callback(
-                        asyncio.run_coroutine_threadsafe(
-                            self.update(sensor), loop
-                        ).result()
-                    )
-                except UnknownApiError as e:
-                    _LOGGER.warning(
-                        f"The update method detected an UnknownApiError: {e}"
-                    )
-                except ClientOSError as e:
-                    _LOGGER.error(f"A network error was detected: {e}")
-                except ContentTypeError as e:
-                    _LOGGER.error(f"Server returned unexpected ContentType: {e}")
+        self._subscriptions.unsubscribe(sensor)
 
     async def get_sensors(self) -> List[Sensor]:
-        if self._devices is None:
-            self._devices = await self.get_object_list()
-
-        sensors = [
-            Sensor(device.raw_dict)
-            for device in self._devices
-            if device.type is DeviceTypes.MOTION_SENSOR
-            or device.type is DeviceTypes.CONTACT_SENSOR
-        ]
-        return [Sensor(sensor.raw_dict) for sensor in sensors]
+        registry = await self._get_registry()
+        sensors = registry.by_type(
+            DeviceTypes.MOTION_SENSOR, DeviceTypes.CONTACT_SENSOR
+        )
+        return self._typed(Sensor, sensors)
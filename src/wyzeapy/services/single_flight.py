@@ -0,0 +1,88 @@
+#  Copyright (c) 2021. Mulliken, LLC - All Rights Reserved
+#  You may use, distribute and modify this code under the terms
+#  of the attached license. You should have received a copy of
+#  the license with this file. If not, please write to:
+#  katie@mulliken.net to receive a copy
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Dict, Hashable, TypeVar
+
+_LOGGER = logging.getLogger(__name__)
+"""
+Single-flight coalescing of identical in-flight requests.
+
+When several callers ask for the same read at the same time, only the first
+one reaches the network; the others wait on its result.
+"""
+
+T = TypeVar("T")
+
+
+class SingleFlight:
+    """Shares one in-flight call between concurrent callers using the same key.
+
+    Attributes:
+        calls: Total calls made through `do`.
+        executions: Calls that actually ran the wrapped coroutine.
+        deduplicated: Calls that joined an already running request instead.
+    """
+
+    def __init__(self):
+        self._inflight: Dict[Hashable, asyncio.Future] = {}
+        self.calls = 0
+        self.executions = 0
+        self.deduplicated = 0
+
+    @property
+    def in_flight(self) -> int:
+        """Number of distinct requests currently running."""
+        return len(self._inflight)
+
+    async def do(self, key: Hashable, func: Callable[[], Awaitable[T]]) -> T:
+        """Run `func()` unless a call with the same key is already running.
+
+        All callers sharing a key receive the same result, or the same
+        exception. Cancelling one caller does not cancel the shared request.
+
+        Args:
+            key: Hashable identity of the request.
+            func: Zero-argument coroutine function performing the request.
+
+        Returns:
+            The result of the shared call.
+        """
+        self.calls += 1
+        future = self._inflight.get(key)
+        if future is not None and future.get_loop() is asyncio.get_running_loop():
+            self.deduplicated += 1
+            _LOGGER.debug("Joining in-flight request %s", key)
+            return await asyncio.shield(future)
+
+        self.executions += 1
+        future = asyncio.ensure_future(func())
+        self._inflight[key] = future
+        future.add_done_callback(lambda done: self._forget(key, done))
+        return await asyncio.shield(future)
+
+    def _forget(self, key: Hashable, future: asyncio.Future) -> None:
+        if self._inflight.get(key) is future:
+            del self._inflight[key]
+        if not future.cancelled():
+            # Mark the exception as retrieved; every waiter re-raises it anyway.
+            future.exception()
+
+    def reset_stats(self) -> None:
+        self.calls = 0
+        self.executions = 0
+        self.deduplicated = 0
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "calls": self.calls,
+            "executions": self.executions,
+            "deduplicated": self.deduplicated,
+            "in_flight": self.in_flight,
+        }
+
+    def __repr__(self) -> str:
+        return "<SingleFlight: {}>".format(self.as_dict())
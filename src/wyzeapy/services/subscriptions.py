@@ -0,0 +1,111 @@
+#  Copyright (c) 2021. Mulliken, LLC - All Rights Reserved
+#  You may use, distribute and modify this code under the terms
+#  of the attached license. You should have received a copy of
+#  the license with this file. If not, please write to:
+#  katie@mulliken.net to receive a copy
+import asyncio
+import logging
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+
+from aiohttp import ClientOSError, ContentTypeError
+
+from ..exceptions import CircuitOpenError, UnknownApiError
+from ..priority import RequestPriority, request_priority
+from ..types import Device
+
+"""
+Event-loop based polling for devices registered with `register_for_updates`.
+"""
+
+SUBSCRIPTION_INTERVAL = 10
+MAX_CONCURRENT_SUBSCRIPTION_UPDATES = 4
+
+
+class SubscriptionManager:
+    """Polls each subscribed device from its own asyncio task.
+
+    Every subscriber gets a task that updates the device, hands the result to
+    its callback and then sleeps for its interval. A semaphore bounds how many
+    updates run at once, and unsubscribing cancels the device's task.
+
+    Attributes:
+        subscribers: `(device, callback)` pairs currently subscribed.
+    """
+
+    def __init__(
+        self,
+        update: Callable[[Device], Awaitable[Device]],
+        logger: logging.Logger,
+        interval: float = SUBSCRIPTION_INTERVAL,
+        max_concurrent_updates: int = MAX_CONCURRENT_SUBSCRIPTION_UPDATES,
+    ):
+        """
+        :param update: Coroutine function that refreshes a device.
+        :param logger: Logger used to report update failures.
+        :param interval: Default seconds between updates of one device.
+        :param max_concurrent_updates: How many updates may run at once.
+        """
+        self._update = update
+        self._logger = logger
+        self.interval = interval
+        self._semaphore = asyncio.Semaphore(max_concurrent_updates)
+        self.subscribers: List[Tuple[Device, Callable[[Device], None]]] = []
+        self._tasks: Dict[str, asyncio.Task] = {}
+
+    def subscribe(
+        self,
+        device: Device,
+        callback: Callable[[Device], None],
+        interval: Optional[float] = None,
+    ) -> None:
+        """Start polling `device`, replacing an existing subscription for it."""
+        self.unsubscribe(device)
+        self.subscribers.append((device, callback))
+        self._tasks[device.mac] = asyncio.get_running_loop().create_task(
+            self._poll(device, callback, interval or self.interval)
+        )
+
+    def unsubscribe(self, device: Device) -> None:
+        """Stop polling `device` and cancel its task."""
+        self.subscribers = [
+            (subscribed, callback)
+            for subscribed, callback in self.subscribers
+            if subscribed.mac != device.mac
+        ]
+        task = self._tasks.pop(device.mac, None)
+        if task is not None:
+            task.cancel()
+
+    def unsubscribe_all(self) -> None:
+        """Cancel every subscription."""
+        for device, _ in list(self.subscribers):
+            self.unsubscribe(device)
+
+    async def _poll(
+        self, device: Device, callback: Callable[[Device], None], interval: float
+    ) -> None:
+        while True:
+            async with self._semaphore:
+                await self._update_once(device, callback)
+            await asyncio.sleep(interval)
+
+    async def _update_once(
+        self, device: Device, callback: Callable[[Device], None]
+    ) -> None:
+        self._logger.debug(
+            f"Providing update for {getattr(device, 'nickname', device.mac)}"
+        )
+        try:
+            with request_priority(RequestPriority.BACKGROUND):
+                updated = await self._update(device)
+            callback(updated)
+        except UnknownApiError as e:
+            self._logger.warning(f"The update method detected an UnknownApiError: {e}")
+        except ClientOSError as e:
+            self._logger.error(f"A network error was detected: {e}")
+        except ContentTypeError as e:
+            self._logger.error(f"Server returned unexpected ContentType: {e}")
+        except CircuitOpenError as e:
+            self._logger.debug(f"Skipped update: {e}")
+        except Exception:
+            self._logger.exception(f"Unexpected error while updating {device.mac}")
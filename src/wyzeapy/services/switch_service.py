@@ -3,14 +3,25 @@
 #  of the attached license. You should have received a copy of
 #  the license with this file. If not, please write to:
 #  katie@mulliken.net to receive a copy
-from typing import List, Dict, Any
+from typing import Iterable, List, Dict, Any
 
 from .base_service import BaseService
+from .decoders import Field, compile_decoder, is_one
 from ..types import Device, DeviceTypes, PropertyIDs
+from ..utils import create_pid_pair
 from datetime import timedelta, datetime
 
+SWITCH_FIELDS = {
+    PropertyIDs.ON: Field("on", is_one),
+    PropertyIDs.AVAILABLE: Field("available", is_one),
+}
+
+decode_switch = compile_decoder(SWITCH_FIELDS)
+
 
 class Switch(Device):
+    __slots__ = ("on",)
+
     def __init__(self, dictionary: Dict[Any, Any]):
         super().__init__(dictionary)
         self.on: bool = False
@@ -18,31 +29,24 @@ class Switch(Device):
 
 class SwitchService(BaseService):
     async def update(self, switch: Switch):
+        if self.bulk_state:
+            discovered = await self._discovered_device(switch.mac)
+            if discovered is not None and "switch_state" in discovered.device_params:
+                switch.device_params = discovered.device_params
+                switch.on = str(discovered.device_params["switch_state"]) == "1"
+                switch.available = str(discovered.raw_dict.get("conn_state")) == "1"
+                return switch
+
         # Get updated device_params
-        async with BaseService._update_lock:
-            switch.device_params = await self.get_updated_params(switch.mac)
+        switch.device_params = await self.get_updated_params(switch.mac)
 
         device_info = await self._get_property_list(switch)
-
-        for property_id, value in device_info:
-            if property_id == PropertyIDs.ON:
-                switch.on = value == "1"
-            elif property_id == PropertyIDs.AVAILABLE:
-                switch.available = value == "1"
-
-        return switch
+        return decode_switch(switch, device_info)
 
     async def get_switches(self) -> List[Switch]:
-        if self._devices is None:
-            self._devices = await self.get_object_list()
-
-        devices = [
-            device
-            for device in self._devices
-            if device.type is DeviceTypes.PLUG
-            or device.type is DeviceTypes.OUTDOOR_PLUG
-        ]
-        return [Switch(switch.raw_dict) for switch in devices]
+        registry = await self._get_registry()
+        devices = registry.by_type(DeviceTypes.PLUG, DeviceTypes.OUTDOOR_PLUG)
+        return self._typed(Switch, devices)
 
     async def turn_on(self, switch: Switch):
         await self._set_property(switch, PropertyIDs.ON.value, "1")
@@ -50,6 +54,30 @@ class SwitchService(BaseService):
     async def turn_off(self, switch: Switch):
         await self._set_property(switch, PropertyIDs.ON.value, "0")
 
+    async def set_many(
+        self, switches: Iterable[Switch], plist: List[Dict[str, str]]
+    ) -> List[Switch]:
+        """Apply the same property changes to many switches with batched requests.
+
+        Changes are packed into `device_list/set_property_list` requests of up to
+        `DEVICE_LIST_BATCH_SIZE` devices, falling back per device on failure.
+
+        :param switches: The switches to change
+        :param plist: A list of properties [{"pid": pid, "pvalue": pvalue},...]
+        :return: Switches whose change could not be applied
+        """
+        return await self._set_many_device_list_property_lists(
+            [(switch, list(plist)) for switch in switches]
+        )
+
+    async def turn_on_many(self, switches: Iterable[Switch]) -> List[Switch]:
+        """Turn on many switches with batched requests. See `set_many`."""
+        return await self.set_many(switches, [create_pid_pair(PropertyIDs.ON, "1")])
+
+    async def turn_off_many(self, switches: Iterable[Switch]) -> List[Switch]:
+        """Turn off many switches with batched requests. See `set_many`."""
+        return await self.set_many(switches, [create_pid_pair(PropertyIDs.ON, "0")])
+
 
 class SwitchUsageService(SwitchService):
     """Class to retrieve the last 25 hours of usage data."""
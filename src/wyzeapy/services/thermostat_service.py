@@ -8,6 +8,7 @@ from enum import Enum
 from typing import Any, Dict, List
 
 from .base_service import BaseService
+from .decoders import Field, compile_decoder, is_connected
 from ..types import Device, ThermostatProps, DeviceTypes
 
 _LOGGER = logging.getLogger(__name__)
@@ -43,6 +44,18 @@ class HVACState(Enum):
 
 
 class Thermostat(Device):
+    __slots__ = (
+        "temp_unit",
+        "cool_set_point",
+        "heat_set_point",
+        "fan_mode",
+        "hvac_mode",
+        "preset",
+        "temperature",
+        "humidity",
+        "hvac_state",
+    )
+
     def __init__(self, dictionary: Dict[Any, Any]):
         super().__init__(dictionary)
 
@@ -57,53 +70,36 @@ class Thermostat(Device):
         self.humidity: int = 50
         self.hvac_state: HVACState = HVACState.IDLE
 
+    def is_active(self) -> bool:
+        return self.hvac_state in (HVACState.HEATING, HVACState.COOLING)
+
+
+THERMOSTAT_FIELDS = {
+    ThermostatProps.TEMP_UNIT: Field("temp_unit", TemperatureUnit),
+    ThermostatProps.COOL_SP: Field("cool_set_point", int),
+    ThermostatProps.HEAT_SP: Field("heat_set_point", int),
+    ThermostatProps.FAN_MODE: Field("fan_mode", FanMode),
+    ThermostatProps.MODE_SYS: Field("hvac_mode", HVACMode),
+    ThermostatProps.CURRENT_SCENARIO: Field("preset", Preset),
+    ThermostatProps.TEMPERATURE: Field("temperature", float),
+    ThermostatProps.IOT_STATE: Field("available", is_connected),
+    ThermostatProps.HUMIDITY: Field("humidity", int),
+    ThermostatProps.WORKING_STATE: Field("hvac_state", HVACState),
+}
+
+decode_thermostat = compile_decoder(THERMOSTAT_FIELDS)
+
 
 class ThermostatService(BaseService):
     async def update(self, thermostat: Thermostat) -> Thermostat:
         properties = (await self._thermostat_get_iot_prop(thermostat))["data"]["props"]
-
-        device_props = []
-        for property in properties:
-            try:
-                prop = ThermostatProps(property)
-                device_props.append((prop, properties[property]))
-            except ValueError as e:
-                _LOGGER.debug(f"{e} with value {properties[property]}")
-
-        thermostat_props = device_props
-        for prop, value in thermostat_props:
-            if prop == ThermostatProps.TEMP_UNIT:
-                thermostat.temp_unit = TemperatureUnit(value)
-            elif prop == ThermostatProps.COOL_SP:
-                thermostat.cool_set_point = int(value)
-            elif prop == ThermostatProps.HEAT_SP:
-                thermostat.heat_set_point = int(value)
-            elif prop == ThermostatProps.FAN_MODE:
-                thermostat.fan_mode = FanMode(value)
-            elif prop == ThermostatProps.MODE_SYS:
-                thermostat.hvac_mode = HVACMode(value)
-            elif prop == ThermostatProps.CURRENT_SCENARIO:
-                thermostat.preset = Preset(value)
-            elif prop == ThermostatProps.TEMPERATURE:
-                thermostat.temperature = float(value)
-            elif prop == ThermostatProps.IOT_STATE:
-                thermostat.available = value == "connected"
-            elif prop == ThermostatProps.HUMIDITY:
-                thermostat.humidity = int(value)
-            elif prop == ThermostatProps.WORKING_STATE:
-                thermostat.hvac_state = HVACState(value)
-
-        return thermostat
+        return decode_thermostat(thermostat, properties.items())
 
     async def get_thermostats(self) -> List[Thermostat]:
-        if self._devices is None:
-            self._devices = await self.get_object_list()
-
-        thermostats = [
-            device for device in self._devices if device.type is DeviceTypes.THERMOSTAT
-        ]
+        registry = await self._get_registry()
+        thermostats = registry.by_type(DeviceTypes.THERMOSTAT)
 
-        return [Thermostat(thermostat.raw_dict) for thermostat in thermostats]
+        return self._typed(Thermostat, thermostats)
 
     async def set_cool_point(self, thermostat: Device, temp: int):
         await self._thermostat_set_iot_prop(thermostat, ThermostatProps.COOL_SP, temp)
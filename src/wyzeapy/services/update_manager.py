@@ -1,23 +1,51 @@
-from asyncio import sleep
+import asyncio
+from collections import deque
 from dataclasses import dataclass, field
 from heapq import heappush, heappop
-from typing import Any
+from typing import Any, Deque, Dict, List, Optional, Set
 from math import ceil
-from ..types import Device
+from ..circuit_breaker import track_hosts
+from ..exceptions import CircuitOpenError
+from ..priority import RequestPriority, request_priority
+from ..types import Device, DeviceTypes
+from .identity_map import decoded_state
 import logging
-import threading
 
 """
 Asynchronous device update scheduling and management.
 
 This module provides classes to schedule and execute periodic updates of
 Wyze devices, ensuring rate limits and fair distribution of update calls.
+Each device's share of the budget adapts to how volatile it is: devices in an
+active state (see `Device.is_active`) or whose updates keep changing their
+state are polled more often, idle ones less.
 """
 
 _LOGGER = logging.getLogger(__name__)
 
 INTERVAL = 300
 MAX_SLOTS = 225
+MAX_CONCURRENT_UPDATES = 8
+
+# Weight of the latest update in a device's moving average change rate
+CHANGE_RATE_WEIGHT = 0.2
+# Updates observed before a device's change rate is trusted
+MIN_SAMPLES = 3
+# Multipliers of the requested update rate for a change rate of 0 and of 1
+IDLE_SCALE = 0.25
+VOLATILE_SCALE = 2.0
+# Volatile devices are not polled more often than this many seconds
+MIN_ADAPTIVE_INTERVAL = 10
+# Security devices are never polled less often than requested, however idle
+SECURITY_TYPES = frozenset(
+    {
+        DeviceTypes.CONTACT_SENSOR,
+        DeviceTypes.MOTION_SENSOR,
+        DeviceTypes.LEAK_SENSOR,
+        DeviceTypes.LOCK,
+        DeviceTypes.KEYPAD,
+    }
+)
 
 
 @dataclass(order=True)
@@ -27,56 +55,124 @@ class DeviceUpdater(object):
     Attributes:
         service: The service instance responsible for updating the device.
         device: The Device object to be updated.
-        update_in: Countdown ticks until the next update is due.
-        updates_per_interval: Number of updates allowed per INTERVAL.
+        next_update: Event loop time at which the next update is due.
+        updates_per_interval: Number of updates granted per INTERVAL.
+        adaptive_updates: Updates per INTERVAL after adapting to the change
+            rate, or None while the granted share is used as is.
+        change_rate: Moving average of the fraction of updates that changed
+            the device's state, or None before the first update.
+        samples: Number of updates that contributed to `change_rate`.
+        removed: Set once the updater has been unregistered.
+        hosts: Backend hosts contacted by the most recent update.
     """
 
     device: Device = field(compare=False)
     service: Any = field(compare=False)
-    update_in: int  # Countdown ticks until this device should be updated
+    next_update: float  # Loop time at which this device should next be updated
     updates_per_interval: int = field(compare=False)
+    adaptive_updates: Optional[int] = field(compare=False)
+    change_rate: Optional[float] = field(compare=False)
+    samples: int = field(compare=False)
+    removed: bool = field(compare=False)
+    hosts: Set[str] = field(compare=False)
 
     def __init__(self, service, device: Device, update_interval: int):
         """
         This function initializes a DeviceUpdater object
         :param service: The WyzeApy service connected to a device
         :param device: A WyzeApy device that needs to be in the update que
-        :param update_interval: How many seconds should be targeted between updates. **Note this value may shift based on 1 call per sec and load.
+        :param update_interval: How many seconds should be targeted between updates.
+            **Note this value may shift based on the global request budget.
         """
         self.service = service
         self.device = device
-        self.update_in = 0  # Always initialize at 0 so that we get the first update ASAP. The items will shift based on priority after this.
+        # Always due immediately so that we get the first update ASAP.
+        self.next_update = 0.0
         self.updates_per_interval = ceil(INTERVAL / update_interval)
+        self.adaptive_updates = None
+        self.change_rate = None
+        self.samples = 0
+        self.removed = False
+        self.hosts = set()
 
-    async def update(self, mutex: threading.Lock):
-        # We only want to update if the update_in counter is zero
-        if self.update_in <= 0:
-            _LOGGER.debug("Updating device: " + self.device.nickname)
-            # Acquire the mutex before making the async call
-            mutex.acquire()
-            try:
-                # Get the updated info for the device from Wyze's API
-                self.device = await self.service.update(self.device)
-                # Callback to provide the updated info to the subscriber
-                self.device.callback_function(self.device)
-            except Exception:
-                _LOGGER.exception("Unknown error happened during updating device info")
-            finally:
-                # Release the mutex after the async call
-                mutex.release()
-            # Once it reaches zero and we update the device we want to reset the update_in counter
-            self.update_in = ceil(INTERVAL / self.updates_per_interval)
+    @property
+    def effective_updates(self) -> int:
+        """Updates per INTERVAL the device is actually polled at."""
+        if self.adaptive_updates is None:
+            return self.updates_per_interval
+        return self.adaptive_updates
+
+    @property
+    def interval(self) -> float:
+        """Effective seconds between updates, after adapting to the change rate."""
+        return INTERVAL / self.effective_updates
+
+    def observe(self, changed: bool):
+        # Fold the outcome of one update into the moving average change rate
+        if self.change_rate is None:
+            self.change_rate = float(changed)
         else:
-            # Don't update and instead just reduce the counter by 1
-            self.tick_tock()
+            self.change_rate += CHANGE_RATE_WEIGHT * (changed - self.change_rate)
+        self.samples += 1
+
+    def target_updates(self) -> Optional[int]:
+        """Updates per INTERVAL the device's volatility asks for, ignoring the budget.
 
-    def tick_tock(self):
-        # Every time we update a device we want to reduce the update_in counter so that it will get closer to updating
-        if self.update_in > 0:
-            self.update_in -= 1
+        A device that reports itself active, such as an open contact sensor, a
+        running purifier or a heating thermostat, counts as fully volatile
+        even if its reported state stays the same. Otherwise the change rate
+        decides, and the result is None until MIN_SAMPLES updates have been
+        observed. Devices in SECURITY_TYPES never go below their grant.
+        """
+        active = self.device.is_active()
+        if active:
+            change_rate = 1.0
+        elif self.samples >= MIN_SAMPLES:
+            change_rate = self.change_rate
+        else:
+            return None
+        scale = IDLE_SCALE + (VOLATILE_SCALE - IDLE_SCALE) * change_rate
+        target = max(1, round(self.updates_per_interval * scale))
+        if self.device.type in SECURITY_TYPES:
+            target = max(target, self.updates_per_interval)
+        if target > self.updates_per_interval:
+            # Speeding up stops at MIN_ADAPTIVE_INTERVAL, but never below the grant
+            ceiling = max(self.updates_per_interval, INTERVAL // MIN_ADAPTIVE_INTERVAL)
+            target = min(target, ceiling)
+        return target
+
+    async def update(self):
+        _LOGGER.debug("Updating device: " + self.device.nickname)
+        hosts = self.hosts
+        try:
+            before = decoded_state(self.device)
+            # Get the updated info for the device from Wyze's API
+            with request_priority(RequestPriority.BACKGROUND), track_hosts() as hosts:
+                self.device = await self.service.update(self.device)
+            self.observe(decoded_state(self.device) != before)
+            # Callback to provide the updated info to the subscriber
+            self.device.callback_function(self.device)
+        except CircuitOpenError as e:
+            _LOGGER.debug(f"Skipped updating {self.device.nickname}: {e}")
+        except Exception:
+            _LOGGER.exception("Unknown error happened during updating device info")
+        finally:
+            self.hosts = hosts
+
+    def backend_available(self) -> bool:
+        # False while the circuit of any backend the device was updated from is open
+        if not self.hosts:
+            return True
+        breakers = self.service.circuit_breakers
+        return not any(breakers.is_open(host) for host in self.hosts)
+
+    def schedule_next(self, now: float):
+        # Once a device has been updated its next deadline is one interval away
+        self.next_update = now + self.interval
 
     def delay(self):
-        # This should be called to reduce the number of updates per interval so that new devices can be added into the queue fairly
+        # This should be called to reduce the number of updates per interval so that
+        # new devices can be added into the queue fairly
         if self.updates_per_interval > 1:
             self.updates_per_interval -= 1
 
@@ -84,80 +180,180 @@ class DeviceUpdater(object):
 class UpdateManager:
     """Manager for scheduling and executing periodic device updates.
 
-    Maintains a priority queue of DeviceUpdater instances and enforces rate
-    limits and fair distribution of update calls across devices.
+    Keeps DeviceUpdater instances in a heap ordered by their next deadline,
+    sleeps until the earliest one is due and runs due updates concurrently,
+    bounded by an `asyncio.Semaphore`. A sliding window caps the number of
+    updates started in any INTERVAL at MAX_SLOTS.
+
+    Granted shares (`updates_per_interval`) always fit in MAX_SLOTS. After
+    every update `rebalance` moves each device towards the rate its observed
+    change rate asks for: idle devices give up part of their share and
+    volatile ones are sped up with the slots left over.
     """
 
-    updaters = []
-    removed_updaters = []
-    mutex = threading.Lock()
+    updaters: List[DeviceUpdater] = []
 
-    def check_if_removed(self, updater: DeviceUpdater):
-        for item in self.removed_updaters:
-            if updater is item:
-                return True
-        return False
+    def __init__(self, max_concurrent_updates: int = MAX_CONCURRENT_UPDATES):
+        """
+        :param max_concurrent_updates: How many device updates may be in flight at once.
+        """
+        self.max_concurrent_updates = max_concurrent_updates
+        self._running: Dict[int, DeviceUpdater] = {}
+        self._started: Deque[float] = deque()
+        self._wakeup: Optional[asyncio.Event] = None
 
-    # This function should be called once every second
     async def update_next(self):
         # If there are no updaters in the queue we don't need to do anything
-        if len(self.updaters) == 0:
+        if not self.active_updaters():
             _LOGGER.debug("No devices to update in queue")
             return
+
+        loop = asyncio.get_running_loop()
+        semaphore = asyncio.Semaphore(self.max_concurrent_updates)
+        self._wakeup = asyncio.Event()
         while True:
-            # First we get the next updater off the queue
+            self._discard_removed()
+            if not self.updaters:
+                await self._sleep(None)
+                continue
+
+            # Sleep until the earliest deadline, or until an earlier one is added
+            delay = self.updaters[0].next_update - loop.time()
+            if delay > 0:
+                await self._sleep(delay)
+                continue
+
             updater = heappop(self.updaters)
-            # if the updater has been removed, pop the next and clear it from the removed updaters
-            if self.removed_updaters:
-                while self.check_if_removed(updater):
-                    self.removed_updaters.remove(updater)
-                    updater = heappop(self.updaters)
-            # We then reduce the counter for all the other updaters
-            self.tick_tock()
-            # Then we update the target device
-            await updater.update(
-                self.mutex
-            )  # It will only update if it is time for it to update. Otherwise it just reduces its update_in counter.
-            # Then we put it back at the end of the queue. Or the front again if it wasn't ready to update
-            heappush(self.updaters, updater)
-            await sleep(1)
+            if not updater.backend_available():
+                # Don't spend a slot on a device whose backend is failing fast
+                _LOGGER.debug(f"Backend down, postponing {updater.device.nickname}")
+                updater.schedule_next(loop.time())
+                self._push(updater)
+                continue
+
+            await semaphore.acquire()
+            await self._reserve_budget()
+            if updater.removed:
+                semaphore.release()
+                continue
+
+            self._running[id(updater)] = updater
+            loop.create_task(self._run(updater, semaphore))
+
+    async def _run(self, updater: DeviceUpdater, semaphore: asyncio.Semaphore):
+        try:
+            await updater.update()
+        finally:
+            semaphore.release()
+            del self._running[id(updater)]
+            if not updater.removed:
+                self.rebalance()
+                updater.schedule_next(asyncio.get_running_loop().time())
+                self._push(updater)
+
+    async def _sleep(self, timeout: Optional[float]):
+        self._wakeup.clear()
+        try:
+            await asyncio.wait_for(self._wakeup.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+
+    async def _reserve_budget(self):
+        # Wait until starting one more update keeps us within MAX_SLOTS per INTERVAL
+        loop = asyncio.get_running_loop()
+        while True:
+            now = loop.time()
+            while self._started and now - self._started[0] >= INTERVAL:
+                self._started.popleft()
+            if len(self._started) < MAX_SLOTS:
+                self._started.append(now)
+                return
+            _LOGGER.debug("Update budget exhausted, waiting for the window to move")
+            await asyncio.sleep(self._started[0] + INTERVAL - now)
+
+    def _discard_removed(self):
+        while self.updaters and self.updaters[0].removed:
+            heappop(self.updaters)
+
+    def _push(self, updater: DeviceUpdater):
+        heappush(self.updaters, updater)
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    def active_updaters(self) -> List[DeviceUpdater]:
+        # Queued and currently running updaters that have not been removed
+        queued = [a_updater for a_updater in self.updaters if not a_updater.removed]
+        return queued + list(self._running.values())
 
     def filled_slots(self):
-        # This just returns the number of available slots
-        current_slots = 0
-        for a_updater in self.updaters:
-            current_slots += a_updater.updates_per_interval
+        # This just returns the number of used slots
+        return sum(
+            a_updater.updates_per_interval for a_updater in self.active_updaters()
+        )
+
+    def rebalance(self):
+        """Set every device's adaptive share from its change rate within MAX_SLOTS.
+
+        Slowing down idle devices always fits, since their targets are below
+        their grants. Volatile devices share the remaining slots in proportion
+        to how far they want to exceed their grants.
+        """
+        updaters = self.active_updaters()
+        targets = [updater.target_updates() for updater in updaters]
+        shares = [
+            updater.updates_per_interval if target is None else target
+            for updater, target in zip(updaters, targets)
+        ]
+        floors = [
+            min(share, updater.updates_per_interval)
+            for updater, share in zip(updaters, shares)
+        ]
+        wanted = sum(shares) - sum(floors)
+        spare = max(0, MAX_SLOTS - sum(floors))
+        if wanted > spare:
+            shares = [
+                floor + (share - floor) * spare // wanted
+                for floor, share in zip(floors, shares)
+            ]
+
+        for updater, target, share in zip(updaters, targets, shares):
+            updater.adaptive_updates = None if target is None else share
 
-        return current_slots
+    def effective_intervals(self) -> Dict[str, float]:
+        """Effective seconds between updates of every registered device, by MAC."""
+        return {
+            a_updater.device.mac: a_updater.interval
+            for a_updater in self.active_updaters()
+        }
 
     def decrease_updates_per_interval(self):
         # This will add a delay for all devices so we can squeeze more in there
-        for a_updater in self.updaters:
+        for a_updater in self.active_updaters():
             a_updater.delay()
 
-    def tick_tock(self):
-        # This will reduce the update_in counter for all devices
-        for a_updater in self.updaters:
-            a_updater.tick_tock()
-
     def add_updater(self, updater: DeviceUpdater):
-        if len(self.updaters) >= MAX_SLOTS:
+        if len(self.active_updaters()) >= MAX_SLOTS:
             _LOGGER.exception("No more devices can be updated within the rate limit")
             raise Exception("No more devices can be updated within the rate limit")
 
-        # When we add a new updater it has to fit within the max slots or we will not add it
+        # When we add a new updater it has to fit within the max slots or we will not
+        # add it
         while (self.filled_slots() + updater.updates_per_interval) > MAX_SLOTS:
             _LOGGER.debug(
                 "Reducing updates per interval to fit new device as slots are full: %s",
                 self.filled_slots(),
             )
-            # If we are overflowing the available slots we will reduce the frequency of updates evenly for all devices until we can fit in one more.
+            # If we are overflowing the available slots we will reduce the frequency of
+            # updates evenly for all devices until we can fit in one more.
             self.decrease_updates_per_interval()
             updater.delay()
 
         # Once it fits we will add the new updater to the queue
-        heappush(self.updaters, updater)
+        self._push(updater)
+        self.rebalance()
 
     def del_updater(self, updater: DeviceUpdater):
-        self.removed_updaters.append(updater)
+        # The updater is dropped lazily when it reaches the top of the heap
+        updater.removed = True
+        self.rebalance()
         _LOGGER.debug("Removing device from update queue")
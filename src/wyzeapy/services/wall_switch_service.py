@@ -8,6 +8,7 @@ from enum import Enum
 from typing import Any, Dict, List
 
 from .base_service import BaseService
+from .decoders import Field, compile_decoder, is_connected
 from ..types import Device, WallSwitchProps, DeviceTypes
 
 _LOGGER = logging.getLogger(__name__)
@@ -19,6 +20,8 @@ class SinglePressType(Enum):
 
 
 class WallSwitch(Device):
+    __slots__ = ("switch_power", "switch_iot", "single_press_type")
+
     def __init__(self, dictionary: Dict[Any, Any]):
         super().__init__(dictionary)
 
@@ -39,41 +42,30 @@ class WallSwitch(Device):
         self.switch_power = state
 
 
+WALL_SWITCH_FIELDS = {
+    WallSwitchProps.IOT_STATE: Field("available", is_connected),
+    WallSwitchProps.SWITCH_POWER: Field("switch_power"),
+    WallSwitchProps.SWITCH_IOT: Field("switch_iot"),
+    WallSwitchProps.SINGLE_PRESS_TYPE: Field("single_press_type", SinglePressType),
+}
+
+decode_wall_switch = compile_decoder(WALL_SWITCH_FIELDS)
+
+
 class WallSwitchService(BaseService):
     async def update(self, switch: WallSwitch) -> WallSwitch:
         properties = (await self._wall_switch_get_iot_prop(switch))["data"]["props"]
-
-        device_props = []
-        for prop_key, prop_value in properties.items():
-            try:
-                prop = WallSwitchProps(prop_key)
-                device_props.append((prop, prop_value))
-            except ValueError as e:
-                _LOGGER.debug(f"{e} with value {prop_value}")
-
-        for prop, value in device_props:
-            if prop == WallSwitchProps.IOT_STATE:
-                switch.available = value == "connected"
-            elif prop == WallSwitchProps.SWITCH_POWER:
-                switch.switch_power = value
-            elif prop == WallSwitchProps.SWITCH_IOT:
-                switch.switch_iot = value
-            elif prop == WallSwitchProps.SINGLE_PRESS_TYPE:
-                switch.single_press_type = SinglePressType(value)
-
-        return switch
+        return decode_wall_switch(switch, properties.items())
 
     async def get_switches(self) -> List[WallSwitch]:
-        if self._devices is None:
-            self._devices = await self.get_object_list()
-
+        registry = await self._get_registry()
         switches = [
             device
-            for device in self._devices
-            if device.type is DeviceTypes.COMMON and device.product_model == "LD_SS1"
+            for device in registry.by_model("LD_SS1")
+            if device.type is DeviceTypes.COMMON
         ]
 
-        return [WallSwitch(switch.raw_dict) for switch in switches]
+        return self._typed(WallSwitch, switches)
 
     async def turn_on(self, switch: WallSwitch):
         if switch.single_press_type == SinglePressType.IOT:
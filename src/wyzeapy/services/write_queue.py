@@ -0,0 +1,106 @@
+#  Copyright (c) 2021. Mulliken, LLC - All Rights Reserved
+#  You may use, distribute and modify this code under the terms
+#  of the attached license. You should have received a copy of
+#  the license with this file. If not, please write to:
+#  katie@mulliken.net to receive a copy
+import asyncio
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, List
+
+from .action_batcher import merge_plist
+from ..types import Device
+
+"""
+Per-device queue that coalesces rapid successive property writes.
+"""
+
+WRITE_COALESCE_WINDOW = 0.0
+
+Sender = Callable[[Device, List[Dict[Any, Any]]], Awaitable[Any]]
+
+
+class _PendingWrite:
+    def __init__(self, device: Device, plist: List[Dict[Any, Any]], send: Sender):
+        self.device = device
+        self.plist = list(plist)
+        self.send = send
+        self.future = asyncio.get_running_loop().create_future()
+
+    def merge(self, device: Device, plist: List[Dict[Any, Any]]):
+        self.device = device
+        merge_plist(self.plist, plist)
+
+
+class WriteQueue:
+    """Serializes property writes per device and merges the ones still waiting.
+
+    At most one write per device is in flight. Writes submitted while another
+    is in flight, or within `window` seconds of the first one, are merged into
+    a single pending write when they use the same send function, so a slider
+    dragged across its range sends the latest values instead of every step.
+    Writes are always sent in submission order.
+
+    Attributes:
+        writes: Number of writes submitted.
+        requests: Number of writes actually sent.
+    """
+
+    def __init__(self, window: float = WRITE_COALESCE_WINDOW):
+        """
+        :param window: Seconds to wait for more writes before sending the first one.
+        """
+        self.window = window
+        self._pending: Dict[str, Deque[_PendingWrite]] = {}
+        self._drains: Dict[str, asyncio.Task] = {}
+        self.writes = 0
+        self.requests = 0
+
+    async def submit(
+        self, device: Device, plist: List[Dict[Any, Any]], send: Sender
+    ) -> None:
+        """Queue a write and wait until the request carrying it completes.
+
+        :param device: The device to write to
+        :param plist: A list of properties [{"pid": pid, "pvalue": pvalue},...]
+        :param send: Coroutine function called as `send(device, plist)`
+        """
+        self.writes += 1
+        queue = self._pending.setdefault(device.mac, deque())
+        if queue and queue[-1].send == send:
+            write = queue[-1]
+            write.merge(device, plist)
+        else:
+            write = _PendingWrite(device, plist, send)
+            queue.append(write)
+
+        if device.mac not in self._drains:
+            self._drains[device.mac] = asyncio.get_running_loop().create_task(
+                self._drain(device.mac)
+            )
+
+        await asyncio.shield(write.future)
+
+    async def _drain(self, mac: str) -> None:
+        queue = self._pending[mac]
+        write = None
+        try:
+            if self.window > 0:
+                await asyncio.sleep(self.window)
+            while queue:
+                write = queue.popleft()
+                self.requests += 1
+                try:
+                    await write.send(write.device, write.plist)
+                except Exception as e:
+                    write.future.set_exception(e)
+                else:
+                    write.future.set_result(None)
+        finally:
+            # Only reached with unresolved writes if the drain itself was
+            # cancelled, possibly while sending the write it had popped
+            if write is not None and not write.future.done():
+                write.future.cancel()
+            for write in queue:
+                write.future.cancel()
+            del self._drains[mac]
+            del self._pending[mac]
@@ -0,0 +1,161 @@
+#  Copyright (c) 2021. Mulliken, LLC - All Rights Reserved
+#  You may use, distribute and modify this code under the terms
+#  of the attached license. You should have received a copy of
+#  the license with this file. If not, please write to:
+#  katie@mulliken.net to receive a copy
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import time
+from typing import Any, Dict, List, Mapping, Optional
+
+from .wyze_auth_lib import Token
+
+_LOGGER = logging.getLogger(__name__)
+"""
+Warm-start snapshots of discovery, decoded device state, the HMS id and the
+token refresh time, written atomically to a local file.
+
+A client started from a snapshot serves the saved devices and state at once
+and revalidates them in the background. No credentials are written: the token
+is recorded only as a fingerprint, so a saved refresh time is only trusted for
+the same access token, and device keys such as a bulb's `enr` are left out of
+the saved discovery entries until the background discovery brings them back.
+"""
+
+SNAPSHOT_VERSION = 2
+
+# Per-device keys in discovery entries, never written to a snapshot
+SECRET_FIELDS = frozenset({"enr", "parent_device_enr"})
+
+# A restored token is used without refreshing only if it has this long left
+MIN_TOKEN_LIFE = Token.REFRESH_INTERVAL / 4
+
+
+def redact(entry: Mapping[str, Any]) -> Dict[str, Any]:
+    """A copy of a discovery entry without the keys in `SECRET_FIELDS`."""
+    redacted = {k: v for k, v in entry.items() if k not in SECRET_FIELDS}
+    params = redacted.get("device_params")
+    if isinstance(params, dict):
+        redacted["device_params"] = {
+            k: v for k, v in params.items() if k not in SECRET_FIELDS
+        }
+    return redacted
+
+
+def token_fingerprint(token: Token) -> str:
+    """One-way fingerprint identifying an access token without storing it."""
+    return hashlib.sha256(token.access_token.encode()).hexdigest()
+
+
+class Snapshot:
+    """Client state saved at the end of one run for the start of the next.
+
+    Attributes:
+        devices: The `device_list` of the last discovery, passed through `redact`.
+        states: Decoded device state by MAC and class name, from the typed
+            device objects.
+        hms_id: The account's HMS id, or None if unknown.
+        token_fingerprint: `token_fingerprint` of the access token in use.
+        token_refresh_time: When that token was due to be refreshed.
+        saved_at: When the snapshot was taken, as a Unix timestamp.
+    """
+
+    def __init__(
+        self,
+        devices: List[Dict[str, Any]],
+        states: Optional[Dict[str, Dict[str, Any]]] = None,
+        hms_id: Optional[str] = None,
+        token_fingerprint: Optional[str] = None,
+        token_refresh_time: Optional[float] = None,
+        saved_at: Optional[float] = None,
+    ):
+        self.devices = [redact(entry) for entry in devices]
+        self.states = states or {}
+        self.hms_id = hms_id
+        self.token_fingerprint = token_fingerprint
+        self.token_refresh_time = token_refresh_time
+        self.saved_at = saved_at if saved_at is not None else time.time()
+
+    def refresh_time_for(self, token: Token) -> Optional[float]:
+        """The saved refresh time of `token`, or None if it is a different token."""
+        if self.token_fingerprint is None or token.access_token is None:
+            return None
+        if token_fingerprint(token) != self.token_fingerprint:
+            return None
+        return self.token_refresh_time
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "version": SNAPSHOT_VERSION,
+            "saved_at": self.saved_at,
+            "devices": self.devices,
+            "states": self.states,
+            "hms_id": self.hms_id,
+            "token": {
+                "fingerprint": self.token_fingerprint,
+                "refresh_time": self.token_refresh_time,
+            },
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "Snapshot":
+        token = data.get("token") or {}
+        return cls(
+            devices=data["devices"],
+            states=data.get("states"),
+            hms_id=data.get("hms_id"),
+            token_fingerprint=token.get("fingerprint"),
+            token_refresh_time=token.get("refresh_time"),
+            saved_at=data["saved_at"],
+        )
+
+    def __repr__(self) -> str:
+        return "<Snapshot: {} devices, saved at {}>".format(
+            len(self.devices), self.saved_at
+        )
+
+
+class SnapshotStore:
+    """Reads and atomically writes a `Snapshot` file readable only by its owner."""
+
+    def __init__(self, path: str):
+        """
+        :param path: Location of the snapshot file.
+        """
+        self.path = path
+
+    def load(self) -> Optional[Snapshot]:
+        """Read the snapshot, or return None if it is missing or unusable."""
+        try:
+            with open(self.path, encoding="utf-8") as file:
+                data = json.load(file)
+            if data.get("version") != SNAPSHOT_VERSION:
+                _LOGGER.debug(f"Ignoring snapshot {self.path} from another version")
+                return None
+            return Snapshot.from_dict(data)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError, KeyError, TypeError, AttributeError) as e:
+            _LOGGER.warning(f"Ignoring unreadable snapshot {self.path}: {e}")
+            return None
+
+    def save(self, snapshot: Snapshot):
+        """Replace the snapshot file, so readers see the old or the new one whole."""
+        directory = os.path.dirname(os.path.abspath(self.path))
+        # mkstemp creates the file with mode 0o600
+        fd, temp_path = tempfile.mkstemp(dir=directory, prefix=".wyzeapy-snapshot-")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as file:
+                json.dump(snapshot.as_dict(), file, default=str)
+                file.flush()
+                os.fsync(file.fileno())
+            os.replace(temp_path, self.path)
+        except BaseException:
+            try:
+                os.unlink(temp_path)
+            except OSError:
+                pass
+            raise
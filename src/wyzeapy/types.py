@@ -9,16 +9,45 @@ and API response code enums.
 """
 
 from enum import Enum
-from typing import Union, List, Dict, Any
+from functools import lru_cache
+from typing import Union, List, Dict, Any, FrozenSet, Optional, Tuple
 
 
-class Group:
-    group_id: str
-    group_name: str
+class _Record:
+    """Base for API records: known fields in slots, any others in one dict.
+
+    Subclasses list their fields in `__slots__`. Keys of the API dictionary
+    without a slot are kept in `_extra` and read on attribute access.
+    """
+
+    __slots__ = ("_extra",)
 
     def __init__(self, dictionary: Dict[Any, Any]):
+        extra = None
         for k, v in dictionary.items():
-            setattr(self, k, v)
+            try:
+                setattr(self, k, v)
+            except AttributeError:
+                if extra is None:
+                    extra = {}
+                extra[k] = v
+        self._extra: Optional[Dict[Any, Any]] = extra
+
+    def __getattr__(self, name: str) -> Any:
+        # Only called when normal lookup fails
+        try:
+            return object.__getattribute__(self, "_extra")[name]
+        except (AttributeError, KeyError, TypeError):
+            raise AttributeError(
+                f"'{type(self).__name__}' object has no attribute '{name}'"
+            ) from None
+
+
+class Group(_Record):
+    __slots__ = ("group_id", "group_name")
+
+    group_id: str
+    group_name: str
 
     def __repr__(self) -> str:
         return "<Group: {}, {}>".format(self.group_id, self.group_name)
@@ -51,34 +80,117 @@ class DeviceTypes(Enum):
     IRRIGATION = "Common"
 
 
+# Discovery keys every device has, stored in slots
+_DEVICE_FIELDS = ("product_type", "product_model", "mac", "nickname", "device_params")
+
+
+@lru_cache(maxsize=None)
+def _class_attributes(cls: type) -> FrozenSet[str]:
+    return frozenset(dir(cls)) - frozenset(_DEVICE_FIELDS)
+
+
+@lru_cache(maxsize=None)
+def _sets_instance_attributes(cls: type) -> bool:
+    # Subclasses without __slots__ keep their own state in the instance __dict__
+    return any("__slots__" not in vars(c) for c in cls.__mro__[:-1])
+
+
+@lru_cache(maxsize=None)
+def _has_own_fields(cls: type) -> bool:
+    # Whether a subclass adds slots, or an instance __dict__, for its own state
+    for c in cls.__mro__:
+        if c is Device:
+            return False
+        if vars(c).get("__slots__", True):
+            return True
+    return False
+
+
 class Device:
+    """A device from discovery.
+
+    Fields every device has are stored in slots. Any other key of the
+    discovery entry is read from `raw_dict` when accessed, instead of being
+    copied onto the object. Other attributes, such as the ones services and
+    integrations add, go into an instance `__dict__` created on first use.
+    """
+
+    __slots__ = (
+        *_DEVICE_FIELDS,
+        "raw_dict",
+        "available",
+        "callback_function",
+        "_type",
+        "__dict__",
+        "__weakref__",
+    )
+
     product_type: str
     product_model: str
     mac: str
     nickname: str
     device_params: Dict[str, Any]
     raw_dict: Dict[str, Any]
-    callback_function = None
 
     def __init__(self, dictionary: Dict[Any, Any]):
         self.available = False
+        self.callback_function = None
+        self.load_raw(dictionary)
 
+    def load_raw(self, dictionary: Dict[Any, Any]):
+        """Take the values of a (newer) discovery entry for this device."""
         self.raw_dict = dictionary
-        for k, v in dictionary.items():
-            setattr(self, k, v)
+        self._type: Optional[Tuple[str, DeviceTypes]] = None
+        for name in _DEVICE_FIELDS:
+            if name in dictionary:
+                setattr(self, name, dictionary[name])
+        # Keys that a subclass defines or has already set would hide the lazy
+        # lookup, so those are assigned directly. The __dict__ is only read for
+        # subclasses without __slots__, so slotted devices do not create one
+        # until something is stored in it.
+        cls = type(self)
+        if _has_own_fields(cls):
+            attrs = self.__dict__ if _sets_instance_attributes(cls) else ()
+            defined = _class_attributes(cls)
+            for k, v in dictionary.items():
+                if k in attrs or k in defined:
+                    setattr(self, k, v)
+
+    def __getattr__(self, name: str) -> Any:
+        # Only called when normal lookup fails: fall back to the discovery entry
+        try:
+            return object.__getattribute__(self, "raw_dict")[name]
+        except (AttributeError, KeyError):
+            raise AttributeError(
+                f"'{type(self).__name__}' object has no attribute '{name}'"
+            ) from None
 
     @property
     def type(self) -> DeviceTypes:
-        try:
-            return DeviceTypes(self.product_type)
-        except ValueError:
-            return DeviceTypes.UNKNOWN
+        product_type = self.product_type
+        cached = self._type
+        if cached is None or cached[0] is not product_type:
+            try:
+                device_type = DeviceTypes(product_type)
+            except ValueError:
+                device_type = DeviceTypes.UNKNOWN
+            cached = self._type = (product_type, device_type)
+        return cached[1]
+
+    def is_active(self) -> bool:
+        """Whether the device is in a state that keeps changing, such as running.
+
+        Active devices are polled more often by the update manager.
+        """
+        return False
 
     def __repr__(self) -> str:
         return "<Device: {}, {}>".format(DeviceTypes(self.product_type), self.mac)
 
 
 class Sensor(Device):
+    __slots__ = ()
+
     def __init__(self, dictionary: Dict[Any, Any]):
         super().__init__(dictionary)
 
@@ -93,6 +205,15 @@ class Sensor(Device):
                 "Device must be of type CONTACT_SENSOR or MOTION_SENSOR"
             )
 
+    def is_active(self) -> bool:
+        # An open contact sensor or a motion sensor seeing motion
+        if self.type not in (DeviceTypes.CONTACT_SENSOR, DeviceTypes.MOTION_SENSOR):
+            return False
+        try:
+            return self.activity_detected == 1
+        except (KeyError, TypeError, ValueError):
+            return False
+
     @property
     def is_low_battery(self) -> int:
         return int(self.device_params["is_low_battery"])
@@ -112,11 +233,15 @@ class PropertyIDs(Enum):
     CONTACT_STATE = "P1301"
     MOTION_STATE = "P1302"
     CAMERA_SIREN = "P1049"
-    ACCESSORY = "P1056"  # Is state for camera accessories, like garage doors, light sockets, and floodlights.
+    # Is state for camera accessories, like garage doors, light sockets, and
+    # floodlights.
+    ACCESSORY = "P1056"
     SUN_MATCH = "P1528"
     MOTION_DETECTION = "P1047"  # Current Motion Detection State of the Camera
     MOTION_DETECTION_TOGGLE = "P1001"  # This toggles Camera Motion Detection On/Off
-    WCO_MOTION_DETECTION = "P1029"  # Wyze cam outdoor requires both P1047 and P1029 to be set.  P1029 is set via set_property_list
+    # Wyze cam outdoor requires both P1047 and P1029 to be set.  P1029 is set via
+    # set_property_list
+    WCO_MOTION_DETECTION = "P1029"
 
 
 class WallSwitchProps(Enum):
@@ -185,7 +310,20 @@ class ResponseCodesLock(Enum):
     SUCCESS = 0
 
 
-class File:
+class File(_Record):
+    __slots__ = (
+        "file_id",
+        "type",
+        "url",
+        "status",
+        "en_algorithm",
+        "en_password",
+        "is_ai",
+        "ai_tag_list",
+        "ai_url",
+        "file_params",
+    )
+
     file_id: str
     type: Union[int, str]
     url: str
@@ -198,16 +336,33 @@ class File:
     file_params: Dict[Any, Any]
 
     def __init__(self, dictionary: Dict[Any, Any]):
-        for k, v in dictionary.items():
-            setattr(self, k, v)
+        super().__init__(dictionary)
 
-        if self.type == 1:
+        if getattr(self, "type", None) == 1:
             self.type = "Image"
         else:
             self.type = "Video"
 
 
-class Event:
+class Event(_Record):
+    __slots__ = (
+        "event_id",
+        "device_mac",
+        "device_model",
+        "event_category",
+        "event_value",
+        "event_ts",
+        "event_ack_result",
+        "is_feedback_correct",
+        "is_feedback_face",
+        "is_feedback_person",
+        "file_list",
+        "event_params",
+        "recognized_instance_list",
+        "tag_list",
+        "read_state",
+    )
+
     event_id: str
     device_mac: str
     device_model: str
@@ -224,10 +379,6 @@ class Event:
     tag_list: List[Any]
     read_state: int
 
-    def __init__(self, dictionary: Dict[Any, Any]):
-        for k, v in dictionary.items():
-            setattr(self, k, v)
-
 
 class HMSStatus(Enum):
     DISARMED = "disarmed"
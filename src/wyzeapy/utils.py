@@ -224,6 +224,26 @@ def return_event_for_device(device: Device, events: List[Event]) -> Optional[Eve
     return None
 
 
+def index_events_by_mac(events: List[Event]) -> Dict[str, Event]:
+    """
+    Index a list of events by device MAC, keeping the first event per device.
+
+    Event lists from the API are ordered newest first, so each entry is the most
+    recent event for that device. Build this once per event list instead of
+    calling `return_event_for_device` for every device.
+
+    Args:
+        events: List of events to index.
+
+    Returns:
+        A dict mapping device MAC to its first matching Event.
+    """
+    latest: Dict[str, Event] = {}
+    for event in events:
+        latest.setdefault(event.device_mac, event)
+    return latest
+
+
 def create_pid_pair(pid_enum: PropertyIDs, value: str) -> Dict[str, str]:
     """
     Create a property ID/value pair dictionary for API payloads.
@@ -7,13 +7,21 @@ import asyncio
 from functools import cache
 import logging
 from pathlib import Path
+import re
 import ssl
 import time
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional
 
 import certifi
-from aiohttp import TCPConnector, ClientSession, ContentTypeError
+from aiohttp import (
+    TCPConnector,
+    ClientResponseError,
+    ClientSession,
+    ContentTypeError,
+    TraceConfig,
+)
 
+from . import codec
 from .const import (
     API_KEY,
     PHONE_ID,
@@ -25,11 +33,21 @@ from .const import (
     APP_VER,
     APP_INFO,
 )
+from .circuit_breaker import CircuitBreakers
 from .exceptions import (
     UnknownApiError,
     TwoFactorAuthenticationEnabled,
     AccessTokenError,
 )
+from .priority import RequestPriority, request_priority
+from .rate_limiter import RateLimiter
+from .retry import (
+    IDEMPOTENT_METHODS,
+    Retrier,
+    idempotent,
+    is_idempotent,
+    is_transient,
+)
 from .utils import create_password, check_for_errors_standard
 
 _LOGGER = logging.getLogger(__name__)
@@ -41,6 +59,7 @@ tracking, automatic refresh timing, and secure request methods in WyzeAuthLib.
 """
 
 _EXTRA_CA_BUNDLE = Path(__file__).with_name("wyze_api_ca.pem")
+_JSON_CONTENT_TYPE = re.compile(r"^application/(?:[\w.+-]+?\+)?json")
 
 
 @cache
@@ -52,13 +71,89 @@ def get_ssl_context() -> ssl.SSLContext:
     return context
 
 
-def _create_client_session() -> ClientSession:
-    """Create a client session configured for Wyze API requests."""
+CONNECTION_LIMIT = 100
+CONNECTION_LIMIT_PER_HOST = 10
+KEEPALIVE_TIMEOUT = 60
+THROTTLE_RETRIES = 2
+
+# The background refresher renews the token this many seconds before refresh_time
+TOKEN_REFRESH_MARGIN = 300
+TOKEN_REFRESH_BACKOFF_BASE = 5.0
+TOKEN_REFRESH_BACKOFF_MAX = 300.0
+# Tokens stay valid this long past refresh_time (24h life, refreshed after 23h)
+TOKEN_GRACE = 3600
+
+
+def _create_client_session(
+    limit: int = CONNECTION_LIMIT,
+    limit_per_host: int = CONNECTION_LIMIT_PER_HOST,
+    trace_configs: Optional[List[TraceConfig]] = None,
+) -> ClientSession:
+    """Create a keep-alive client session configured for Wyze API requests."""
     return ClientSession(
-        connector=TCPConnector(ttl_dns_cache=(30 * 60), ssl=get_ssl_context())
+        connector=TCPConnector(
+            ttl_dns_cache=(30 * 60),
+            ssl=get_ssl_context(),
+            limit=limit,
+            limit_per_host=limit_per_host,
+            keepalive_timeout=KEEPALIVE_TIMEOUT,
+        ),
+        trace_configs=trace_configs,
     )
 
 
+class ConnectionStats:
+    """Counts requests and how many of them reused a pooled connection.
+
+    Attributes:
+        requests: Requests sent through the session.
+        connections_created: New TCP/TLS connections that had to be opened.
+        connections_reused: Requests served by an existing keep-alive connection.
+    """
+
+    def __init__(self):
+        self.requests = 0
+        self.connections_created = 0
+        self.connections_reused = 0
+
+    @property
+    def reuse_ratio(self) -> float:
+        """Fraction of connection acquisitions served from the pool."""
+        total = self.connections_created + self.connections_reused
+        if total == 0:
+            return 0.0
+        return self.connections_reused / total
+
+    def trace_config(self) -> TraceConfig:
+        """Build an aiohttp TraceConfig that feeds these counters."""
+        trace_config = TraceConfig()
+
+        async def on_request_start(session, context, params):
+            self.requests += 1
+
+        async def on_connection_create_end(session, context, params):
+            self.connections_created += 1
+
+        async def on_connection_reuseconn(session, context, params):
+            self.connections_reused += 1
+
+        trace_config.on_request_start.append(on_request_start)
+        trace_config.on_connection_create_end.append(on_connection_create_end)
+        trace_config.on_connection_reuseconn.append(on_connection_reuseconn)
+        return trace_config
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "requests": self.requests,
+            "connections_created": self.connections_created,
+            "connections_reused": self.connections_reused,
+            "reuse_ratio": self.reuse_ratio,
+        }
+
+    def __repr__(self) -> str:
+        return "<ConnectionStats: {}>".format(self.as_dict())
+
+
 class Token:
     """Represents Wyze API access/refresh token and expiration tracking.
 
@@ -128,6 +223,12 @@ class WyzeAuthLib:
         api_key=None,
         token: Optional[Token] = None,
         token_callback=None,
+        connection_limit: int = CONNECTION_LIMIT,
+        connection_limit_per_host: int = CONNECTION_LIMIT_PER_HOST,
+        rate_limiter: Optional[RateLimiter] = None,
+        retrier: Optional[Retrier] = None,
+        circuit_breakers: Optional[CircuitBreakers] = None,
+        token_refresh_margin: float = TOKEN_REFRESH_MARGIN,
     ):
         """Initialize WyzeAuthLib for authentication and token management.
 
@@ -138,6 +239,15 @@ class WyzeAuthLib:
             api_key: Third-party API key for Wyze credentials.
             token: Existing Token instance for reuse (optional).
             token_callback: Callback to invoke on token updates.
+            connection_limit: Maximum pooled connections across all hosts.
+            connection_limit_per_host: Maximum pooled connections per host.
+            rate_limiter: Limits applied to outgoing requests; defaults to a
+                `RateLimiter` with the standard Wyze limits.
+            retrier: Retry policy and budget for transient network errors.
+            circuit_breakers: Per-host breakers that fail fast while a backend
+                is down.
+            token_refresh_margin: Seconds before `Token.refresh_time` at which
+                the background refresher renews the token.
         """
         self._username = username
         self._password = password
@@ -149,6 +259,15 @@ class WyzeAuthLib:
         self.two_factor_type = None
         self.refresh_lock = asyncio.Lock()
         self.token_callback = token_callback
+        self._connection_limit = connection_limit
+        self._connection_limit_per_host = connection_limit_per_host
+        self._session: Optional[ClientSession] = None
+        self._connection_stats = ConnectionStats()
+        self._rate_limiter = rate_limiter or RateLimiter()
+        self._retrier = retrier or Retrier()
+        self._circuit_breakers = circuit_breakers or CircuitBreakers()
+        self.token_refresh_margin = token_refresh_margin
+        self._token_refresher: Optional[asyncio.Task] = None
 
     @classmethod
     async def create(
@@ -159,6 +278,7 @@ class WyzeAuthLib:
         api_key=None,
         token: Optional[Token] = None,
         token_callback=None,
+        **kwargs,
     ):
         """Factory to instantiate WyzeAuthLib with credentials or existing token.
 
@@ -169,6 +289,7 @@ class WyzeAuthLib:
             api_key: Third-party API key (required for login).
             token: Existing Token instance (skip login flow).
             token_callback: Callback for token refresh events.
+            **kwargs: Connection pool options forwarded to `__init__`.
 
         Returns:
             A configured WyzeAuthLib instance.
@@ -183,6 +304,7 @@ class WyzeAuthLib:
             api_key=api_key,
             token=token,
             token_callback=token_callback,
+            **kwargs,
         )
 
         if self._username is None and self._password is None and self.token is None:
@@ -197,6 +319,54 @@ class WyzeAuthLib:
 
         return self
 
+    @property
+    def session(self) -> ClientSession:
+        """The pooled keep-alive session shared by every request of this client.
+
+        The session is created lazily on first use so that it is bound to the
+        running event loop, and recreated if it has been closed.
+        """
+        if self._session is None or self._session.closed:
+            self._session = _create_client_session(
+                limit=self._connection_limit,
+                limit_per_host=self._connection_limit_per_host,
+                trace_configs=[self._connection_stats.trace_config()],
+            )
+        return self._session
+
+    @property
+    def connection_stats(self) -> ConnectionStats:
+        """Request and connection-reuse counters for the pooled session."""
+        return self._connection_stats
+
+    @property
+    def rate_limiter(self) -> RateLimiter:
+        """Token buckets applied to every request, with queue-wait metrics."""
+        return self._rate_limiter
+
+    @property
+    def retrier(self) -> Retrier:
+        """Retry policy, budget and retry counters for this client."""
+        return self._retrier
+
+    @property
+    def circuit_breakers(self) -> CircuitBreakers:
+        """Per-host circuit breakers guarding every request."""
+        return self._circuit_breakers
+
+    async def close(self) -> None:
+        """Stop the token refresher and close the pooled session and its connections."""
+        self.stop_token_refresher()
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
     async def get_token_with_username_password(
         self, username, password, key_id, api_key
     ) -> Token:
@@ -244,12 +414,14 @@ class WyzeAuthLib:
             # Store the TOTP verification setting in the token and raise exception
             if "TotpVerificationCode" in response_json.get("mfa_options"):
                 self.two_factor_type = "TOTP"
-                # Store the verification_id from the response, it's needed for the 2fa payload.
+                # Store the verification_id from the response, it's needed for the 2fa
+                # payload.
                 self.verification_id = response_json["mfa_details"]["totp_apps"][0][
                     "app_id"
                 ]
                 raise TwoFactorAuthenticationEnabled
-                # 2fa using SMS, store sms as 2fa method in token, send the code then raise exception
+                # 2fa using SMS, store sms as 2fa method in token, send the code then
+                # raise exception
             if "PrimaryPhone" in response_json.get("mfa_options"):
                 self.two_factor_type = "SMS"
                 params = {
@@ -262,7 +434,8 @@ class WyzeAuthLib:
                     headers=headers,
                     data=params,
                 )
-                # Store the session_id from this response, it's needed for the 2fa payload.
+                # Store the session_id from this response, it's needed for the 2fa
+                # payload.
                 self.session_id = response_json["session_id"]
                 raise TwoFactorAuthenticationEnabled
 
@@ -320,14 +493,94 @@ class WyzeAuthLib:
         """Check whether the current token has reached its refresh time."""
         return time.time() >= self.token.refresh_time
 
+    @property
+    def token_refresher_running(self) -> bool:
+        """Whether the background token refresher is active."""
+        return self._token_refresher is not None and not self._token_refresher.done()
+
+    def start_token_refresher(self):
+        """Renew the token in a background task ahead of its refresh time.
+
+        The task refreshes `token_refresh_margin` seconds before
+        `Token.refresh_time`, retries failures with exponential backoff and
+        publishes new tokens through `token_callback`. While it runs,
+        `refresh_if_should` only blocks requests once the token is marked
+        expired or has outlived its validity.
+        """
+        if not self.token_refresher_running:
+            self._token_refresher = asyncio.get_running_loop().create_task(
+                self._refresh_token_periodically()
+            )
+
+    def stop_token_refresher(self):
+        """Cancel the background token refresher, if running."""
+        if self._token_refresher is not None:
+            self._token_refresher.cancel()
+            self._token_refresher = None
+
+    async def _refresh_token_periodically(self):
+        failures = 0
+        while True:
+            delay = self.token.refresh_time - self.token_refresh_margin - time.time()
+            if delay > 0:
+                await asyncio.sleep(delay)
+                continue
+            try:
+                async with self.refresh_lock:
+                    # A request may have refreshed while we waited for the lock
+                    if (
+                        time.time()
+                        >= self.token.refresh_time - self.token_refresh_margin
+                    ):
+                        await self.refresh()
+                failures = 0
+            except Exception as e:
+                backoff = min(
+                    TOKEN_REFRESH_BACKOFF_MAX,
+                    TOKEN_REFRESH_BACKOFF_BASE * 2**failures,
+                )
+                failures += 1
+                _LOGGER.warning(
+                    f"Background token refresh failed ({type(e).__name__}), "
+                    f"retrying in {backoff:.0f}s"
+                )
+                await asyncio.sleep(backoff)
+
     async def refresh_if_should(self):
-        """Refresh the token proactively if expired or past refresh_time."""
+        """Refresh the token proactively if expired or past refresh_time.
+
+        With the background refresher running this is a non-blocking check
+        unless the token is marked expired or past its validity.
+        """
+        if (
+            self.token_refresher_running
+            and not self.token.expired
+            and time.time() < self.token.refresh_time + TOKEN_GRACE
+        ):
+            return
         if self.should_refresh or self.token.expired:
             async with self.refresh_lock:
                 if self.should_refresh or self.token.expired:
                     _LOGGER.debug("Should refresh. Refreshing...")
                     await self.refresh()
 
+    async def refresh_expired(self, access_token: str) -> None:
+        """Refresh after the API rejected `access_token`, once per token.
+
+        Concurrent calls that were rejected with the same token share a
+        single refresh.
+
+        Args:
+            access_token: The access token the rejected request was sent with.
+        """
+        async with self.refresh_lock:
+            if self.token.access_token == access_token:
+                await self.refresh()
+            else:
+                # Already refreshed by another caller; the rejection was stale
+                self.token.expired = False
+        self._retrier.stats.token_replays += 1
+
     async def refresh(self) -> None:
         """Exchange the refresh token for a new access token and update internal Token.
 
@@ -349,13 +602,14 @@ class WyzeAuthLib:
 
         headers = {"X-API-Key": API_KEY}
 
-        async with _create_client_session() as _session:
-            response = await _session.post(
+        # Every other request is waiting on the new token, so it goes first.
+        # A refresh token is single-use, so the request is never sent twice.
+        with request_priority(RequestPriority.INTERACTIVE), idempotent(False):
+            response_json = await self.post(
                 "https://api.wyzecam.com/app/user/refresh_token",
                 headers=headers,
                 json=payload,
             )
-        response_json = await response.json()
         check_for_errors_standard(self, response_json)
 
         self.token.access_token = response_json["data"]["access_token"]
@@ -366,18 +620,119 @@ class WyzeAuthLib:
     def sanitize(self, data):
         """Recursively sanitize sensitive fields in dicts for safe logging.
 
+        The input is never modified; sanitized dicts are returned as copies.
+
         Args:
-            data: The dict to sanitize; returned sanitized copy.
+            data: The dict to sanitize; other values are returned unchanged.
         """
         if data and type(data) is dict:
-            # value is unused, but it prevents us from having to split the tuple to check against SANITIZE_FIELDS
-            for key, value in data.items():
-                if type(value) is dict:
-                    data[key] = self.sanitize(value)
-                if key in self.SANITIZE_FIELDS:
-                    data[key] = self.SANITIZE_STRING
+            return {
+                key: self.SANITIZE_STRING
+                if key in self.SANITIZE_FIELDS
+                else self.sanitize(value)
+                for key, value in data.items()
+            }
         return data
 
+    async def _request(self, method: str, url: str, **kwargs) -> Dict[Any, Any]:
+        """Send a request on the pooled session and decode its JSON body once.
+
+        The request waits for the rate limiter first, and is sent again after
+        the backoff if the server answers with `429 Too Many Requests`.
+        Idempotent requests, either by HTTP method or because they were made
+        inside `wyzeapy.retry.idempotent()`, are retried on transient network
+        errors under the client's `retrier`. Requests to a host whose circuit
+        breaker is open fail fast. The body is read as bytes a single time and
+        decoded with the active `wyzeapy.codec`. Sanitized copies of the
+        request and response are only built when debug logging is enabled.
+
+        Args:
+            method: HTTP method name.
+            url: Request URL.
+            **kwargs: Passed through to `ClientSession.request`.
+
+        Returns:
+            Parsed JSON response, or None for an empty body.
+
+        Raises:
+            ClientResponseError: If the server answers with a 5xx status.
+            ContentTypeError: If the response is not `application/json`.
+            CircuitOpenError: If the host's circuit breaker is open.
+        """
+        debug = _LOGGER.isEnabledFor(logging.DEBUG)
+        if debug:
+            _LOGGER.debug("Request:")
+            _LOGGER.debug(f"method: {method}")
+            _LOGGER.debug(f"url: {url}")
+            for name, value in kwargs.items():
+                _LOGGER.debug(f"{name}: {self.sanitize(value)}")
+
+        breaker = self._circuit_breakers.for_url(url)
+        breaker.before_request()
+        retryable = method in IDEMPOTENT_METHODS or is_idempotent()
+        try:
+            response_json = await self._retrier.run(
+                lambda: self._send(method, url, debug, **kwargs), retryable
+            )
+        except Exception as e:
+            # Only an unreachable or failing backend counts against its circuit
+            if is_transient(e) or (
+                isinstance(e, ClientResponseError) and e.status >= 500
+            ):
+                breaker.record_failure()
+            else:
+                breaker.record_success()
+            raise
+        except BaseException:
+            breaker.release_probe()
+            raise
+        breaker.record_success()
+        return response_json
+
+    async def _send(
+        self, method: str, url: str, debug: bool, **kwargs
+    ) -> Dict[Any, Any]:
+        for _ in range(THROTTLE_RETRIES + 1):
+            await self._rate_limiter.acquire(url)
+            async with self.session.request(method, url, **kwargs) as response:
+                body = await response.read()
+            throttled = self._rate_limiter.observe(
+                url, response.status, response.headers
+            )
+            # A 429 was not processed by the server, so it is safe to send again
+            if not (throttled and response.status == 429):
+                break
+
+        # A failing backend may still send a JSON body, which is not a success
+        if response.status >= 500:
+            if debug:
+                _LOGGER.debug(f"Response: {response}")
+            raise ClientResponseError(
+                response.request_info,
+                response.history,
+                status=response.status,
+                message=response.reason or "",
+                headers=response.headers,
+            )
+
+        if not _JSON_CONTENT_TYPE.match(response.content_type or ""):
+            if debug:
+                _LOGGER.debug(f"Response: {response}")
+            raise ContentTypeError(
+                response.request_info,
+                response.history,
+                status=response.status,
+                message="Attempt to decode JSON with unexpected mimetype: {}".format(
+                    response.content_type
+                ),
+                headers=response.headers,
+            )
+
+        response_json = codec.loads(body) if body.strip() else None
+        if debug:
+            _LOGGER.debug(f"Response Json: {self.sanitize(response_json)}")
+        return response_json
+
     async def post(self, url, json=None, headers=None, data=None) -> Dict[Any, Any]:
         """Send an HTTP POST request with sanitized logging.
 
@@ -390,42 +745,14 @@ class WyzeAuthLib:
         Returns:
             Parsed JSON response.
         """
-        async with _create_client_session() as _session:
-            response = await _session.post(url, json=json, headers=headers, data=data)
-            # Relocated these below as the sanitization seems to modify the data before it goes to the post.
-            _LOGGER.debug("Request:")
-            _LOGGER.debug(f"url: {url}")
-            _LOGGER.debug(f"json: {self.sanitize(json)}")
-            _LOGGER.debug(f"headers: {self.sanitize(headers)}")
-            _LOGGER.debug(f"data: {self.sanitize(data)}")
-            # Log the response.json() if it exists, if not log the response.
-            try:
-                response_json = await response.json()
-                _LOGGER.debug(f"Response Json: {self.sanitize(response_json)}")
-            except ContentTypeError:
-                _LOGGER.debug(f"Response: {response}")
-            return await response.json()
+        return await self._request("POST", url, json=json, headers=headers, data=data)
 
     async def put(self, url, json=None, headers=None, data=None) -> Dict[Any, Any]:
         """Send an HTTP PUT request with sanitized logging.
 
         See `post` for parameter details.
         """
-        async with _create_client_session() as _session:
-            response = await _session.put(url, json=json, headers=headers, data=data)
-            # Relocated these below as the sanitization seems to modify the data before it goes to the post.
-            _LOGGER.debug("Request:")
-            _LOGGER.debug(f"url: {url}")
-            _LOGGER.debug(f"json: {self.sanitize(json)}")
-            _LOGGER.debug(f"headers: {self.sanitize(headers)}")
-            _LOGGER.debug(f"data: {self.sanitize(data)}")
-            # Log the response.json() if it exists, if not log the response.
-            try:
-                response_json = await response.json()
-                _LOGGER.debug(f"Response Json: {self.sanitize(response_json)}")
-            except ContentTypeError:
-                _LOGGER.debug(f"Response: {response}")
-            return await response.json()
+        return await self._request("PUT", url, json=json, headers=headers, data=data)
 
     async def get(self, url, headers=None, params=None) -> Dict[Any, Any]:
         """Send an HTTP GET request with sanitized logging.
@@ -438,43 +765,16 @@ class WyzeAuthLib:
         Returns:
             Parsed JSON response.
         """
-        async with _create_client_session() as _session:
-            response = await _session.get(url, params=params, headers=headers)
-            # Relocated these below as the sanitization seems to modify the data before it goes to the post.
-            _LOGGER.debug("Request:")
-            _LOGGER.debug(f"url: {url}")
-            _LOGGER.debug(f"headers: {self.sanitize(headers)}")
-            _LOGGER.debug(f"params: {self.sanitize(params)}")
-            # Log the response.json() if it exists, if not log the response.
-            try:
-                response_json = await response.json()
-                _LOGGER.debug(f"Response Json: {self.sanitize(response_json)}")
-            except ContentTypeError:
-                _LOGGER.debug(f"Response: {response}")
-            return await response.json()
+        return await self._request("GET", url, params=params, headers=headers)
 
     async def patch(self, url, headers=None, params=None, json=None) -> Dict[Any, Any]:
         """Send an HTTP PATCH request with sanitized logging.
 
         See `get`/`post` for parameter details.
         """
-        async with _create_client_session() as _session:
-            response = await _session.patch(
-                url, headers=headers, params=params, json=json
-            )
-            # Relocated these below as the sanitization seems to modify the data before it goes to the post.
-            _LOGGER.debug("Request:")
-            _LOGGER.debug(f"url: {url}")
-            _LOGGER.debug(f"json: {self.sanitize(json)}")
-            _LOGGER.debug(f"headers: {self.sanitize(headers)}")
-            _LOGGER.debug(f"params: {self.sanitize(params)}")
-            # Log the response.json() if it exists, if not log the response.
-            try:
-                response_json = await response.json()
-                _LOGGER.debug(f"Response Json: {self.sanitize(response_json)}")
-            except ContentTypeError:
-                _LOGGER.debug(f"Response: {response}")
-            return await response.json()
+        return await self._request(
+            "PATCH", url, headers=headers, params=params, json=json
+        )
 
     async def delete(self, url, headers=None, json=None) -> Dict[Any, Any]:
         """Send an HTTP DELETE request with sanitized logging.
@@ -487,17 +787,4 @@ class WyzeAuthLib:
         Returns:
             Parsed JSON response.
         """
-        async with _create_client_session() as _session:
-            response = await _session.delete(url, headers=headers, json=json)
-            # Relocated these below as the sanitization seems to modify the data before it goes to the post.
-            _LOGGER.debug("Request:")
-            _LOGGER.debug(f"url: {url}")
-            _LOGGER.debug(f"json: {self.sanitize(json)}")
-            _LOGGER.debug(f"headers: {self.sanitize(headers)}")
-            # Log the response.json() if it exists, if not log the response.
-            try:
-                response_json = await response.json()
-                _LOGGER.debug(f"Response Json: {self.sanitize(response_json)}")
-            except ContentTypeError:
-                _LOGGER.debug(f"Response: {response}")
-            return await response.json()
+        return await self._request("DELETE", url, headers=headers, json=json)
@@ -0,0 +1,98 @@
+import asyncio
+import unittest
+from unittest.mock import AsyncMock
+
+from wyzeapy.exceptions import UnknownApiError
+from wyzeapy.services.action_batcher import ActionBatcher
+from wyzeapy.types import Device
+
+
+def make_device(mac):
+    return Device(
+        {
+            "product_type": "MeshLight",
+            "product_model": "WLPA19C",
+            "mac": mac,
+            "nickname": mac,
+        }
+    )
+
+
+class TestActionBatcher(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.send = AsyncMock()
+        self.batcher = ActionBatcher(self.send, window=0.01)
+        self.devices = [make_device(f"MAC{i}") for i in range(3)]
+
+    async def test_actions_within_window_share_one_request(self):
+        await asyncio.gather(
+            *(
+                self.batcher.submit(device, [{"pid": "P3", "pvalue": "1"}])
+                for device in self.devices
+            )
+        )
+
+        self.send.assert_awaited_once()
+        changes = self.send.call_args.args[0]
+        self.assertEqual([device for device, _ in changes], self.devices)
+        self.assertEqual(self.batcher.actions, 3)
+        self.assertEqual(self.batcher.requests, 1)
+
+    async def test_pending_actions_for_one_device_are_merged(self):
+        device = self.devices[0]
+        await asyncio.gather(
+            self.batcher.submit(device, [{"pid": "P3", "pvalue": "1"}]),
+            self.batcher.submit(device, [{"pid": "P1507", "pvalue": "FF0000"}]),
+            self.batcher.submit(device, [{"pid": "P3", "pvalue": "0"}]),
+        )
+
+        self.send.assert_awaited_once_with(
+            [
+                (
+                    device,
+                    [
+                        {"pid": "P3", "pvalue": "0"},
+                        {"pid": "P1507", "pvalue": "FF0000"},
+                    ],
+                )
+            ]
+        )
+
+    async def test_full_batch_is_sent_without_waiting(self):
+        self.batcher = ActionBatcher(self.send, window=60, max_actions=2)
+
+        await asyncio.wait_for(
+            asyncio.gather(
+                *(
+                    self.batcher.submit(device, [{"pid": "P3", "pvalue": "1"}])
+                    for device in self.devices[:2]
+                )
+            ),
+            timeout=1,
+        )
+
+        self.send.assert_awaited_once()
+
+    async def test_rejected_batch_is_retried_per_device(self):
+        async def send(changes):
+            if len(changes) > 1 or changes[0][0] is self.devices[1]:
+                raise UnknownApiError("rejected")
+
+        self.batcher = ActionBatcher(send)
+
+        results = await asyncio.gather(
+            *(
+                self.batcher.submit(device, [{"pid": "P3", "pvalue": "1"}])
+                for device in self.devices
+            ),
+            return_exceptions=True,
+        )
+
+        self.assertIsNone(results[0])
+        self.assertIsInstance(results[1], UnknownApiError)
+        self.assertIsNone(results[2])
+        self.assertEqual(self.batcher.requests, 4)
+
+
+if __name__ == "__main__":
+    unittest.main()
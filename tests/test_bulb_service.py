@@ -1,3 +1,4 @@
+import asyncio
 import unittest
 from unittest.mock import AsyncMock, MagicMock
 from wyzeapy.services.bulb_service import BulbService, Bulb
@@ -11,6 +12,71 @@ class TestBulbService(unittest.IsolatedAsyncioTestCase):
         self.bulb_service._get_property_list = AsyncMock()
         self.bulb_service.get_updated_params = AsyncMock()
 
+    async def test_turn_off_many_batches_wifi_bulbs(self):
+        self.bulb_service._set_many_device_list_property_lists = AsyncMock(
+            return_value=[]
+        )
+        self.bulb_service._run_action_lists = AsyncMock()
+        wifi_bulbs = [
+            Bulb(
+                {
+                    "product_type": "Light",
+                    "product_model": "WLPA19",
+                    "mac": f"B{i}",
+                    "device_params": {"ip": f"192.168.1.{i}"},
+                }
+            )
+            for i in range(2)
+        ]
+        mesh_bulb = Bulb(
+            {
+                "product_type": "MeshLight",
+                "product_model": "WLPA19C",
+                "mac": "M1",
+                "device_params": {"ip": "192.168.1.50"},
+            }
+        )
+
+        failed = await self.bulb_service.turn_off_many(wifi_bulbs + [mesh_bulb])
+
+        self.assertEqual(failed, [])
+        changes = self.bulb_service._set_many_device_list_property_lists.call_args.args[
+            0
+        ]
+        self.assertEqual([bulb for bulb, _ in changes], wifi_bulbs)
+        self.assertEqual(changes[0][1], [{"pid": "P3", "pvalue": "0"}])
+        self.bulb_service._run_action_lists.assert_awaited_once_with(
+            [(mesh_bulb, [{"pid": "P3", "pvalue": "0"}])]
+        )
+
+    async def test_cloud_changes_in_a_burst_share_one_request(self):
+        self.bulb_service._run_action_lists = AsyncMock()
+        self.bulb_service.action_batcher.window = 0.01
+        bulbs = [
+            Bulb(
+                {
+                    "product_type": "MeshLight",
+                    "product_model": "WLPA19C",
+                    "mac": f"M{i}",
+                    "device_params": {"ip": f"192.168.1.{i}"},
+                }
+            )
+            for i in range(3)
+        ]
+
+        await asyncio.gather(
+            *(self.bulb_service.turn_off(bulb, local_control=False) for bulb in bulbs),
+            self.bulb_service.set_color(bulbs[0], "FF0000", local_control=False),
+        )
+
+        self.bulb_service._run_action_lists.assert_awaited_once()
+        changes = self.bulb_service._run_action_lists.call_args.args[0]
+        self.assertEqual([bulb for bulb, _ in changes], bulbs)
+        self.assertEqual(
+            changes[0][1],
+            [{"pid": "P3", "pvalue": "0"}, {"pid": "P1507", "pvalue": "FF0000"}],
+        )
+
     async def test_update_bulb_basic_properties(self):
         mock_bulb = Bulb(
             {
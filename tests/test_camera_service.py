@@ -15,8 +15,6 @@ from aiohttp import ClientOSError, ContentTypeError
 
 class TestCameraService(unittest.IsolatedAsyncioTestCase):
     async def asyncSetUp(self):
-        CameraService._updater_thread = None
-        CameraService._subscribers = []
         self.mock_auth_lib = MagicMock(spec=WyzeAuthLib)
         self.camera_service = CameraService(auth_lib=self.mock_auth_lib)
         self.camera_service._get_property_list = AsyncMock()
@@ -108,6 +106,7 @@ class TestCameraService(unittest.IsolatedAsyncioTestCase):
                 ]
             }
         }
+        self.camera_service.get_updated_params.return_value = {"ip": "192.168.1.100"}
 
         self.camera_service._get_property_list.return_value = [
             (PropertyIDs.AVAILABLE, "1"),
@@ -402,8 +401,12 @@ class TestCameraService(unittest.IsolatedAsyncioTestCase):
         self.assertEqual(len(self.camera_service._subscribers), 1)
         self.assertEqual(self.camera_service._subscribers[0][0], self.test_camera)
         self.assertEqual(self.camera_service._subscribers[0][1], mock_callback)
-        self.assertIsNotNone(self.camera_service._updater_thread)
-        self.assertTrue(self.camera_service._updater_thread.is_alive())
+        task = self.camera_service._subscriptions._tasks[self.test_camera.mac]
+        self.assertFalse(task.done())
+
+        await self.camera_service.deregister_for_updates(self.test_camera)
+        await asyncio.sleep(0)
+        self.assertTrue(task.cancelled())
 
     async def test_deregister_for_updates(self):
         mock_callback1 = MagicMock()
@@ -422,14 +425,14 @@ class TestCameraService(unittest.IsolatedAsyncioTestCase):
         mock_callback.return_value = None  # Ensure callback doesn't return a coroutine
         self.camera_service.update = AsyncMock(return_value=self.test_camera)
 
-        await self.camera_service.register_for_updates(self.test_camera, mock_callback)
+        await self.camera_service.register_for_updates(
+            self.test_camera, mock_callback, interval=0.01
+        )
 
-        # Give the worker a moment to run
-        await asyncio.sleep(0.2)
+        # Give the subscription task a moment to run
+        await asyncio.sleep(0.1)
 
-        # Manually stop the thread for testing purposes
-        self.camera_service._subscribers = []
-        self.camera_service._updater_thread.join(timeout=1)
+        await self.camera_service.deregister_for_updates(self.test_camera)
 
         # The update method should have been called at least once
         self.assertGreater(self.camera_service.update.call_count, 0)
@@ -455,15 +458,13 @@ class TestCameraService(unittest.IsolatedAsyncioTestCase):
             patch("wyzeapy.services.camera_service._LOGGER.error") as mock_error,
         ):
             await self.camera_service.register_for_updates(
-                self.test_camera, mock_callback
+                self.test_camera, mock_callback, interval=0.01
             )
 
-            # Give the worker a moment to run through exceptions
-            await asyncio.sleep(0.3)
+            # Give the subscription task a moment to run through exceptions
+            await asyncio.sleep(0.2)
 
-            # Manually stop the thread for testing purposes
-            self.camera_service._subscribers = []
-            self.camera_service._updater_thread.join(timeout=1)
+            await self.camera_service.deregister_for_updates(self.test_camera)
 
             # Check that the update method was called at least the number of exceptions we set up
             self.assertGreaterEqual(
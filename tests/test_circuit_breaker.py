@@ -0,0 +1,136 @@
+import asyncio
+import unittest
+from unittest.mock import AsyncMock, MagicMock
+
+import aiohttp
+
+from wyzeapy.circuit_breaker import (
+    CircuitBreaker,
+    CircuitBreakers,
+    CircuitState,
+    track_hosts,
+)
+from wyzeapy.exceptions import CircuitOpenError, UnknownApiError
+from wyzeapy.services.update_manager import DeviceUpdater, UpdateManager
+from wyzeapy.types import Device
+from wyzeapy.wyze_auth_lib import WyzeAuthLib
+
+HOST = "wyze-lockwood-service.wyzecam.com"
+
+
+class TestCircuitBreaker(unittest.TestCase):
+    def setUp(self):
+        self.breaker = CircuitBreaker(HOST, failure_threshold=3, cooldown=60)
+
+    def open_breaker(self):
+        for _ in range(3):
+            self.breaker.before_request()
+            self.breaker.record_failure()
+
+    def test_opens_after_threshold_and_fails_fast(self):
+        self.open_breaker()
+
+        self.assertIs(self.breaker.state, CircuitState.OPEN)
+        with self.assertRaises(CircuitOpenError) as cm:
+            self.breaker.before_request()
+        self.assertEqual(cm.exception.host, HOST)
+
+    def test_success_resets_failure_count(self):
+        self.breaker.record_failure()
+        self.breaker.record_failure()
+        self.breaker.record_success()
+        self.breaker.record_failure()
+
+        self.assertIs(self.breaker.state, CircuitState.CLOSED)
+
+    def test_half_open_allows_a_single_probe(self):
+        self.open_breaker()
+        self.breaker.cooldown = 0
+
+        self.breaker.before_request()
+        with self.assertRaises(CircuitOpenError):
+            self.breaker.before_request()
+
+        self.breaker.record_success()
+        self.assertIs(self.breaker.state, CircuitState.CLOSED)
+        self.breaker.before_request()
+
+    def test_failed_probe_reopens(self):
+        self.open_breaker()
+        self.breaker.cooldown = 0
+        self.breaker.before_request()
+        self.breaker.cooldown = 60
+
+        self.breaker.record_failure()
+
+        self.assertIs(self.breaker.state, CircuitState.OPEN)
+        self.assertEqual(self.breaker.opened, 2)
+
+
+class TestAuthLibCircuitBreakers(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.auth_lib = WyzeAuthLib(
+            circuit_breakers=CircuitBreakers(failure_threshold=2, cooldown=60)
+        )
+        self.url = f"https://{HOST}/plugin/irrigation/get_iot_prop"
+
+    async def test_network_failures_open_the_hosts_circuit(self):
+        self.auth_lib._send = AsyncMock(side_effect=aiohttp.ClientOSError())
+
+        for _ in range(2):
+            with self.assertRaises(aiohttp.ClientOSError):
+                await self.auth_lib.post(self.url)
+        with self.assertRaises(CircuitOpenError):
+            await self.auth_lib.post(self.url)
+
+        self.assertEqual(self.auth_lib._send.await_count, 2)
+        self.assertTrue(self.auth_lib.circuit_breakers.is_open(HOST))
+        self.assertFalse(self.auth_lib.circuit_breakers.is_open("api.wyzecam.com"))
+
+    async def test_api_errors_do_not_count_as_failures(self):
+        self.auth_lib._send = AsyncMock(side_effect=UnknownApiError("bad request"))
+
+        for _ in range(3):
+            with self.assertRaises(UnknownApiError):
+                await self.auth_lib.post(self.url)
+
+        self.assertFalse(self.auth_lib.circuit_breakers.is_open(HOST))
+
+    async def test_contacted_hosts_are_tracked(self):
+        self.auth_lib._send = AsyncMock(return_value={})
+
+        with track_hosts() as hosts:
+            await self.auth_lib.post(self.url)
+
+        self.assertEqual(hosts, {HOST})
+
+
+class TestUpdateManagerSkipsOpenCircuits(unittest.IsolatedAsyncioTestCase):
+    async def test_updater_with_open_backend_is_postponed(self):
+        UpdateManager.updaters = []
+        manager = UpdateManager()
+        breakers = CircuitBreakers(failure_threshold=1)
+        breakers.for_host(HOST).record_failure()
+
+        device = MagicMock(spec=Device)
+        device.nickname = "Sprinkler"
+        service = MagicMock()
+        service.update = AsyncMock(return_value=device)
+        service.circuit_breakers = breakers
+        updater = DeviceUpdater(service, device, 60)
+        updater.hosts = {HOST}
+        manager.add_updater(updater)
+
+        task = asyncio.create_task(manager.update_next())
+        await asyncio.sleep(0.05)
+        task.cancel()
+        with self.assertRaises(asyncio.CancelledError):
+            await task
+
+        service.update.assert_not_awaited()
+        self.assertGreater(updater.next_update, 0)
+        self.assertIn(updater, manager.updaters)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,28 @@
+import json
+import unittest
+
+from wyzeapy import codec
+
+
+class TestCodec(unittest.TestCase):
+    def tearDown(self):
+        codec.set_codec(codec.ORJSON_CODEC or codec.STDLIB_CODEC)
+
+    def test_dumps_is_compact(self):
+        self.assertEqual(codec.dumps({"a": 1, "b": [1, 2]}), '{"a":1,"b":[1,2]}')
+
+    def test_loads_accepts_bytes_and_str(self):
+        self.assertEqual(codec.loads(b'{"a":1}'), {"a": 1})
+        self.assertEqual(codec.loads('{"a":1}'), {"a": 1})
+
+    def test_stdlib_codec_matches_json_module(self):
+        codec.set_codec(codec.STDLIB_CODEC)
+        payload = {"mac": "ABC", "value": 1, "nested": {"x": True}}
+        self.assertIs(codec.get_codec(), codec.STDLIB_CODEC)
+        self.assertEqual(
+            codec.dumps(payload), json.dumps(payload, separators=(",", ":"))
+        )
+
+    def test_default_codec_prefers_orjson(self):
+        expected = "orjson" if codec.ORJSON_CODEC is not None else "json"
+        self.assertEqual(codec.get_codec().name, expected)
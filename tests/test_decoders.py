@@ -0,0 +1,86 @@
+import unittest
+
+from wyzeapy.services.bulb_service import Bulb, decode_bulb, decode_color_bulb
+from wyzeapy.services.decoders import Field, compile_decoder, is_one
+from wyzeapy.services.thermostat_service import (
+    FanMode,
+    HVACMode,
+    Thermostat,
+    decode_thermostat,
+)
+from wyzeapy.types import PropertyIDs
+
+
+class Target:
+    pass
+
+
+class TestCompileDecoder(unittest.TestCase):
+    def test_enum_and_raw_keys_decode_alike(self):
+        decode = compile_decoder({PropertyIDs.ON: Field("on", is_one)})
+
+        self.assertTrue(decode(Target(), [(PropertyIDs.ON, "1")]).on)
+        self.assertFalse(decode(Target(), [("P3", "0")]).on)
+
+    def test_unknown_keys_are_skipped(self):
+        decode = compile_decoder({"known": Field("known")})
+
+        target = decode(Target(), [("unknown", "x"), ("known", 5)])
+
+        self.assertEqual(vars(target), {"known": 5})
+
+    def test_default_replaces_rejected_value(self):
+        decode = compile_decoder(
+            {"temp": Field("temp", int, default=2700), "level": Field("level", int)}
+        )
+
+        self.assertEqual(decode(Target(), [("temp", "warm")]).temp, 2700)
+        with self.assertRaises(ValueError):
+            decode(Target(), [("level", "high")])
+
+    def test_one_key_can_set_several_attributes(self):
+        decode = compile_decoder(
+            {"P1056": (Field("floodlight", is_one), Field("garage", is_one))}
+        )
+
+        target = decode(Target(), [("P1056", "1")])
+
+        self.assertTrue(target.floodlight and target.garage)
+
+
+class TestDeviceTables(unittest.TestCase):
+    def test_thermostat_props(self):
+        thermostat = Thermostat({"mac": "T1", "product_type": "Thermostat"})
+
+        decode_thermostat(
+            thermostat,
+            {
+                "fan_mode": "on",
+                "mode_sys": "cool",
+                "temperature": "70.5",
+                "iot_state": "disconnected",
+                "w_lat": "1.0",
+                "not_a_prop": "x",
+            }.items(),
+        )
+
+        self.assertEqual(thermostat.fan_mode, FanMode.ON)
+        self.assertEqual(thermostat.hvac_mode, HVACMode.COOL)
+        self.assertEqual(thermostat.temperature, 70.5)
+        self.assertFalse(thermostat.available)
+
+    def test_only_color_bulbs_take_a_color(self):
+        raw = {"mac": "B1", "product_type": "MeshLight", "device_params": {"ip": "x"}}
+        items = [(PropertyIDs.COLOR, "FF0000"), (PropertyIDs.BRIGHTNESS, "55.0")]
+
+        color_bulb = decode_color_bulb(Bulb(raw), items)
+        white_bulb = decode_bulb(Bulb(dict(raw, product_type="Light")), items)
+
+        self.assertEqual(color_bulb.color, "FF0000")
+        self.assertEqual(color_bulb.brightness, 55)
+        self.assertFalse(hasattr(white_bulb, "_color"))
+        self.assertEqual(white_bulb.brightness, 55)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,249 @@
+import asyncio
+import time
+import unittest
+from unittest.mock import AsyncMock, MagicMock
+
+from wyzeapy.services.base_service import BaseService
+from wyzeapy.services.device_registry import DeviceRegistry
+from wyzeapy.types import Device, DeviceTypes
+from wyzeapy.wyze_auth_lib import WyzeAuthLib
+
+
+def make_device(mac, product_type, product_model, **extra):
+    return Device(
+        {
+            "mac": mac,
+            "product_type": product_type,
+            "product_model": product_model,
+            **extra,
+        }
+    )
+
+
+class TestDeviceRegistry(unittest.TestCase):
+    def setUp(self):
+        self.plug = make_device("PLUG1", "Plug", "WLPP1")
+        self.bulb = make_device("BULB1", "Light", "WLPA19")
+        self.outdoor = make_device("PLUG2", "OutdoorPlug", "WLPPO")
+        self.purifier = make_device("AP1", "Common", "CO_AP1")
+        self.registry = DeviceRegistry(
+            [self.plug, self.bulb, self.outdoor, self.purifier]
+        )
+
+    def test_lookup_by_mac(self):
+        self.assertIs(self.registry.get("BULB1"), self.bulb)
+        self.assertIsNone(self.registry.get("MISSING"))
+        self.assertIn("PLUG2", self.registry)
+        self.assertEqual(self.registry.macs, {"PLUG1", "BULB1", "PLUG2", "AP1"})
+
+    def test_lookup_by_type_keeps_discovery_order(self):
+        self.assertEqual(
+            self.registry.by_type(DeviceTypes.OUTDOOR_PLUG, DeviceTypes.PLUG),
+            [self.plug, self.outdoor],
+        )
+        self.assertEqual(self.registry.by_type(DeviceTypes.LOCK), [])
+
+    def test_lookup_by_model(self):
+        self.assertEqual(self.registry.by_model("CO_AP1"), [self.purifier])
+        self.assertEqual(self.registry.by_model("WLPA19", "NOPE"), [self.bulb])
+
+    def test_returned_lists_are_copies(self):
+        self.registry.by_type(DeviceTypes.LIGHT).clear()
+        self.assertEqual(self.registry.by_type(DeviceTypes.LIGHT), [self.bulb])
+
+    def test_len_and_iter(self):
+        self.assertEqual(len(self.registry), 4)
+        self.assertEqual(list(self.registry)[0], self.plug)
+
+
+class TestDiscoveryMerge(unittest.TestCase):
+    def setUp(self):
+        self.entries = [
+            {
+                "mac": "PLUG1",
+                "product_type": "Plug",
+                "product_model": "WLPP1",
+                "nickname": "Lamp",
+            },
+            {
+                "mac": "BULB1",
+                "product_type": "Light",
+                "product_model": "WLPA19",
+                "nickname": "Desk",
+            },
+            {
+                "mac": "AP1",
+                "product_type": "Common",
+                "product_model": "CO_AP1",
+                "nickname": "Air",
+            },
+        ]
+        self.registry, _ = DeviceRegistry([]).merge(self.entries)
+
+    def test_first_discovery_adds_every_device(self):
+        registry, diff = DeviceRegistry([]).merge(self.entries)
+
+        self.assertEqual(
+            [device.mac for device in diff.added], ["PLUG1", "BULB1", "AP1"]
+        )
+        self.assertFalse(diff.removed or diff.changed)
+
+    def test_unchanged_devices_keep_identity(self):
+        entries = [dict(entry) for entry in reversed(self.entries)]
+        registry, diff = self.registry.merge(entries)
+
+        self.assertFalse(diff)
+        self.assertIs(registry.get("PLUG1"), self.registry.get("PLUG1"))
+        self.assertEqual(registry.macs, self.registry.macs)
+
+    def test_diff_reports_added_removed_changed_and_renamed(self):
+        entries = [
+            {
+                "mac": "PLUG1",
+                "product_type": "Plug",
+                "product_model": "WLPP1",
+                "nickname": "Lamp",
+                "x": 1,
+            },
+            {
+                "mac": "BULB1",
+                "product_type": "Light",
+                "product_model": "WLPA19",
+                "nickname": "Desk lamp",
+            },
+            {
+                "mac": "CAM1",
+                "product_type": "Camera",
+                "product_model": "WYZEC1",
+                "nickname": "Door",
+            },
+        ]
+        registry, diff = self.registry.merge(entries)
+
+        self.assertEqual([device.mac for device in diff.added], ["CAM1"])
+        self.assertEqual([device.mac for device in diff.removed], ["AP1"])
+        self.assertEqual([device.mac for device in diff.changed], ["PLUG1", "BULB1"])
+        self.assertEqual([device.mac for device in diff.renamed], ["BULB1"])
+        self.assertIsNot(registry.get("PLUG1"), self.registry.get("PLUG1"))
+        self.assertEqual(registry.get("BULB1").nickname, "Desk lamp")
+
+
+class TestBaseServiceRegistry(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.mock_auth_lib = MagicMock(spec=WyzeAuthLib)
+        self.mock_auth_lib.token = MagicMock(access_token="token")
+        self.mock_auth_lib.refresh_if_should = AsyncMock()
+        self.mock_auth_lib.post = AsyncMock(
+            return_value={
+                "code": "1",
+                "data": {
+                    "device_list": [
+                        {
+                            "mac": "PLUG1",
+                            "product_type": "Plug",
+                            "product_model": "WLPP1",
+                            "device_params": {"switch_state": 1},
+                        }
+                    ]
+                },
+            }
+        )
+        self.service = BaseService(self.mock_auth_lib)
+
+    async def asyncTearDown(self):
+        BaseService._devices = None
+        BaseService._registry = None
+        BaseService._last_updated_time = 0
+        BaseService._snapshot_refresh = None
+        BaseService._snapshot_retry_at = 0
+
+    async def test_discovery_builds_registry(self):
+        devices = await self.service.get_object_list()
+
+        self.assertIs(BaseService._registry.devices, devices)
+        self.assertIs(await self.service._get_registry(), BaseService._registry)
+        self.mock_auth_lib.post.assert_awaited_once()
+
+    async def test_get_updated_params_uses_registry(self):
+        BaseService._last_updated_time = 0
+        params = await self.service.get_updated_params("PLUG1")
+
+        self.assertEqual(params, {"switch_state": 1})
+        self.assertEqual(await self.service.get_updated_params("MISSING"), {})
+
+    async def test_stale_snapshot_is_served_while_refreshing(self):
+        await self.service.get_object_list()
+        BaseService._last_updated_time = time.time() - BaseService._min_update_time
+        release = asyncio.Event()
+        refreshed = self.mock_auth_lib.post.return_value
+
+        async def slow_post(*args, **kwargs):
+            await release.wait()
+            return refreshed
+
+        self.mock_auth_lib.post = AsyncMock(side_effect=slow_post)
+
+        results = await asyncio.gather(
+            *(self.service.get_updated_params("PLUG1") for _ in range(5))
+        )
+
+        # Every reader got the old snapshot without waiting for discovery
+        self.assertEqual(results, [{"switch_state": 1}] * 5)
+        await asyncio.sleep(0)
+        self.mock_auth_lib.post.assert_awaited_once()
+
+        release.set()
+        await BaseService._snapshot_refresh
+        self.assertLess(self.service.snapshot_age, 5)
+
+    async def test_failed_refresh_keeps_snapshot_and_backs_off(self):
+        await self.service.get_object_list()
+        BaseService._last_updated_time = time.time() - BaseService._min_update_time
+        self.mock_auth_lib.post = AsyncMock(side_effect=ValueError("boom"))
+
+        self.assertEqual(
+            await self.service.get_updated_params("PLUG1"), {"switch_state": 1}
+        )
+        await BaseService._snapshot_refresh
+        await self.service.get_updated_params("PLUG1")
+
+        self.mock_auth_lib.post.assert_awaited_once()
+        self.assertGreater(self.service.snapshot_age, BaseService._min_update_time - 1)
+
+    async def test_discovered_device_shares_one_discovery_per_round(self):
+        first = await self.service._discovered_device("PLUG1")
+        second = await self.service._discovered_device("PLUG1")
+
+        self.assertIs(first, second)
+        self.assertEqual(first.device_params, {"switch_state": 1})
+        self.mock_auth_lib.post.assert_awaited_once()
+
+    async def test_rediscovery_notifies_listeners_of_changes(self):
+        diffs = []
+        BaseService.add_discovery_listener(diffs.append)
+        try:
+            first = await self.service.get_object_list()
+            second = await self.service.get_object_list()
+        finally:
+            BaseService.remove_discovery_listener(diffs.append)
+
+        # The second discovery found nothing new, so only the first was reported
+        self.assertEqual(len(diffs), 1)
+        self.assertEqual([device.mac for device in diffs[0].added], ["PLUG1"])
+        self.assertIs(second[0], first[0])
+
+    async def test_snapshot_interval_and_age(self):
+        self.assertIsNone(self.service.snapshot_age)
+        interval = self.service.snapshot_interval
+        try:
+            self.service.snapshot_interval = 30
+            self.assertEqual(BaseService._min_update_time, 30)
+        finally:
+            self.service.snapshot_interval = interval
+
+        await self.service.get_updated_params("PLUG1")
+        self.assertGreaterEqual(self.service.snapshot_age, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,103 @@
+import asyncio
+import unittest
+from unittest.mock import AsyncMock, MagicMock
+
+from wyzeapy.services.camera_service import CameraService, Camera
+from wyzeapy.services.event_poller import EventPoller
+from wyzeapy.types import DeviceTypes
+from wyzeapy.wyze_auth_lib import WyzeAuthLib
+
+
+def event_page(*events):
+    return {
+        "data": {
+            "event_list": [
+                {"device_mac": mac, "event_ts": ts, "event_id": f"{mac}-{ts}"}
+                for mac, ts in events
+            ]
+        }
+    }
+
+
+class TestEventPoller(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.service = MagicMock()
+        self.service._get_event_list = AsyncMock(
+            return_value=event_page(("CAM1", 2000), ("CAM2", 1500), ("CAM1", 1000))
+        )
+        self.poller = EventPoller(self.service, min_interval=60, page_size=10)
+        self.poller._cursor = 0
+
+    async def test_poll_indexes_latest_event_per_mac(self):
+        latest = await self.poller.poll()
+
+        self.assertEqual(latest["CAM1"].event_ts, 2000)
+        self.assertEqual(latest["CAM2"].event_ts, 1500)
+        self.assertIs(self.poller.latest_for("CAM2"), latest["CAM2"])
+        self.assertIsNone(self.poller.latest_for("CAM3"))
+
+    async def test_poll_is_shared_within_interval(self):
+        await asyncio.gather(*(self.poller.poll() for _ in range(5)))
+        await self.poller.poll()
+
+        self.service._get_event_list.assert_awaited_once()
+        self.assertEqual(self.poller.polls, 1)
+
+    async def test_cursor_moves_past_last_seen_event(self):
+        await self.poller.poll()
+        self.poller.min_interval = 0
+        self.service._get_event_list.return_value = event_page()
+
+        await self.poller.poll()
+
+        _, kwargs = self.service._get_event_list.call_args
+        self.assertEqual(kwargs["begin_time"], 2001)
+        # Events already known are kept when nothing new arrives
+        self.assertEqual(self.poller.latest_for("CAM1").event_ts, 2000)
+
+    async def test_full_page_fetches_older_events(self):
+        self.poller.page_size = 2
+        self.service._get_event_list.side_effect = [
+            event_page(("CAM1", 3000), ("CAM1", 2500)),
+            event_page(("CAM2", 2000)),
+        ]
+
+        latest = await self.poller.poll()
+
+        self.assertEqual(self.service._get_event_list.await_count, 2)
+        _, kwargs = self.service._get_event_list.call_args
+        self.assertEqual(kwargs["end_time"], 2499)
+        self.assertEqual(latest["CAM2"].event_ts, 2000)
+
+
+class TestCameraServiceEvents(unittest.IsolatedAsyncioTestCase):
+    async def test_cameras_share_one_event_query(self):
+        service = CameraService(auth_lib=MagicMock(spec=WyzeAuthLib))
+        service.get_updated_params = AsyncMock(return_value={})
+        service._get_property_list = AsyncMock(return_value=[])
+        service._get_event_list = AsyncMock(
+            return_value=event_page(("CAM1", 2000), ("CAM2", 1500))
+        )
+        cameras = [
+            Camera(
+                {
+                    "product_type": DeviceTypes.CAMERA.value,
+                    "product_model": "WYZEC1",
+                    "mac": mac,
+                    "nickname": mac,
+                    "device_params": {},
+                }
+            )
+            for mac in ("CAM1", "CAM2")
+        ]
+
+        for camera in cameras:
+            await service.update(camera)
+
+        service._get_event_list.assert_awaited_once()
+        self.assertEqual(cameras[0].last_event_ts, 2000)
+        self.assertEqual(cameras[1].last_event_ts, 1500)
+
+
+if __name__ == "__main__":
+    unittest.main()
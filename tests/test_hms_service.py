@@ -1,5 +1,6 @@
+import asyncio
 import unittest
-from unittest.mock import AsyncMock, MagicMock
+from unittest.mock import AsyncMock, MagicMock, patch
 from wyzeapy.services.hms_service import HMSService, HMSMode
 from wyzeapy.wyze_auth_lib import WyzeAuthLib
 
@@ -95,6 +96,28 @@ class TestHMSService(unittest.IsolatedAsyncioTestCase):
         self.assertEqual(hms_id, "found_hms_id")
         self.assertEqual(self.hms_service._hms_id, "found_hms_id")
 
+    async def test_saved_id_is_served_and_revalidated_in_background(self):
+        lookup = AsyncMock(
+            return_value={"data": [{"deviceList": [{"device_id": "current_id"}]}]}
+        )
+        with patch.object(HMSService, "_get_plan_binding_list_by_user", lookup):
+            hms_service = await HMSService.create(self.mock_auth_lib, "saved_id")
+            self.assertEqual(hms_service.hms_id, "saved_id")
+
+            await hms_service._revalidation
+
+        self.assertEqual(hms_service.hms_id, "current_id")
+        lookup.assert_awaited_once()
+
+    async def test_saved_id_is_kept_if_revalidation_fails(self):
+        lookup = AsyncMock(side_effect=asyncio.TimeoutError())
+        with patch.object(HMSService, "_get_plan_binding_list_by_user", lookup):
+            hms_service = await HMSService.create(self.mock_auth_lib, "saved_id")
+            with self.assertLogs("wyzeapy.services.hms_service", "WARNING"):
+                await hms_service._revalidation
+
+        self.assertEqual(hms_service.hms_id, "saved_id")
+
 
 if __name__ == "__main__":
     unittest.main()
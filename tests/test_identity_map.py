@@ -0,0 +1,95 @@
+import gc
+import unittest
+from unittest.mock import AsyncMock, MagicMock
+
+from wyzeapy.services.bulb_service import Bulb, BulbService
+from wyzeapy.services.device_registry import DeviceRegistry
+from wyzeapy.services.identity_map import IdentityMap
+from wyzeapy.types import Device
+
+
+def make_raw(mac="BULB1", nickname="Desk"):
+    return {
+        "product_type": "Light",
+        "product_model": "WLPA19",
+        "mac": mac,
+        "nickname": nickname,
+        "device_params": {"ip": "192.168.1.20"},
+    }
+
+
+class TestIdentityMap(unittest.TestCase):
+    def setUp(self):
+        self.identity_map = IdentityMap()
+
+    def test_same_mac_and_class_share_one_object(self):
+        raw = make_raw()
+        first = self.identity_map.get(Bulb, raw)
+        first.brightness = 40
+
+        second = self.identity_map.get(Bulb, raw)
+
+        self.assertIs(first, second)
+        self.assertEqual(second.brightness, 40)
+        self.assertEqual((self.identity_map.created, self.identity_map.hits), (1, 1))
+
+    def test_classes_are_kept_apart(self):
+        raw = make_raw()
+        self.assertIsNot(
+            self.identity_map.get(Bulb, raw), self.identity_map.get(Device, raw)
+        )
+
+    def test_changed_entry_updates_in_place(self):
+        bulb = self.identity_map.get(Bulb, make_raw())
+        bulb.on = True
+
+        renamed = self.identity_map.get(Bulb, make_raw(nickname="Desk lamp"))
+
+        self.assertIs(renamed, bulb)
+        self.assertEqual(bulb.nickname, "Desk lamp")
+        self.assertTrue(bulb.on)
+
+    def test_states_leave_out_discovery_fields(self):
+        bulb = self.identity_map.get(Bulb, make_raw())
+        bulb.on = True
+        bulb.available = True
+        bulb.cloud_fallback = True
+
+        state = self.identity_map.states()["BULB1"]["Bulb"]
+
+        self.assertTrue(state["on"])
+        for name in ("ip", "available", "cloud_fallback", "nickname", "_type"):
+            self.assertNotIn(name, state)
+
+    def test_seeds_apply_per_class_to_the_saved_entry(self):
+        raw = make_raw()
+        self.identity_map.seed(
+            {"BULB1": {"Bulb": {"on": True}, "Device": {"available": True}}}, [raw]
+        )
+
+        self.assertTrue(self.identity_map.get(Bulb, dict(raw)).on)
+        self.assertFalse(
+            self.identity_map.get(Device, make_raw(nickname="New")).available
+        )
+
+    def test_unreferenced_objects_are_collected(self):
+        self.identity_map.get(Bulb, make_raw())
+        gc.collect()
+
+        self.assertEqual(len(self.identity_map), 0)
+
+
+class TestServiceIdentity(unittest.IsolatedAsyncioTestCase):
+    async def test_get_bulbs_returns_canonical_objects(self):
+        service = BulbService(auth_lib=MagicMock())
+        registry = DeviceRegistry([Device(make_raw())])
+        service._get_registry = AsyncMock(return_value=registry)
+
+        first = await service.get_bulbs()
+        second = await service.get_bulbs()
+
+        self.assertIs(first[0], second[0])
+
+
+if __name__ == "__main__":
+    unittest.main()
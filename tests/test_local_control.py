@@ -0,0 +1,149 @@
+import asyncio
+import unittest
+from unittest.mock import AsyncMock, MagicMock
+
+import aiohttp
+
+from wyzeapy.services.base_service import BaseService
+from wyzeapy.services.bulb_service import Bulb, BulbService
+from wyzeapy.services.device_registry import DeviceRegistry
+from wyzeapy.services.local_control import LocalControlClient
+
+
+BULB = {
+    "product_type": "MeshLight",
+    "product_model": "WLPA19C",
+    "mac": "BULB1",
+    "device_params": {"ip": "192.168.1.20"},
+}
+
+
+def make_bulb():
+    bulb = Bulb(BULB)
+    bulb.enr = "0123456789abcdef"
+    return bulb
+
+
+def post_context(text="ok", side_effect=None):
+    context = MagicMock()
+    if side_effect is not None:
+        context.__aenter__ = AsyncMock(side_effect=side_effect)
+    else:
+        response = MagicMock()
+        response.text = AsyncMock(return_value=text)
+        context.__aenter__ = AsyncMock(return_value=response)
+    context.__aexit__ = AsyncMock(return_value=None)
+    return context
+
+
+class TestLocalControlClient(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.client = LocalControlClient(probe_interval=0.01)
+        self.session = MagicMock()
+        self.session.closed = False
+        self.session.close = AsyncMock()
+        self.client._session = self.session
+
+    async def asyncTearDown(self):
+        await self.client.close()
+
+    async def test_send_records_latency(self):
+        self.session.post = MagicMock(return_value=post_context("ok"))
+
+        response = await self.client.send("192.168.1.20", "{}")
+
+        self.assertEqual(response, "ok")
+        self.session.post.assert_called_once_with(
+            "http://192.168.1.20:88/device_request", data="{}"
+        )
+        latency = self.client.latency["192.168.1.20"]
+        self.assertEqual(latency.commands, 1)
+        self.assertEqual(latency.failures, 0)
+        self.assertGreaterEqual(latency.max, latency.last)
+
+    async def test_send_counts_failures(self):
+        self.session.post = MagicMock(
+            return_value=post_context(side_effect=asyncio.TimeoutError())
+        )
+
+        with self.assertRaises(asyncio.TimeoutError):
+            await self.client.send("192.168.1.20", "{}")
+
+        self.assertEqual(self.client.latency["192.168.1.20"].failures, 1)
+
+    async def test_watch_restores_local_control(self):
+        bulb = make_bulb()
+        bulb.cloud_fallback = True
+        self.client.probe = AsyncMock(side_effect=[False, True])
+
+        self.client.watch(bulb)
+        self.client.watch(bulb)
+        await asyncio.wait_for(self.client._probes[bulb.mac], timeout=1)
+
+        self.assertFalse(bulb.cloud_fallback)
+        self.assertEqual(self.client.probe.await_count, 2)
+
+
+class TestLocalBulbCommand(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.service = BulbService(auth_lib=MagicMock())
+        self.service._run_action_list = AsyncMock()
+        self.service.local_control.watch = MagicMock()
+
+    async def test_local_command_uses_lan_client(self):
+        bulb = make_bulb()
+        self.service.local_control.send = AsyncMock(return_value="ok")
+
+        await self.service.turn_on(bulb, local_control=True)
+
+        self.service.local_control.send.assert_awaited_once()
+        self.assertEqual(self.service.local_control.send.call_args.args[0], bulb.ip)
+        self.service._run_action_list.assert_not_awaited()
+        self.assertFalse(bulb.cloud_fallback)
+
+    async def test_unreachable_bulb_falls_back_to_cloud_and_is_watched(self):
+        bulb = make_bulb()
+        self.service.local_control.send = AsyncMock(
+            side_effect=aiohttp.ClientConnectionError()
+        )
+
+        await self.service.turn_on(bulb, local_control=True)
+
+        self.service._run_action_list.assert_awaited_once()
+        self.assertTrue(bulb.cloud_fallback)
+        self.service.local_control.watch.assert_called_once_with(bulb)
+
+    async def test_bulb_restored_without_key_waits_for_discovery(self):
+        # A warm-started bulb has no enr until the background discovery lands
+        bulb = Bulb(BULB)
+        self.service.local_control.send = AsyncMock(return_value="ok")
+
+        async def discovery():
+            await asyncio.sleep(0)
+            entry = dict(BULB, enr="0123456789abcdef")
+            BaseService._registry, _ = DeviceRegistry([]).merge([entry])
+
+        BaseService._snapshot_refresh = asyncio.create_task(discovery())
+        self.addCleanup(setattr, BaseService, "_registry", None)
+        self.addCleanup(setattr, BaseService, "_snapshot_refresh", None)
+
+        await self.service.turn_on(bulb, local_control=True)
+
+        self.assertEqual(bulb.enr, "0123456789abcdef")
+        self.service.local_control.send.assert_awaited_once()
+        self.service._run_action_list.assert_not_awaited()
+
+    async def test_bulb_without_key_uses_cloud_without_falling_back(self):
+        bulb = Bulb(BULB)
+        self.service.local_control.send = AsyncMock(return_value="ok")
+
+        await self.service.turn_on(bulb, local_control=True)
+
+        self.service.local_control.send.assert_not_awaited()
+        self.service._run_action_list.assert_awaited_once()
+        self.assertFalse(bulb.cloud_fallback)
+        self.service.local_control.watch.assert_not_called()
+
+
+if __name__ == "__main__":
+    unittest.main()
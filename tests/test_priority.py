@@ -0,0 +1,80 @@
+import unittest
+from unittest.mock import AsyncMock, MagicMock
+
+from wyzeapy.priority import RequestPriority, current_priority, request_priority
+from wyzeapy.services.base_service import BaseService
+from wyzeapy.services.update_manager import DeviceUpdater
+from wyzeapy.types import Device
+
+
+class TestRequestPriority(unittest.IsolatedAsyncioTestCase):
+    def test_default_is_read(self):
+        self.assertIs(current_priority(), RequestPriority.READ)
+
+    def test_context_manager_restores_previous_priority(self):
+        with request_priority(RequestPriority.BACKGROUND):
+            self.assertIs(current_priority(), RequestPriority.BACKGROUND)
+            with request_priority(RequestPriority.INTERACTIVE):
+                self.assertIs(current_priority(), RequestPriority.INTERACTIVE)
+            self.assertIs(current_priority(), RequestPriority.BACKGROUND)
+        self.assertIs(current_priority(), RequestPriority.READ)
+
+    async def test_commands_are_sent_as_interactive(self):
+        seen = []
+        auth_lib = MagicMock()
+        auth_lib.refresh_if_should = AsyncMock()
+        auth_lib.token.access_token = "token"
+
+        async def post(url, json=None):
+            seen.append(current_priority())
+            return {"ErrNo": 0}
+
+        auth_lib.post = post
+        service = BaseService(auth_lib)
+        device = Device({"mac": "YD.LO1.abc", "product_model": "YD_BT1"})
+
+        with request_priority(RequestPriority.BACKGROUND):
+            await service._lock_control(device, "remoteUnlock")
+
+        self.assertEqual(seen, [RequestPriority.INTERACTIVE])
+
+    async def test_lock_token_is_read_at_the_callers_priority(self):
+        seen = []
+        auth_lib = MagicMock()
+        auth_lib.refresh_if_should = AsyncMock()
+        auth_lib.token.access_token = "token"
+
+        async def get(url, params=None):
+            seen.append(current_priority())
+            return {"ErrNo": 0, "token": {"id": 1, "token": "abc"}}
+
+        auth_lib.get = get
+        service = BaseService(auth_lib)
+        device = Device({"mac": "YD.LO1.abc", "product_model": "YD_BT1"})
+
+        with request_priority(RequestPriority.BACKGROUND):
+            await service._get_lock_ble_token(device)
+        # The token is single use, so it is fetched again rather than cached
+        await service._get_lock_ble_token(device)
+
+        self.assertEqual(seen, [RequestPriority.BACKGROUND, RequestPriority.READ])
+
+    async def test_scheduled_updates_are_sent_as_background(self):
+        seen = []
+        device = MagicMock(spec=Device)
+        device.nickname = "Device"
+        service = MagicMock()
+
+        async def update(device):
+            seen.append(current_priority())
+            return device
+
+        service.update = update
+        await DeviceUpdater(service, device, 60).update()
+
+        self.assertEqual(seen, [RequestPriority.BACKGROUND])
+        self.assertIs(current_priority(), RequestPriority.READ)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,170 @@
+import asyncio
+import time
+import unittest
+from unittest.mock import patch
+
+from wyzeapy.priority import RequestPriority
+from wyzeapy.rate_limiter import RateLimit, RateLimiter, TokenBucket
+
+
+class TestTokenBucket(unittest.IsolatedAsyncioTestCase):
+    async def test_burst_is_served_without_waiting(self):
+        bucket = TokenBucket(RateLimit(rate=1.0, burst=3))
+
+        waits = [await bucket.acquire() for _ in range(3)]
+
+        self.assertTrue(all(wait < 0.01 for wait in waits))
+
+    async def test_waits_for_refill_once_empty(self):
+        bucket = TokenBucket(RateLimit(rate=50.0, burst=1))
+        await bucket.acquire()
+
+        wait = await bucket.acquire()
+
+        self.assertGreater(wait, 0.01)
+
+    async def test_pause_blocks_tokens(self):
+        bucket = TokenBucket(RateLimit(rate=100.0, burst=10))
+        bucket.pause(0.05)
+
+        start = time.monotonic()
+        await bucket.acquire()
+
+        self.assertGreaterEqual(time.monotonic() - start, 0.04)
+
+    async def test_queued_commands_overtake_background_requests(self):
+        bucket = TokenBucket(RateLimit(rate=100.0, burst=1))
+        await bucket.acquire()
+        served = []
+
+        async def request(name, priority):
+            await bucket.acquire(priority)
+            served.append(name)
+
+        tasks = [
+            asyncio.create_task(request(f"poll{i}", RequestPriority.BACKGROUND))
+            for i in range(3)
+        ]
+        await asyncio.sleep(0)
+        tasks.append(
+            asyncio.create_task(request("unlock", RequestPriority.INTERACTIVE))
+        )
+        await asyncio.gather(*tasks)
+
+        self.assertEqual(served, ["unlock", "poll0", "poll1", "poll2"])
+
+    async def test_waiting_background_requests_are_not_starved(self):
+        bucket = TokenBucket(RateLimit(rate=50.0, burst=1))
+        await bucket.acquire()
+        served = []
+
+        async def request(name, priority):
+            await bucket.acquire(priority)
+            served.append(name)
+
+        with patch("wyzeapy.rate_limiter.PRIORITY_AGING", 0.001):
+            poll = asyncio.create_task(request("poll", RequestPriority.BACKGROUND))
+            await asyncio.sleep(0.005)
+            command = asyncio.create_task(
+                request("command", RequestPriority.INTERACTIVE)
+            )
+            await asyncio.gather(poll, command)
+
+        self.assertEqual(served, ["poll", "command"])
+
+    async def test_cancelled_waiter_does_not_use_a_token(self):
+        bucket = TokenBucket(RateLimit(rate=50.0, burst=1))
+        await bucket.acquire()
+
+        cancelled = asyncio.create_task(bucket.acquire())
+        await asyncio.sleep(0)
+        cancelled.cancel()
+        wait = await asyncio.wait_for(bucket.acquire(), timeout=1)
+
+        self.assertLess(wait, 0.05)
+
+
+class TestRateLimiter(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.limiter = RateLimiter(
+            global_limit=RateLimit(rate=1000.0, burst=100),
+            host_limits={"api.wyzecam.com": RateLimit(rate=50.0, burst=1)},
+        )
+
+    async def test_host_bucket_only_applies_to_its_host(self):
+        await self.limiter.acquire("https://api.wyzecam.com/app/v2/a")
+        other = await self.limiter.acquire("https://hms.api.wyze.com/b")
+        same = await self.limiter.acquire("https://api.wyzecam.com/app/v2/c")
+
+        self.assertLess(other, 0.01)
+        self.assertGreater(same, 0.01)
+        self.assertEqual(self.limiter.stats.requests, 3)
+        self.assertEqual(self.limiter.stats.delayed, 1)
+        self.assertGreater(self.limiter.stats.max_wait, 0.01)
+
+    async def test_waiting_on_a_host_does_not_hold_global_capacity(self):
+        limiter = RateLimiter(
+            global_limit=RateLimit(rate=0.1, burst=2),
+            host_limits={"api.wyzecam.com": RateLimit(rate=5.0, burst=1)},
+        )
+        await limiter.acquire("https://api.wyzecam.com/a")
+        # Waits for the host bucket to refill
+        blocked = asyncio.create_task(limiter.acquire("https://api.wyzecam.com/b"))
+        await asyncio.sleep(0)
+
+        other = await limiter.acquire("https://hms.api.wyze.com/c")
+
+        self.assertLess(other, 0.01)
+        blocked.cancel()
+        with self.assertRaises(asyncio.CancelledError):
+            await blocked
+
+    async def test_queue_latency_is_tracked_per_priority(self):
+        url = "https://api.wyzecam.com/x"
+        await self.limiter.acquire(url, RequestPriority.INTERACTIVE)
+        await self.limiter.acquire(url, RequestPriority.BACKGROUND)
+
+        by_priority = self.limiter.stats.by_priority
+        self.assertEqual(by_priority[RequestPriority.INTERACTIVE].requests, 1)
+        self.assertEqual(by_priority[RequestPriority.INTERACTIVE].delayed, 0)
+        self.assertEqual(by_priority[RequestPriority.BACKGROUND].delayed, 1)
+        self.assertIn("background", self.limiter.stats.as_dict()["by_priority"])
+
+    async def test_concurrent_requests_are_spaced(self):
+        start = time.monotonic()
+        await asyncio.gather(
+            *(self.limiter.acquire("https://api.wyzecam.com/x") for _ in range(4))
+        )
+
+        # One token up front, then three refills at 50/s
+        self.assertGreaterEqual(time.monotonic() - start, 0.05)
+
+    def test_observe_ignores_normal_responses(self):
+        self.assertFalse(self.limiter.observe("https://api.wyzecam.com/x", 200, {}))
+        self.assertFalse(
+            self.limiter.observe(
+                "https://api.wyzecam.com/x", 200, {"X-RateLimit-Remaining": "12"}
+            )
+        )
+        self.assertEqual(self.limiter.stats.throttled, 0)
+
+    async def test_throttling_backs_off_exponentially(self):
+        url = "https://wyze-earth-service.wyzecam.com/x"
+        with self.assertLogs("wyzeapy.rate_limiter", level="WARNING") as cm:
+            self.assertTrue(self.limiter.observe(url, 429, {}))
+            self.assertTrue(
+                self.limiter.observe(url, 200, {"X-RateLimit-Remaining": "0"})
+            )
+
+        self.assertIn("1.0s", cm.output[0])
+        self.assertIn("2.0s", cm.output[1])
+        self.assertEqual(self.limiter.stats.throttled, 2)
+
+        self.limiter.observe(url, 200, {})
+        with self.assertLogs("wyzeapy.rate_limiter", level="WARNING") as cm:
+            self.limiter.observe(url, 429, {"Retry-After": "5"})
+        self.assertIn("5.0s", cm.output[0])
+
+
+if __name__ == "__main__":
+    unittest.main()
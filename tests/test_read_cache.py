@@ -0,0 +1,112 @@
+import asyncio
+import unittest
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from wyzeapy.services.base_service import BaseService
+from wyzeapy.services.read_cache import MISSING, ReadCache
+from wyzeapy.types import Device
+
+
+def make_device(mac="MAC1"):
+    return Device({"mac": mac, "product_model": "WLPP1", "product_type": "Plug"})
+
+
+class TestReadCache(unittest.TestCase):
+    def setUp(self):
+        self.cache = ReadCache(max_entries=2)
+
+    def test_hit_and_miss_counters(self):
+        self.assertIs(self.cache.get("a"), MISSING)
+        self.cache.put("a", 1, ttl=60)
+
+        self.assertEqual(self.cache.get("a"), 1)
+        self.assertEqual((self.cache.hits, self.cache.misses), (1, 1))
+
+    def test_expired_entries_miss(self):
+        self.cache.put("a", 1, ttl=0)
+        self.assertIs(self.cache.get("a"), MISSING)
+        self.assertEqual(len(self.cache), 0)
+
+    def test_least_recently_used_entry_is_evicted(self):
+        self.cache.put("a", 1, ttl=60)
+        self.cache.put("b", 2, ttl=60)
+        self.cache.get("a")
+        self.cache.put("c", 3, ttl=60)
+
+        self.assertIs(self.cache.get("b"), MISSING)
+        self.assertEqual(self.cache.get("a"), 1)
+        self.assertEqual(self.cache.evictions, 1)
+
+    def test_invalidation_drops_device_entries_and_rejects_stale_reads(self):
+        self.cache.put("a", 1, ttl=60, mac="MAC1")
+        self.cache.put("b", 2, ttl=60, mac="MAC2")
+        generation = self.cache.generation("MAC1")
+
+        self.cache.invalidate_device("MAC1")
+        self.cache.put("a", "stale", ttl=60, mac="MAC1", generation=generation)
+
+        self.assertIs(self.cache.get("a"), MISSING)
+        self.assertEqual(self.cache.get("b"), 2)
+        self.assertEqual(self.cache.invalidations, 1)
+
+
+class TestCachedReads(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.auth_lib = MagicMock()
+        self.auth_lib.refresh_if_should = AsyncMock()
+        self.auth_lib.token.access_token = "token"
+        self.auth_lib.post = AsyncMock(
+            return_value={"code": "1", "data": {"property_list": []}}
+        )
+        self.service = BaseService(self.auth_lib)
+        self.device = make_device()
+
+    async def test_repeated_reads_within_ttl_use_the_cache(self):
+        await self.service._get_property_list(self.device)
+        await self.service._get_property_list(self.device)
+        await self.service._get_property_list(make_device("MAC2"))
+
+        self.assertEqual(self.auth_lib.post.await_count, 2)
+        self.assertEqual(self.service.read_cache.hits, 1)
+
+    async def test_reads_expire_after_ttl(self):
+        with patch("wyzeapy.services.read_cache.time.monotonic", return_value=0):
+            await self.service._get_property_list(self.device)
+        with patch("wyzeapy.services.read_cache.time.monotonic", return_value=60):
+            await self.service._get_property_list(self.device)
+
+        self.assertEqual(self.auth_lib.post.await_count, 2)
+
+    async def test_commands_invalidate_the_device(self):
+        await self.service._get_property_list(self.device)
+        await self.service._set_property(self.device, "P3", "1")
+        await self.service._get_property_list(self.device)
+
+        # read, write, read again
+        self.assertEqual(self.auth_lib.post.await_count, 3)
+
+    async def test_read_racing_a_write_is_not_cached(self):
+        release = asyncio.Event()
+
+        async def slow_post(url, json=None):
+            if "get_property_list" in url:
+                await release.wait()
+            return {"code": "1", "data": {"property_list": []}}
+
+        self.auth_lib.post = AsyncMock(side_effect=slow_post)
+        read = asyncio.create_task(self.service._get_property_list(self.device))
+        await asyncio.sleep(0)
+        await self.service._set_property(self.device, "P3", "1")
+        release.set()
+        await read
+
+        self.assertEqual(len(self.service.read_cache), 0)
+
+    async def test_cache_is_shared_by_services_of_one_account(self):
+        other = BaseService(self.auth_lib)
+        self.assertIs(other.read_cache, self.service.read_cache)
+        self.assertIsNot(BaseService(MagicMock()).read_cache, self.service.read_cache)
+
+
+if __name__ == "__main__":
+    unittest.main()
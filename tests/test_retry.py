@@ -0,0 +1,154 @@
+import asyncio
+import unittest
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import aiohttp
+
+from wyzeapy.exceptions import AccessTokenError
+from wyzeapy.retry import (
+    Retrier,
+    RetryBudget,
+    RetryPolicy,
+    idempotent,
+    is_idempotent,
+    is_transient,
+)
+from wyzeapy.services.base_service import BaseService
+from wyzeapy.wyze_auth_lib import Token, WyzeAuthLib
+
+
+class TestRetryPolicy(unittest.TestCase):
+    def test_backoff_is_jittered_and_capped(self):
+        policy = RetryPolicy(base_delay=1.0, max_delay=3.0)
+        for retry in range(6):
+            delay = policy.backoff(retry)
+            self.assertGreaterEqual(delay, 0)
+            self.assertLessEqual(delay, min(3.0, 2**retry))
+
+    def test_budget_refills_with_requests(self):
+        budget = RetryBudget(ratio=0.5, reserve=1)
+        self.assertTrue(budget.withdraw())
+        self.assertFalse(budget.withdraw())
+        budget.deposit()
+        budget.deposit()
+        self.assertTrue(budget.withdraw())
+
+    def test_classification(self):
+        self.assertTrue(is_transient(aiohttp.ClientOSError()))
+        self.assertTrue(is_transient(aiohttp.ServerDisconnectedError()))
+        self.assertTrue(is_transient(asyncio.TimeoutError()))
+        self.assertFalse(is_transient(AccessTokenError()))
+        self.assertFalse(is_transient(ValueError()))
+
+    def test_idempotent_context(self):
+        self.assertFalse(is_idempotent())
+        with idempotent():
+            self.assertTrue(is_idempotent())
+            with idempotent(False):
+                self.assertFalse(is_idempotent())
+        self.assertFalse(is_idempotent())
+
+
+class TestRetrier(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.retrier = Retrier(RetryPolicy(max_attempts=3, base_delay=0))
+
+    async def test_transient_errors_are_retried(self):
+        call = AsyncMock(side_effect=[aiohttp.ClientOSError(), "ok"])
+
+        self.assertEqual(await self.retrier.run(call, retryable=True), "ok")
+        self.assertEqual(call.await_count, 2)
+        self.assertEqual(self.retrier.stats.network_retries, 1)
+
+    async def test_non_idempotent_requests_are_not_retried(self):
+        call = AsyncMock(side_effect=aiohttp.ClientOSError())
+
+        with self.assertRaises(aiohttp.ClientOSError):
+            await self.retrier.run(call, retryable=False)
+        call.assert_awaited_once()
+
+    async def test_gives_up_after_max_attempts(self):
+        call = AsyncMock(side_effect=asyncio.TimeoutError())
+
+        with self.assertRaises(asyncio.TimeoutError):
+            await self.retrier.run(call, retryable=True)
+        self.assertEqual(call.await_count, 3)
+        self.assertEqual(self.retrier.stats.gave_up, 1)
+
+    async def test_empty_budget_stops_retries(self):
+        self.retrier.budget = RetryBudget(ratio=0, reserve=1)
+        call = AsyncMock(side_effect=aiohttp.ClientOSError())
+
+        for _ in range(2):
+            with self.assertRaises(aiohttp.ClientOSError):
+                await self.retrier.run(call, retryable=True)
+
+        # One retry for the first request, none for the second
+        self.assertEqual(call.await_count, 3)
+        self.assertEqual(self.retrier.stats.budget_exhausted, 2)
+
+
+class TestRequestRetries(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.auth_lib = WyzeAuthLib(
+            token=Token("access", "refresh"),
+            retrier=Retrier(RetryPolicy(base_delay=0)),
+        )
+        self.auth_lib._send = AsyncMock(side_effect=[aiohttp.ClientOSError(), {}])
+
+    async def test_post_is_not_retried_by_default(self):
+        with self.assertRaises(aiohttp.ClientOSError):
+            await self.auth_lib.post("https://api.wyzecam.com/app/v2/auto/run_action")
+
+    async def test_post_in_idempotent_context_is_retried(self):
+        with idempotent():
+            result = await self.auth_lib.post("https://api.wyzecam.com/x")
+
+        self.assertEqual(result, {})
+        self.assertEqual(self.auth_lib._send.await_count, 2)
+
+    async def test_get_is_retried(self):
+        self.assertEqual(await self.auth_lib.get("https://api.wyzecam.com/x"), {})
+
+
+class TestTokenReplay(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.auth_lib = WyzeAuthLib(token=Token("old", "refresh"))
+
+        async def refresh():
+            await asyncio.sleep(0)
+            self.auth_lib.token.access_token = "new"
+
+        self.auth_lib.refresh = AsyncMock(side_effect=refresh)
+        self.auth_lib.refresh_if_should = AsyncMock()
+        self.service = BaseService(self.auth_lib)
+
+    async def test_concurrent_expired_calls_share_one_refresh(self):
+        async def post(url, json=None):
+            if self.auth_lib.token.access_token == "old":
+                raise AccessTokenError()
+            return {"code": "1", "data": {"property_list": []}}
+
+        with patch.object(self.auth_lib, "post", side_effect=post):
+            device_a = MagicMock(mac="A", product_model="M")
+            device_b = MagicMock(mac="B", product_model="M")
+            await asyncio.gather(
+                self.service._get_property_list(device_a),
+                self.service._get_property_list(device_b),
+            )
+
+        self.auth_lib.refresh.assert_awaited_once()
+        self.assertEqual(self.auth_lib.retrier.stats.token_replays, 2)
+
+    async def test_second_expiry_is_raised(self):
+        with patch.object(self.auth_lib, "post", side_effect=AccessTokenError()):
+            with self.assertRaises(AccessTokenError):
+                await self.service._set_property(
+                    MagicMock(mac="A", product_model="M"), "P3", "1"
+                )
+
+        self.auth_lib.refresh.assert_awaited_once()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,6 +1,8 @@
+import asyncio
 import unittest
 from unittest.mock import AsyncMock, MagicMock
 from wyzeapy.services.sensor_service import SensorService, Sensor
+from wyzeapy.services.update_manager import DeviceUpdater
 from wyzeapy.types import DeviceTypes, PropertyIDs
 from wyzeapy.wyze_auth_lib import WyzeAuthLib
 
@@ -13,9 +15,6 @@ class TestSensorService(unittest.IsolatedAsyncioTestCase):
         self.sensor_service.get_updated_params = AsyncMock()
         self.sensor_service.get_object_list = AsyncMock()
 
-        # Reset the class-level subscribers list
-        self.sensor_service._subscribers = []
-
         # Create test sensors
         self.motion_sensor = Sensor(
             {
@@ -112,6 +111,36 @@ class TestSensorService(unittest.IsolatedAsyncioTestCase):
         self.assertIsInstance(sensors[1], Sensor)
         self.sensor_service.get_object_list.assert_awaited_once()
 
+    async def test_detecting_sensor_is_polled_faster(self):
+        device = MagicMock()
+        device.type = DeviceTypes.CONTACT_SENSOR
+        device.raw_dict = {
+            "product_type": DeviceTypes.CONTACT_SENSOR.value,
+            "product_model": "DWS3U",
+            "mac": "DOOR789",
+            "nickname": "Front Door",
+            "device_params": {},
+        }
+        self.sensor_service.get_object_list.return_value = [device]
+        self.sensor_service._get_device_info.return_value = {
+            "data": {
+                "property_list": [
+                    {"pid": PropertyIDs.CONTACT_STATE.value, "value": "1"}
+                ]
+            }
+        }
+
+        sensor = (await self.sensor_service.get_sensors())[0]
+        sensor.callback_function = MagicMock()
+        updater = DeviceUpdater(self.sensor_service, sensor, 60)
+        self.assertFalse(sensor.is_active())
+        self.assertIsNone(updater.target_updates())
+
+        await updater.update()
+
+        self.assertTrue(sensor.is_active())
+        self.assertEqual(updater.target_updates(), 10)
+
     async def test_register_for_updates(self):
         mock_callback = MagicMock()
         await self.sensor_service.register_for_updates(
@@ -121,6 +150,7 @@ class TestSensorService(unittest.IsolatedAsyncioTestCase):
         self.assertEqual(len(self.sensor_service._subscribers), 1)
         self.assertEqual(self.sensor_service._subscribers[0][0], self.motion_sensor)
         self.assertEqual(self.sensor_service._subscribers[0][1], mock_callback)
+        await self.sensor_service.deregister_for_updates(self.motion_sensor)
 
     async def test_deregister_for_updates(self):
         mock_callback = MagicMock()
@@ -130,6 +160,31 @@ class TestSensorService(unittest.IsolatedAsyncioTestCase):
         await self.sensor_service.deregister_for_updates(self.motion_sensor)
 
         self.assertEqual(len(self.sensor_service._subscribers), 0)
+        self.assertEqual(self.sensor_service._subscriptions._tasks, {})
+
+    async def test_subscribers_are_per_instance(self):
+        other_service = SensorService(auth_lib=self.mock_auth_lib)
+        await self.sensor_service.register_for_updates(self.motion_sensor, MagicMock())
+
+        self.assertEqual(len(other_service._subscribers), 0)
+        await self.sensor_service.deregister_for_updates(self.motion_sensor)
+
+    async def test_subscription_polls_on_interval(self):
+        mock_callback = MagicMock()
+        self.sensor_service.update = AsyncMock(return_value=self.motion_sensor)
+
+        await self.sensor_service.register_for_updates(
+            self.motion_sensor, mock_callback, interval=0.01
+        )
+        await asyncio.sleep(0.05)
+        await self.sensor_service.deregister_for_updates(self.motion_sensor)
+        calls = self.sensor_service.update.await_count
+        await asyncio.sleep(0.03)
+
+        self.assertGreater(calls, 1)
+        # No further updates once the subscription is cancelled
+        self.assertEqual(self.sensor_service.update.await_count, calls)
+        mock_callback.assert_called_with(self.motion_sensor)
 
     async def test_update_with_unknown_property(self):
         self.sensor_service._get_device_info.return_value = {
@@ -139,6 +194,24 @@ class TestSensorService(unittest.IsolatedAsyncioTestCase):
         updated_sensor = await self.sensor_service.update(self.motion_sensor)
         self.assertFalse(updated_sensor.detected)  # Should maintain default value
 
+    async def test_update_sensor_from_discovery(self):
+        self.sensor_service.bulk_state = True
+        self.contact_sensor.product_type = DeviceTypes.CONTACT_SENSOR.value
+        self.sensor_service._discovered_device = AsyncMock(
+            return_value=Sensor(
+                {
+                    "product_type": DeviceTypes.CONTACT_SENSOR.value,
+                    "mac": "CONTACT456",
+                    "device_params": {"open_close_state": 1},
+                }
+            )
+        )
+
+        updated_sensor = await self.sensor_service.update(self.contact_sensor)
+
+        self.assertTrue(updated_sensor.detected)
+        self.sensor_service._get_device_info.assert_not_awaited()
+
 
 if __name__ == "__main__":
     unittest.main()
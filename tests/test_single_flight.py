@@ -0,0 +1,134 @@
+import asyncio
+import unittest
+from unittest.mock import AsyncMock, MagicMock
+
+from wyzeapy.services.base_service import BaseService
+from wyzeapy.services.single_flight import SingleFlight
+from wyzeapy.types import Device
+from wyzeapy.wyze_auth_lib import WyzeAuthLib
+
+
+class TestSingleFlight(unittest.IsolatedAsyncioTestCase):
+    async def test_concurrent_calls_share_one_execution(self):
+        flight = SingleFlight()
+        release = asyncio.Event()
+        func = AsyncMock()
+
+        async def fetch():
+            await func()
+            await release.wait()
+            return {"value": 1}
+
+        tasks = [asyncio.create_task(flight.do("key", fetch)) for _ in range(3)]
+        await asyncio.sleep(0)
+        self.assertEqual(flight.in_flight, 1)
+        release.set()
+        results = await asyncio.gather(*tasks)
+
+        func.assert_awaited_once()
+        self.assertTrue(all(result is results[0] for result in results))
+        self.assertEqual(flight.calls, 3)
+        self.assertEqual(flight.executions, 1)
+        self.assertEqual(flight.deduplicated, 2)
+        self.assertEqual(flight.in_flight, 0)
+
+    async def test_different_keys_run_separately(self):
+        flight = SingleFlight()
+
+        async def fetch(value):
+            await asyncio.sleep(0)
+            return value
+
+        results = await asyncio.gather(
+            flight.do("a", lambda: fetch(1)), flight.do("b", lambda: fetch(2))
+        )
+
+        self.assertEqual(results, [1, 2])
+        self.assertEqual(flight.executions, 2)
+        self.assertEqual(flight.deduplicated, 0)
+
+    async def test_exception_is_shared_and_not_cached(self):
+        flight = SingleFlight()
+
+        async def fail():
+            await asyncio.sleep(0)
+            raise ValueError("boom")
+
+        results = await asyncio.gather(
+            flight.do("key", fail), flight.do("key", fail), return_exceptions=True
+        )
+        self.assertTrue(all(isinstance(result, ValueError) for result in results))
+
+        async def succeed():
+            return "ok"
+
+        self.assertEqual(await flight.do("key", succeed), "ok")
+        self.assertEqual(flight.executions, 2)
+
+    async def test_cancelled_caller_does_not_cancel_shared_request(self):
+        flight = SingleFlight()
+        release = asyncio.Event()
+
+        async def fetch():
+            await release.wait()
+            return "done"
+
+        first = asyncio.create_task(flight.do("key", fetch))
+        second = asyncio.create_task(flight.do("key", fetch))
+        await asyncio.sleep(0)
+        first.cancel()
+        release.set()
+
+        self.assertEqual(await second, "done")
+        with self.assertRaises(asyncio.CancelledError):
+            await first
+
+
+class TestBaseServiceSingleFlight(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.mock_auth_lib = MagicMock(spec=WyzeAuthLib)
+        self.mock_auth_lib.token = MagicMock(access_token="token")
+        self.mock_auth_lib.refresh_if_should = AsyncMock()
+        self.service = BaseService(self.mock_auth_lib)
+        self.device = Device(
+            {"mac": "ABC123", "product_model": "WLPA19", "product_type": "Light"}
+        )
+
+    async def test_identical_property_reads_are_coalesced(self):
+        async def post(*args, **kwargs):
+            await asyncio.sleep(0)
+            return {
+                "code": "1",
+                "data": {"property_list": [{"pid": "P3", "value": "1"}]},
+            }
+
+        self.mock_auth_lib.post = AsyncMock(side_effect=post)
+        before = self.service.single_flight.deduplicated
+
+        results = await asyncio.gather(
+            self.service._get_property_list(self.device),
+            self.service._get_property_list(self.device),
+        )
+
+        self.mock_auth_lib.post.assert_awaited_once()
+        self.assertIs(results[0], results[1])
+        self.assertEqual(self.service.single_flight.deduplicated, before + 1)
+
+    async def test_reads_for_different_devices_are_not_coalesced(self):
+        other = Device(
+            {"mac": "DEF456", "product_model": "WLPA19", "product_type": "Light"}
+        )
+        self.mock_auth_lib.post = AsyncMock(
+            return_value={"code": "1", "data": {"property_list": []}}
+        )
+
+        await asyncio.gather(
+            self.service._get_property_list(self.device),
+            self.service._get_property_list(other),
+        )
+
+        self.assertEqual(self.mock_auth_lib.post.await_count, 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
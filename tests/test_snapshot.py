@@ -0,0 +1,175 @@
+import json
+import os
+import stat
+import tempfile
+import time
+import unittest
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from wyzeapy import Wyzeapy
+from wyzeapy.services.base_service import BaseService
+from wyzeapy.services.bulb_service import Bulb, BulbService
+from wyzeapy.snapshot import Snapshot, SnapshotStore, token_fingerprint
+from wyzeapy.wyze_auth_lib import Token, WyzeAuthLib
+
+BULB = {
+    "product_type": "Light",
+    "product_model": "WLPA19",
+    "mac": "BULB1",
+    "nickname": "Desk",
+    "device_params": {"ip": "192.168.1.20"},
+}
+
+
+class TestSnapshotStore(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "snapshot.json")
+        self.store = SnapshotStore(self.path)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_round_trip(self):
+        token = Token("access", "refresh", 1000.0)
+        self.store.save(
+            Snapshot(
+                [BULB],
+                {"BULB1": {"on": True}},
+                hms_id="HMS1",
+                token_fingerprint=token_fingerprint(token),
+                token_refresh_time=token.refresh_time,
+            )
+        )
+
+        snapshot = self.store.load()
+
+        self.assertEqual(snapshot.devices, [BULB])
+        self.assertEqual(snapshot.states, {"BULB1": {"on": True}})
+        self.assertEqual(snapshot.hms_id, "HMS1")
+        self.assertEqual(snapshot.refresh_time_for(token), 1000.0)
+        self.assertIsNone(snapshot.refresh_time_for(Token("other", "refresh")))
+
+    def test_file_is_private_and_holds_no_token(self):
+        self.store.save(
+            Snapshot([BULB], token_fingerprint=token_fingerprint(Token("secret", "r")))
+        )
+
+        self.assertEqual(stat.S_IMODE(os.stat(self.path).st_mode), 0o600)
+        with open(self.path) as file:
+            self.assertNotIn("secret", file.read())
+        self.assertEqual(os.listdir(self.directory.name), ["snapshot.json"])
+
+    def test_device_keys_are_not_written(self):
+        entry = dict(BULB, enr="bulb-key", device_params={"ip": "1.2.3.4", "enr": "k"})
+        self.store.save(Snapshot([entry]))
+
+        with open(self.path) as file:
+            self.assertNotIn("bulb-key", file.read())
+        self.assertEqual(
+            self.store.load().devices, [dict(BULB, device_params={"ip": "1.2.3.4"})]
+        )
+
+    def test_missing_or_corrupt_files_are_ignored(self):
+        self.assertIsNone(self.store.load())
+
+        with open(self.path, "w") as file:
+            file.write("{not json")
+        self.assertIsNone(self.store.load())
+
+        with open(self.path, "w") as file:
+            json.dump({"version": 0, "devices": []}, file)
+        self.assertIsNone(self.store.load())
+
+
+class TestWarmStart(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "snapshot.json")
+        self.token = Token("access", "refresh")
+        SnapshotStore(self.path).save(
+            Snapshot(
+                [BULB],
+                {"BULB1": {"Bulb": {"on": True, "_brightness": 40}}},
+                hms_id="HMS1",
+                token_fingerprint=token_fingerprint(self.token),
+                token_refresh_time=time.time() + 20 * 3600,
+                saved_at=time.time() - 600,
+            )
+        )
+        patcher = patch.object(BaseService, "_refresh_snapshot_in_background")
+        self.background_refresh = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        BaseService._devices = None
+        BaseService._registry = None
+        BaseService._last_updated_time = 0
+        BaseService._identity_map.clear()
+        self.directory.cleanup()
+
+    async def login(self, token):
+        auth_lib = MagicMock(spec=WyzeAuthLib)
+        auth_lib.token = token
+        auth_lib.refresh = AsyncMock()
+        with patch(
+            "wyzeapy.wyze_auth_lib.WyzeAuthLib.create",
+            new_callable=AsyncMock,
+            return_value=auth_lib,
+        ) as create:
+            wyze = await Wyzeapy.create(snapshot_path=self.path)
+            await wyze.login("email", "password", "key_id", "api_key", token=token)
+        return wyze, auth_lib, create.await_args.args[4]
+
+    async def test_fresh_saved_token_skips_refresh_and_serves_state(self):
+        wyze, auth_lib, token = await self.login(self.token)
+
+        auth_lib.refresh.assert_not_awaited()
+        self.assertGreater(token.refresh_time, time.time() + 19 * 3600)
+        self.background_refresh.assert_called_once()
+
+        bulbs = await BulbService(auth_lib).get_bulbs()
+        self.assertTrue(bulbs[0].on)
+        self.assertEqual(bulbs[0].brightness, 40)
+        self.assertGreaterEqual(wyze._service.snapshot_age, 600)
+
+    async def test_state_is_dropped_when_discovery_changed(self):
+        _, auth_lib, _ = await self.login(self.token)
+        moved = dict(BULB, device_params={"ip": "192.168.1.99"}, enr="key")
+        BaseService._registry, _ = BaseService._registry.merge([moved])
+
+        bulb = (await BulbService(auth_lib).get_bulbs())[0]
+
+        self.assertEqual(bulb.ip, "192.168.1.99")
+        self.assertFalse(bulb.on)
+
+    async def test_state_survives_discovery_adding_device_keys(self):
+        _, auth_lib, _ = await self.login(self.token)
+        BaseService._registry, _ = BaseService._registry.merge([dict(BULB, enr="key")])
+
+        bulb = (await BulbService(auth_lib).get_bulbs())[0]
+
+        self.assertTrue(bulb.on)
+        self.assertEqual(bulb.enr, "key")
+
+    async def test_other_token_is_refreshed(self):
+        _, auth_lib, _ = await self.login(Token("new", "refresh"))
+
+        auth_lib.refresh.assert_awaited_once()
+
+    async def test_close_saves_current_state(self):
+        wyze, auth_lib, _ = await self.login(self.token)
+        bulb = (await BulbService(auth_lib).get_bulbs())[0]
+        bulb.brightness = 75
+
+        await wyze.close()
+
+        snapshot = SnapshotStore(self.path).load()
+        self.assertEqual(snapshot.devices, [BULB])
+        self.assertEqual(snapshot.states["BULB1"]["Bulb"]["_brightness"], 75)
+        self.assertEqual(snapshot.hms_id, "HMS1")
+        self.assertIsInstance(bulb, Bulb)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,73 @@
+import asyncio
+import logging
+import unittest
+from unittest.mock import MagicMock
+
+from wyzeapy.services.subscriptions import SubscriptionManager
+from wyzeapy.types import Device
+
+
+class TestSubscriptionManager(unittest.IsolatedAsyncioTestCase):
+    async def test_updates_are_bounded_by_semaphore(self):
+        in_flight = 0
+        peak = 0
+
+        async def update(device):
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0.01)
+            in_flight -= 1
+            return device
+
+        manager = SubscriptionManager(
+            update, logging.getLogger(__name__), max_concurrent_updates=2
+        )
+        devices = [Device({"mac": f"MAC{i}", "nickname": str(i)}) for i in range(5)]
+        for device in devices:
+            manager.subscribe(device, MagicMock(), interval=0.01)
+
+        await asyncio.sleep(0.05)
+        manager.unsubscribe_all()
+
+        self.assertEqual(peak, 2)
+        self.assertEqual(manager.subscribers, [])
+
+    async def test_resubscribe_replaces_existing_task(self):
+        async def update(device):
+            return device
+
+        manager = SubscriptionManager(update, logging.getLogger(__name__))
+        device = Device({"mac": "MAC1"})
+        manager.subscribe(device, MagicMock())
+        first = manager._tasks["MAC1"]
+        manager.subscribe(device, MagicMock())
+        await asyncio.sleep(0)
+
+        self.assertTrue(first.cancelled())
+        self.assertEqual(len(manager.subscribers), 1)
+        manager.unsubscribe_all()
+
+    async def test_unexpected_error_keeps_polling(self):
+        callback = MagicMock()
+        calls = 0
+
+        async def update(device):
+            nonlocal calls
+            calls += 1
+            if calls == 1:
+                raise RuntimeError("boom")
+            return device
+
+        manager = SubscriptionManager(update, logging.getLogger(__name__))
+        device = Device({"mac": "MAC1"})
+        with self.assertLogs(__name__, level="ERROR"):
+            manager.subscribe(device, callback, interval=0.01)
+            await asyncio.sleep(0.05)
+        manager.unsubscribe_all()
+
+        callback.assert_called_with(device)
+
+
+if __name__ == "__main__":
+    unittest.main()
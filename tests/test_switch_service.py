@@ -28,6 +28,59 @@ class TestSwitchService(unittest.IsolatedAsyncioTestCase):
             }
         )
 
+    def make_switches(self, count):
+        return [
+            Switch(
+                {
+                    "product_type": DeviceTypes.PLUG.value,
+                    "product_model": "WLPP1",
+                    "mac": f"SWITCH{i}",
+                }
+            )
+            for i in range(count)
+        ]
+
+    async def test_turn_off_many_batches_requests(self):
+        self.mock_auth_lib.token = MagicMock(access_token="token")
+        self.mock_auth_lib.refresh_if_should = AsyncMock()
+        self.mock_auth_lib.post = AsyncMock(return_value={"code": "1"})
+        switches = self.make_switches(45)
+
+        failed = await self.switch_service.turn_off_many(switches)
+
+        self.assertEqual(failed, [])
+        # 45 devices at 20 per request
+        self.assertEqual(self.mock_auth_lib.post.await_count, 3)
+        payload = self.mock_auth_lib.post.call_args_list[0].kwargs["json"]
+        self.assertEqual(len(payload["device_list"]), 20)
+        self.assertEqual(
+            payload["device_list"][0],
+            {
+                "device_mac": "SWITCH0",
+                "device_model": "WLPP1",
+                "property_list": [{"pid": "P3", "pvalue": "0"}],
+            },
+        )
+
+    async def test_set_many_falls_back_per_device(self):
+        self.mock_auth_lib.token = MagicMock(access_token="token")
+        self.mock_auth_lib.refresh_if_should = AsyncMock()
+
+        async def post(url, json):
+            macs = [device["device_mac"] for device in json["device_list"]]
+            if "SWITCH1" in macs:
+                return {"code": "9999", "msg": "bad device"}
+            return {"code": "1"}
+
+        self.mock_auth_lib.post = AsyncMock(side_effect=post)
+        switches = self.make_switches(3)
+
+        failed = await self.switch_service.turn_on_many(switches)
+
+        self.assertEqual(failed, [switches[1]])
+        # One rejected batch followed by one request per device
+        self.assertEqual(self.mock_auth_lib.post.await_count, 4)
+
     async def test_update_switch_on(self):
         self.switch_service._get_property_list.return_value = [
             (PropertyIDs.ON, "1"),
@@ -50,6 +103,37 @@ class TestSwitchService(unittest.IsolatedAsyncioTestCase):
         self.assertFalse(updated_switch.on)
         self.assertTrue(updated_switch.available)
 
+    async def test_update_switch_from_discovery(self):
+        self.switch_service.bulk_state = True
+        self.switch_service._discovered_device = AsyncMock(
+            return_value=Switch(
+                {
+                    "product_type": DeviceTypes.PLUG.value,
+                    "mac": "SWITCH123",
+                    "conn_state": 1,
+                    "device_params": {"switch_state": 1},
+                }
+            )
+        )
+
+        updated_switch = await self.switch_service.update(self.test_switch)
+
+        self.assertTrue(updated_switch.on)
+        self.assertTrue(updated_switch.available)
+        self.switch_service._get_property_list.assert_not_awaited()
+
+    async def test_update_switch_falls_back_without_discovery_state(self):
+        self.switch_service.bulk_state = True
+        self.switch_service._discovered_device = AsyncMock(return_value=None)
+        self.switch_service._get_property_list.return_value = [
+            (PropertyIDs.ON, "1"),
+        ]
+
+        updated_switch = await self.switch_service.update(self.test_switch)
+
+        self.assertTrue(updated_switch.on)
+        self.switch_service._get_property_list.assert_awaited_once()
+
     async def test_get_switches(self):
         mock_plug = MagicMock()
         mock_plug.type = DeviceTypes.PLUG
@@ -1,4 +1,13 @@
 import unittest
+from wyzeapy.services.air_purifier_service import AirPurifier
+from wyzeapy.services.bulb_service import Bulb
+from wyzeapy.services.camera_service import Camera
+from wyzeapy.services.irrigation_service import Irrigation
+from wyzeapy.services.lock_service import Lock
+from wyzeapy.services.sensor_service import Sensor as ServiceSensor
+from wyzeapy.services.switch_service import Switch
+from wyzeapy.services.thermostat_service import Thermostat
+from wyzeapy.services.wall_switch_service import WallSwitch
 from wyzeapy.types import (
     Group,
     DeviceTypes,
@@ -146,6 +155,83 @@ class TestTypes(unittest.TestCase):
         self.assertEqual(event.event_id, "e1")
         self.assertEqual(event.device_mac, "mac1")
 
+    def test_device_is_compact_with_lazy_fields(self):
+        data = {
+            "product_type": "Light",
+            "product_model": "WL1",
+            "mac": "ABC",
+            "firmware_ver": "1.0",
+        }
+        device = Device(data)
+
+        self.assertEqual(device.firmware_ver, "1.0")
+        with self.assertRaises(AttributeError):
+            device.missing
+
+        device.load_raw(dict(data, product_type="Plug", firmware_ver="2.0"))
+        self.assertEqual(device.firmware_ver, "2.0")
+        self.assertEqual(device.type, DeviceTypes.PLUG)
+
+    def test_devices_accept_extra_attributes(self):
+        device = Device({"product_type": "Plug", "mac": "ABC", "firmware_ver": "1"})
+        sensor = Sensor({"product_type": "ContactSensor", "mac": "DEF"})
+
+        # Services and integrations hang their own attributes on devices
+        device.usage_history = [{"date": "2024-01-01"}]
+        sensor.entity_id = "binary_sensor.door"
+
+        self.assertEqual(device.usage_history, [{"date": "2024-01-01"}])
+        self.assertEqual(sensor.entity_id, "binary_sensor.door")
+        # Discovery keys are still read lazily rather than copied
+        self.assertNotIn("firmware_ver", vars(device))
+
+    def test_subclass_defaults_are_replaced_by_discovery(self):
+        class Bulb(Device):
+            def __init__(self, dictionary):
+                self.enr = ""
+                super().__init__(dictionary)
+
+        bulb = Bulb({"product_type": "Light", "mac": "ABC", "enr": "secret"})
+
+        self.assertEqual(bulb.enr, "secret")
+        self.assertNotIn("mac", vars(bulb))
+
+    def test_typed_devices_keep_their_fields_in_slots(self):
+        for cls in (
+            AirPurifier,
+            Bulb,
+            Camera,
+            Irrigation,
+            Lock,
+            ServiceSensor,
+            Switch,
+            Thermostat,
+            WallSwitch,
+        ):
+            with self.subTest(cls=cls.__name__):
+                self.assertTrue(all("__slots__" in vars(c) for c in cls.__mro__[:-1]))
+
+        bulb = Bulb(
+            {
+                "product_type": "MeshLight",
+                "mac": "ABC",
+                "device_params": {"ip": "192.168.1.20"},
+            }
+        )
+        bulb.load_raw(dict(bulb.raw_dict, enr="secret"))
+
+        self.assertEqual(bulb.enr, "secret")
+        self.assertEqual(bulb.ip, "192.168.1.20")
+
+    def test_event_keeps_unknown_fields(self):
+        event = Event({"event_id": "e1", "event_type": 5})
+
+        self.assertEqual(event.event_id, "e1")
+        self.assertEqual(event.event_type, 5)
+        self.assertFalse(hasattr(event, "__dict__"))
+        with self.assertRaises(AttributeError):
+            event.missing
+
     def test_hms_status_enum(self):
         self.assertEqual(HMSStatus.HOME.value, "home")
 
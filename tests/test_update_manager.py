@@ -1,82 +1,84 @@
+import asyncio
 import unittest
 from unittest.mock import AsyncMock, MagicMock, patch
-from wyzeapy.services.update_manager import DeviceUpdater, UpdateManager, MAX_SLOTS
-from wyzeapy.types import Device
+from wyzeapy.services.air_purifier_service import AirPurifier
+from wyzeapy.services.thermostat_service import HVACState, Thermostat
+from wyzeapy.services.update_manager import (
+    DeviceUpdater,
+    UpdateManager,
+    MAX_SLOTS,
+    MIN_SAMPLES,
+)
+from wyzeapy.types import Device, Sensor
+
+
+def make_device(mac="MAC1", active=False):
+    device = MagicMock(spec=Device)
+    device.mac = mac
+    device.nickname = "TestDevice"
+    device.callback_function = MagicMock()
+    device.is_active.return_value = active
+    return device
+
+
+def contact_sensor(open_close_state):
+    return Sensor(
+        {
+            "product_type": "ContactSensor",
+            "mac": "SENSOR1",
+            "nickname": "Door",
+            "device_params": {"open_close_state": open_close_state},
+        }
+    )
 
 
 class TestDeviceUpdater(unittest.IsolatedAsyncioTestCase):
     def setUp(self):
         self.mock_service = MagicMock()
-        self.mock_device = MagicMock(spec=Device)
-        self.mock_device.nickname = "TestDevice"
-        self.mock_device.callback_function = AsyncMock()
+        self.mock_device = make_device()
 
     def test_init(self):
         updater = DeviceUpdater(self.mock_service, self.mock_device, 60)
         self.assertEqual(updater.service, self.mock_service)
         self.assertEqual(updater.device, self.mock_device)
-        self.assertEqual(updater.update_in, 0)
+        self.assertEqual(updater.next_update, 0)
+        self.assertFalse(updater.removed)
         self.assertEqual(updater.updates_per_interval, 5)  # ceil(300/60)
+        self.assertEqual(updater.interval, 60)
 
-    async def test_update_when_ready(self):
+    async def test_update(self):
         updater = DeviceUpdater(self.mock_service, self.mock_device, 60)
-        updater.update_in = 0
         self.mock_service.update = AsyncMock(return_value=self.mock_device)
-        mock_mutex = MagicMock()
-        mock_mutex.acquire = MagicMock()
-        mock_mutex.release = MagicMock()
 
-        await updater.update(mock_mutex)
+        await updater.update()
 
         self.mock_service.update.assert_awaited_once_with(self.mock_device)
         self.mock_device.callback_function.assert_called_once_with(self.mock_device)
-        mock_mutex.acquire.assert_called_once()
-        mock_mutex.release.assert_called_once()
-        self.assertEqual(
-            updater.update_in, 60
-        )  # Reset to ceil(INTERVAL / updates_per_interval)
-
-    async def test_update_when_not_ready(self):
-        updater = DeviceUpdater(self.mock_service, self.mock_device, 60)
-        updater.update_in = 3
-        self.mock_service.update = AsyncMock()
-        mock_mutex = MagicMock()
-        mock_mutex.acquire = MagicMock()
-        mock_mutex.release = MagicMock()
-
-        await updater.update(mock_mutex)
-
-        self.mock_service.update.assert_not_awaited()
-        self.mock_device.callback_function.assert_not_called()
-        mock_mutex.acquire.assert_not_called()
-        mock_mutex.release.assert_not_called()
-        self.assertEqual(updater.update_in, 2)  # update_in reduced by 1
 
     async def test_update_exception_handling(self):
         updater = DeviceUpdater(self.mock_service, self.mock_device, 60)
-        updater.update_in = 0
         self.mock_service.update = AsyncMock(side_effect=Exception("Test Exception"))
-        mock_mutex = MagicMock()
-        mock_mutex.acquire = MagicMock()
-        mock_mutex.release = MagicMock()
 
-        await updater.update(mock_mutex)
+        await updater.update()
 
         self.mock_service.update.assert_awaited_once_with(self.mock_device)
         self.mock_device.callback_function.assert_not_called()
-        mock_mutex.acquire.assert_called_once()
-        mock_mutex.release.assert_called_once()
-        self.assertEqual(updater.update_in, 60)  # Still resets update_in
 
-    def test_tick_tock(self):
+    def test_schedule_next(self):
         updater = DeviceUpdater(self.mock_service, self.mock_device, 60)
-        updater.update_in = 5
-        updater.tick_tock()
-        self.assertEqual(updater.update_in, 4)
+        updater.schedule_next(100.0)
+        self.assertEqual(updater.next_update, 160.0)
 
-        updater.update_in = 0
-        updater.tick_tock()
-        self.assertEqual(updater.update_in, 0)  # Should not go below 0
+        updater.updates_per_interval = 1
+        updater.schedule_next(100.0)
+        self.assertEqual(updater.next_update, 400.0)
+
+    def test_ordering_follows_deadline(self):
+        early = DeviceUpdater(self.mock_service, self.mock_device, 60)
+        late = DeviceUpdater(self.mock_service, self.mock_device, 60)
+        early.next_update = 1.0
+        late.next_update = 2.0
+        self.assertLess(early, late)
 
     def test_delay(self):
         updater = DeviceUpdater(self.mock_service, self.mock_device, 60)
@@ -88,12 +90,98 @@ class TestDeviceUpdater(unittest.IsolatedAsyncioTestCase):
         updater.delay()
         self.assertEqual(updater.updates_per_interval, 1)  # Should not go below 1
 
+    async def test_update_observes_state_changes(self):
+        device = Device({"mac": "MAC1", "nickname": "Plug", "product_type": "Plug"})
+        device.callback_function = MagicMock()
+        changes = iter([True, False, False])
+
+        async def update(a_device):
+            if next(changes):
+                a_device.available = not a_device.available
+            return a_device
+
+        self.mock_service.update = update
+        updater = DeviceUpdater(self.mock_service, device, 60)
+        for _ in range(3):
+            await updater.update()
+
+        self.assertEqual(updater.samples, 3)
+        self.assertAlmostEqual(updater.change_rate, 0.64)
+
+    def test_target_waits_for_samples(self):
+        updater = DeviceUpdater(self.mock_service, self.mock_device, 60)
+        for _ in range(MIN_SAMPLES - 1):
+            updater.observe(True)
+        self.assertIsNone(updater.target_updates())
+        updater.observe(True)
+        self.assertEqual(updater.target_updates(), 10)
+
+    def test_target_follows_change_rate(self):
+        idle = DeviceUpdater(self.mock_service, self.mock_device, 60)
+        volatile = DeviceUpdater(self.mock_service, self.mock_device, 60)
+        for _ in range(MIN_SAMPLES):
+            idle.observe(False)
+            volatile.observe(True)
+        self.assertEqual(idle.target_updates(), 1)
+        self.assertEqual(volatile.target_updates(), 10)
+
+    def test_active_devices_are_polled_faster_without_changes(self):
+        updater = DeviceUpdater(self.mock_service, make_device(active=True), 60)
+        # Active from the start, before any update was observed
+        self.assertEqual(updater.target_updates(), 10)
+
+        for _ in range(MIN_SAMPLES):
+            updater.observe(False)
+        self.assertEqual(updater.target_updates(), 10)
+
+    def test_active_states(self):
+        self.assertTrue(contact_sensor(1).is_active())
+        self.assertFalse(contact_sensor(0).is_active())
+
+        thermostat = Thermostat({"product_type": "Thermostat", "mac": "T1"})
+        self.assertFalse(thermostat.is_active())
+        thermostat.hvac_state = HVACState.HEATING
+        self.assertTrue(thermostat.is_active())
+
+        purifier = AirPurifier({"product_type": "AirPurifier", "mac": "P1"})
+        self.assertFalse(purifier.is_active())
+        purifier.on = True
+        self.assertTrue(purifier.is_active())
+
+    def test_security_devices_keep_their_base_rate(self):
+        updater = DeviceUpdater(self.mock_service, contact_sensor(0), 60)
+        for _ in range(MIN_SAMPLES):
+            updater.observe(False)
+
+        self.assertEqual(updater.target_updates(), 5)
+
+    async def test_update_failing_before_the_request_is_logged(self):
+        updater = DeviceUpdater(self.mock_service, self.mock_device, 60)
+        updater.hosts = {"api.wyzecam.com"}
+        self.mock_service.update = AsyncMock(return_value=self.mock_device)
+
+        with patch(
+            "wyzeapy.services.update_manager.decoded_state",
+            side_effect=RuntimeError("boom"),
+        ):
+            with self.assertLogs("wyzeapy.services.update_manager", "ERROR"):
+                await updater.update()
+
+        self.mock_service.update.assert_not_awaited()
+        self.assertEqual(updater.hosts, {"api.wyzecam.com"})
+
+    def test_target_speedup_is_capped(self):
+        fast = DeviceUpdater(self.mock_service, self.mock_device, 5)
+        for _ in range(MIN_SAMPLES):
+            fast.observe(True)
+        # Already faster than MIN_ADAPTIVE_INTERVAL: keeps its grant
+        self.assertEqual(fast.target_updates(), 60)
+
 
 class TestUpdateManager(unittest.IsolatedAsyncioTestCase):
     def setUp(self):
         # Reset the class-level attributes before each test
         UpdateManager.updaters = []
-        UpdateManager.removed_updaters = []
         self.update_manager = UpdateManager()
         # For logging assertions
         import logging
@@ -101,13 +189,18 @@ class TestUpdateManager(unittest.IsolatedAsyncioTestCase):
         self.caplog = logging.getLogger("wyzeapy.services.update_manager")
         self.caplog.setLevel(logging.DEBUG)
 
-    def test_check_if_removed(self):
-        mock_updater1 = MagicMock()
-        mock_updater2 = MagicMock()
-        self.update_manager.removed_updaters.append(mock_updater1)
+    def make_updater(self, interval=60, update=None):
+        device = make_device()
+        service = MagicMock()
+        service.update = update or AsyncMock(return_value=device)
+        return DeviceUpdater(service, device, interval)
 
-        self.assertTrue(self.update_manager.check_if_removed(mock_updater1))
-        self.assertFalse(self.update_manager.check_if_removed(mock_updater2))
+    async def run_manager(self, seconds):
+        task = asyncio.create_task(self.update_manager.update_next())
+        await asyncio.sleep(seconds)
+        task.cancel()
+        with self.assertRaises(asyncio.CancelledError):
+            await task
 
     @patch("asyncio.sleep", new_callable=AsyncMock)
     async def test_update_next_no_updaters(self, mock_sleep):
@@ -116,6 +209,107 @@ class TestUpdateManager(unittest.IsolatedAsyncioTestCase):
             self.assertIn("No devices to update in queue", cm.output[0])
         mock_sleep.assert_not_awaited()
 
+    async def test_due_updates_run_concurrently(self):
+        started = []
+        release = asyncio.Event()
+
+        async def slow_update(device):
+            started.append(device)
+            await release.wait()
+            return device
+
+        updaters = [self.make_updater(update=slow_update) for _ in range(3)]
+        for updater in updaters:
+            self.update_manager.add_updater(updater)
+
+        task = asyncio.create_task(self.update_manager.update_next())
+        await asyncio.sleep(0.05)
+        # All three devices are in flight at once; none waited a 1 second tick
+        self.assertEqual(len(started), 3)
+        release.set()
+        await asyncio.sleep(0.05)
+        task.cancel()
+        with self.assertRaises(asyncio.CancelledError):
+            await task
+
+        for updater in updaters:
+            updater.device.callback_function.assert_called_once()
+            self.assertGreater(updater.next_update, 0)
+
+    async def test_concurrency_is_bounded_by_semaphore(self):
+        in_flight = 0
+        peak = 0
+
+        async def update(device):
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0.01)
+            in_flight -= 1
+            return device
+
+        self.update_manager = UpdateManager(max_concurrent_updates=2)
+        for _ in range(5):
+            self.update_manager.add_updater(self.make_updater(update=update))
+
+        await self.run_manager(0.1)
+        self.assertEqual(peak, 2)
+
+    async def test_updates_are_rescheduled_by_deadline(self):
+        updater = self.make_updater(interval=60)
+        self.update_manager.add_updater(updater)
+
+        await self.run_manager(0.05)
+
+        updater.service.update.assert_awaited_once()
+        loop_time = asyncio.get_running_loop().time()
+        self.assertAlmostEqual(updater.next_update, loop_time + 60, delta=1)
+        self.assertIn(updater, self.update_manager.updaters)
+
+    async def test_budget_limits_updates_per_interval(self):
+        with patch("wyzeapy.services.update_manager.MAX_SLOTS", 2):
+            updaters = [self.make_updater(interval=300) for _ in range(2)]
+            for updater in updaters:
+                self.update_manager.add_updater(updater)
+            # A third device squeezed in by hand is over the request budget
+            extra = self.make_updater(interval=300)
+            self.update_manager.updaters.append(extra)
+
+            await self.run_manager(0.05)
+
+        updated = [u for u in updaters + [extra] if u.service.update.await_count]
+        self.assertEqual(len(updated), 2)
+
+    async def test_removed_updater_is_not_run(self):
+        updater = self.make_updater()
+        self.update_manager.add_updater(updater)
+        self.update_manager.del_updater(updater)
+        self.update_manager.add_updater(self.make_updater())
+
+        await self.run_manager(0.05)
+
+        updater.service.update.assert_not_awaited()
+        self.assertFalse(
+            any(u is updater for u in self.update_manager.active_updaters())
+        )
+
+    async def test_new_updater_wakes_sleeping_scheduler(self):
+        waiting = self.make_updater(interval=300)
+        waiting.next_update = asyncio.get_running_loop().time() + 300
+        self.update_manager.add_updater(waiting)
+
+        task = asyncio.create_task(self.update_manager.update_next())
+        await asyncio.sleep(0.01)
+        new = self.make_updater()
+        self.update_manager.add_updater(new)
+        await asyncio.sleep(0.05)
+        task.cancel()
+        with self.assertRaises(asyncio.CancelledError):
+            await task
+
+        new.service.update.assert_awaited_once()
+        waiting.service.update.assert_not_awaited()
+
     def test_filled_slots(self):
         updater1 = DeviceUpdater(
             MagicMock(), MagicMock(), 60
@@ -126,6 +320,9 @@ class TestUpdateManager(unittest.IsolatedAsyncioTestCase):
         self.update_manager.updaters.extend([updater1, updater2])
         self.assertEqual(self.update_manager.filled_slots(), 7)
 
+        self.update_manager.del_updater(updater2)
+        self.assertEqual(self.update_manager.filled_slots(), 5)
+
     def test_decrease_updates_per_interval(self):
         updater1 = DeviceUpdater(
             MagicMock(), MagicMock(), 60
@@ -139,17 +336,6 @@ class TestUpdateManager(unittest.IsolatedAsyncioTestCase):
         self.assertEqual(updater1.updates_per_interval, 4)
         self.assertEqual(updater2.updates_per_interval, 1)
 
-    def test_tick_tock_manager(self):
-        updater1 = DeviceUpdater(MagicMock(), MagicMock(), 60)
-        updater1.update_in = 5
-        updater2 = DeviceUpdater(MagicMock(), MagicMock(), 150)
-        updater2.update_in = 2
-        self.update_manager.updaters.extend([updater1, updater2])
-
-        self.update_manager.tick_tock()
-        self.assertEqual(updater1.update_in, 4)
-        self.assertEqual(updater2.update_in, 1)
-
     def test_add_updater_success(self):
         updater = DeviceUpdater(
             MagicMock(), MagicMock(), 60
@@ -160,7 +346,9 @@ class TestUpdateManager(unittest.IsolatedAsyncioTestCase):
 
     def test_add_updater_exceeds_max_slots(self):
         # Directly set updaters to exceed MAX_SLOTS
-        UpdateManager.updaters = [MagicMock()] * (MAX_SLOTS + 1)
+        UpdateManager.updaters = [
+            DeviceUpdater(MagicMock(), MagicMock(), 300) for _ in range(MAX_SLOTS + 1)
+        ]
 
         new_updater = DeviceUpdater(
             MagicMock(), MagicMock(), 1
@@ -197,3 +385,50 @@ class TestUpdateManager(unittest.IsolatedAsyncioTestCase):
         with self.assertLogs("wyzeapy.services.update_manager", level="DEBUG") as cm:
             self.update_manager.del_updater(updater)
             self.assertIn("Removing device from update queue", cm.output[0])
+        self.assertTrue(updater.removed)
+
+    def test_rebalance_adapts_intervals(self):
+        idle = DeviceUpdater(MagicMock(), make_device("IDLE"), 60)
+        volatile = DeviceUpdater(MagicMock(), make_device("VOLATILE"), 60)
+        new = DeviceUpdater(MagicMock(), make_device("NEW"), 60)
+        for _ in range(MIN_SAMPLES):
+            idle.observe(False)
+            volatile.observe(True)
+        self.update_manager.updaters.extend([idle, volatile, new])
+
+        self.update_manager.rebalance()
+
+        self.assertEqual(
+            self.update_manager.effective_intervals(),
+            {"IDLE": 300, "VOLATILE": 30, "NEW": 60},
+        )
+
+    def test_rebalance_stays_within_max_slots(self):
+        idle = DeviceUpdater(MagicMock(), make_device(), 30)
+        volatile = [DeviceUpdater(MagicMock(), make_device(), 30) for _ in range(2)]
+        for _ in range(MIN_SAMPLES):
+            idle.observe(False)
+            for updater in volatile:
+                updater.observe(True)
+        self.update_manager.updaters.extend([idle] + volatile)
+
+        with patch("wyzeapy.services.update_manager.MAX_SLOTS", 30):
+            self.update_manager.rebalance()
+
+        # The idle device drops to 2 updates and the volatile ones split the rest
+        self.assertEqual(idle.effective_updates, 2)
+        self.assertEqual([u.effective_updates for u in volatile], [14, 14])
+        self.assertLessEqual(sum(u.effective_updates for u in [idle] + volatile), 30)
+
+    async def test_update_rebalances_updater(self):
+        updater = self.make_updater(interval=60)
+        for _ in range(MIN_SAMPLES):
+            updater.observe(False)
+        self.update_manager.add_updater(updater)
+
+        await self.run_manager(0.05)
+
+        # The unchanged update is the fourth idle sample: polled once per INTERVAL
+        self.assertEqual(updater.interval, 300)
+        loop_time = asyncio.get_running_loop().time()
+        self.assertAlmostEqual(updater.next_update, loop_time + 300, delta=1)
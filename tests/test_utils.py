@@ -12,6 +12,7 @@ from wyzeapy.utils import (
     check_for_errors_iot,
     check_for_errors_hms,
     return_event_for_device,
+    index_events_by_mac,
     create_pid_pair,
 )
 from wyzeapy.exceptions import ParameterError, AccessTokenError, UnknownApiError
@@ -209,6 +210,13 @@ class TestUtils(unittest.TestCase):
         result = return_event_for_device(mock_device, events)
         self.assertIsNone(result)
 
+    def test_index_events_by_mac_keeps_first_event(self):
+        newest = MagicMock(spec=Event, device_mac="mac_1")
+        older = MagicMock(spec=Event, device_mac="mac_1")
+        other = MagicMock(spec=Event, device_mac="mac_2")
+        index = index_events_by_mac([newest, other, older])
+        self.assertEqual(index, {"mac_1": newest, "mac_2": other})
+
     def test_create_pid_pair(self):
         pid_enum = PropertyIDs.ON
         value = "1"
@@ -0,0 +1,150 @@
+import asyncio
+import unittest
+from unittest.mock import AsyncMock, MagicMock
+
+from wyzeapy.services.bulb_service import Bulb, BulbService
+from wyzeapy.services.write_queue import WriteQueue
+from wyzeapy.types import Device
+
+
+def make_device(mac="MAC1"):
+    return Device(
+        {
+            "product_type": "Light",
+            "product_model": "WLPA19",
+            "mac": mac,
+            "nickname": mac,
+        }
+    )
+
+
+class TestWriteQueue(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.queue = WriteQueue()
+        self.device = make_device()
+
+    async def test_writes_behind_an_in_flight_write_are_merged(self):
+        release = asyncio.Event()
+        sent = []
+
+        async def send(device, plist):
+            sent.append(plist)
+            await release.wait()
+
+        first = asyncio.create_task(
+            self.queue.submit(self.device, [{"pid": "P1501", "pvalue": "10"}], send)
+        )
+        await asyncio.sleep(0)
+        rest = [
+            asyncio.create_task(
+                self.queue.submit(
+                    self.device, [{"pid": "P1501", "pvalue": str(value)}], send
+                )
+            )
+            for value in range(20, 100, 10)
+        ]
+        await asyncio.sleep(0)
+        # Only the first write is in flight while the others wait
+        self.assertEqual(len(sent), 1)
+
+        release.set()
+        await asyncio.gather(first, *rest)
+
+        self.assertEqual(
+            sent,
+            [[{"pid": "P1501", "pvalue": "10"}], [{"pid": "P1501", "pvalue": "90"}]],
+        )
+        self.assertEqual(self.queue.writes, 9)
+        self.assertEqual(self.queue.requests, 2)
+
+    async def test_different_senders_keep_submission_order(self):
+        calls = []
+
+        async def cloud(device, plist):
+            calls.append(("cloud", plist[0]["pvalue"]))
+
+        async def local(device, plist):
+            calls.append(("local", plist[0]["pvalue"]))
+
+        await asyncio.gather(
+            self.queue.submit(self.device, [{"pid": "P3", "pvalue": "1"}], cloud),
+            self.queue.submit(self.device, [{"pid": "P3", "pvalue": "2"}], local),
+            self.queue.submit(self.device, [{"pid": "P3", "pvalue": "3"}], cloud),
+        )
+
+        self.assertEqual(calls, [("cloud", "1"), ("local", "2"), ("cloud", "3")])
+
+    async def test_devices_are_written_independently(self):
+        send = AsyncMock()
+        other = make_device("MAC2")
+
+        await asyncio.gather(
+            self.queue.submit(self.device, [{"pid": "P3", "pvalue": "1"}], send),
+            self.queue.submit(other, [{"pid": "P3", "pvalue": "1"}], send),
+        )
+
+        self.assertEqual(send.await_count, 2)
+
+    async def test_errors_reach_every_merged_caller(self):
+        send = AsyncMock(side_effect=ValueError("boom"))
+
+        results = await asyncio.gather(
+            self.queue.submit(self.device, [{"pid": "P3", "pvalue": "1"}], send),
+            self.queue.submit(self.device, [{"pid": "P3", "pvalue": "0"}], send),
+            return_exceptions=True,
+        )
+
+        self.assertTrue(all(isinstance(result, ValueError) for result in results))
+        send.assert_awaited_once()
+
+    async def test_cancelled_drain_resolves_in_flight_and_queued_writes(self):
+        started = asyncio.Event()
+
+        async def send(device, plist):
+            started.set()
+            await asyncio.Event().wait()
+
+        in_flight = asyncio.create_task(
+            self.queue.submit(self.device, [{"pid": "P3", "pvalue": "1"}], send)
+        )
+        await started.wait()
+        queued = asyncio.create_task(
+            self.queue.submit(self.device, [{"pid": "P3", "pvalue": "0"}], send)
+        )
+        await asyncio.sleep(0)
+
+        self.queue._drains[self.device.mac].cancel()
+        results = await asyncio.wait_for(
+            asyncio.gather(in_flight, queued, return_exceptions=True), 1
+        )
+
+        self.assertTrue(
+            all(isinstance(result, asyncio.CancelledError) for result in results)
+        )
+        self.assertEqual(self.queue._drains, {})
+
+
+class TestBulbServiceWriteQueue(unittest.IsolatedAsyncioTestCase):
+    async def test_slider_burst_sends_latest_brightness(self):
+        service = BulbService(auth_lib=MagicMock())
+        service._set_property_list = AsyncMock()
+        bulb = Bulb(
+            {
+                "product_type": "Light",
+                "product_model": "WLPA19",
+                "mac": "BULB1",
+                "device_params": {"ip": "192.168.1.20"},
+            }
+        )
+
+        await asyncio.gather(
+            *(service.set_brightness(bulb, value) for value in range(0, 101, 10))
+        )
+
+        service._set_property_list.assert_awaited_once_with(
+            bulb, [{"pid": "P1501", "pvalue": "100"}]
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -10,10 +10,45 @@ from wyzeapy.wyze_auth_lib import (
     UnknownApiError,
     get_ssl_context,
 )
+import asyncio
+import json
 import time
 import aiohttp  # Import aiohttp
 
 
+def patch_pooled_session():
+    """Patch ClientSession with a mock of the long-lived pooled session."""
+    return patch(
+        "wyzeapy.wyze_auth_lib.ClientSession", return_value=AsyncMock(closed=False)
+    )
+
+
+def json_response(payload):
+    """Build a mock response whose body is `payload` encoded as JSON."""
+    response = MagicMock(content_type="application/json", status=200)
+    response.read = AsyncMock(return_value=json.dumps(payload).encode())
+    return response
+
+
+def text_response(body=b"Not JSON"):
+    """Build a mock response with a non-JSON content type."""
+    response = MagicMock(content_type="text/html", status=200)
+    response.read = AsyncMock(return_value=body)
+    return response
+
+
+def queue_responses(mock_session, *responses):
+    """Make the pooled session's `request` yield `responses` in order."""
+    contexts = []
+    for response in responses:
+        context = MagicMock()
+        context.__aenter__ = AsyncMock(return_value=response)
+        context.__aexit__ = AsyncMock(return_value=False)
+        contexts.append(context)
+    mock_session.return_value.request = MagicMock(side_effect=contexts)
+    return mock_session.return_value.request
+
+
 class TestWyzeAuthLib(unittest.IsolatedAsyncioTestCase):
     def test_ssl_context_includes_system_certifi_and_wyze_ca(self):
         certificates = get_ssl_context().get_ca_certs(binary_form=True)
@@ -37,17 +72,15 @@ class TestWyzeAuthLib(unittest.IsolatedAsyncioTestCase):
         self.assertEqual(auth_lib._username, "test_user")
         self.assertEqual(auth_lib._password, "test_password")
 
-    @patch("wyzeapy.wyze_auth_lib.ClientSession")
+    @patch_pooled_session()
     async def test_login_success(self, mock_session):
-        mock_response = AsyncMock()
-        mock_response.json.return_value = {
-            "access_token": "test_access_token",
-            "refresh_token": "test_refresh_token",
-        }
-        # The session context manager returns an object that has an async post method
-        mock_session.return_value.__aenter__.return_value.post.return_value = (
-            mock_response
+        mock_response = json_response(
+            {
+                "access_token": "test_access_token",
+                "refresh_token": "test_refresh_token",
+            }
         )
+        queue_responses(mock_session, mock_response)
 
         # Mock the token_callback
         mock_token_callback = AsyncMock()
@@ -64,24 +97,25 @@ class TestWyzeAuthLib(unittest.IsolatedAsyncioTestCase):
         self.assertIsInstance(token, Token)
         mock_token_callback.assert_called_once_with(token)
 
-    @patch("wyzeapy.wyze_auth_lib.ClientSession")
+    @patch_pooled_session()
     async def test_2fa_sms(self, mock_session):
         # First response indicates 2FA is needed
-        mock_2fa_response = AsyncMock()
-        mock_2fa_response.json.return_value = {
-            "mfa_options": ["PrimaryPhone"],
-            "sms_session_id": "some_session_id",
-            "user_id": "some_user_id",
-        }
+        mock_2fa_response = json_response(
+            {
+                "mfa_options": ["PrimaryPhone"],
+                "sms_session_id": "some_session_id",
+                "user_id": "some_user_id",
+            }
+        )
         # Second response for sending the code
-        mock_sms_sent_response = AsyncMock()
-        mock_sms_sent_response.json.return_value = {"session_id": "some_new_session_id"}
+        mock_sms_sent_response = json_response({"session_id": "some_new_session_id"})
 
         # Set up the mock session to return the responses in order
-        mock_session.return_value.__aenter__.return_value.post.side_effect = [
+        queue_responses(
+            mock_session,
             mock_2fa_response,
             mock_sms_sent_response,
-        ]
+        )
 
         auth_lib = WyzeAuthLib(username="test_user", password="test_password")
 
@@ -93,19 +127,18 @@ class TestWyzeAuthLib(unittest.IsolatedAsyncioTestCase):
         self.assertEqual(auth_lib.two_factor_type, "SMS")
         self.assertEqual(auth_lib.session_id, "some_new_session_id")
 
-    @patch("wyzeapy.wyze_auth_lib.ClientSession")
+    @patch_pooled_session()
     async def test_2fa_totp(self, mock_session):
         # First response indicates 2FA is needed
-        mock_2fa_response = AsyncMock()
-        mock_2fa_response.json.return_value = {
-            "mfa_options": ["TotpVerificationCode"],
-            "mfa_details": {"totp_apps": [{"app_id": "some_app_id"}]},
-        }
+        mock_2fa_response = json_response(
+            {
+                "mfa_options": ["TotpVerificationCode"],
+                "mfa_details": {"totp_apps": [{"app_id": "some_app_id"}]},
+            }
+        )
 
         # Set up the mock session to return the responses in order
-        mock_session.return_value.__aenter__.return_value.post.side_effect = [
-            mock_2fa_response
-        ]
+        queue_responses(mock_session, mock_2fa_response)
 
         auth_lib = WyzeAuthLib(username="test_user", password="test_password")
 
@@ -154,16 +187,15 @@ class TestWyzeAuthLib(unittest.IsolatedAsyncioTestCase):
         auth_lib = await WyzeAuthLib.create(token=mock_token)
         self.assertEqual(auth_lib.token, mock_token)
 
-    @patch("wyzeapy.wyze_auth_lib.ClientSession")
+    @patch_pooled_session()
     async def test_login_access_token_error(self, mock_session):
-        mock_response = AsyncMock()
-        mock_response.json.return_value = {
-            "errorCode": 1000,
-            "msg": "Access Token Error",
-        }
-        mock_session.return_value.__aenter__.return_value.post.return_value = (
-            mock_response
+        mock_response = json_response(
+            {
+                "errorCode": 1000,
+                "msg": "Access Token Error",
+            }
         )
+        queue_responses(mock_session, mock_response)
 
         auth_lib = WyzeAuthLib(username="test_user", password="test_password")
         with self.assertRaises(AccessTokenError):
@@ -171,13 +203,10 @@ class TestWyzeAuthLib(unittest.IsolatedAsyncioTestCase):
                 "test_user", "test_password", "test_key_id", "test_api_key"
             )
 
-    @patch("wyzeapy.wyze_auth_lib.ClientSession")
+    @patch_pooled_session()
     async def test_login_unknown_api_error(self, mock_session):
-        mock_response = AsyncMock()
-        mock_response.json.return_value = {"errorCode": 9999, "msg": "Unknown Error"}
-        mock_session.return_value.__aenter__.return_value.post.return_value = (
-            mock_response
-        )
+        mock_response = json_response({"errorCode": 9999, "msg": "Unknown Error"})
+        queue_responses(mock_session, mock_response)
 
         auth_lib = WyzeAuthLib(username="test_user", password="test_password")
         with self.assertRaises(UnknownApiError):
@@ -185,17 +214,16 @@ class TestWyzeAuthLib(unittest.IsolatedAsyncioTestCase):
                 "test_user", "test_password", "test_key_id", "test_api_key"
             )
 
-    @patch("wyzeapy.wyze_auth_lib.ClientSession")
+    @patch_pooled_session()
     @patch("wyzeapy.wyze_auth_lib.check_for_errors_standard")
     async def test_refresh_success(self, mock_check_for_errors_standard, mock_session):
-        mock_response = AsyncMock()
-        mock_response.json.return_value = {
-            "code": 1,  # ResponseCodes.SUCCESS.value
-            "data": {"access_token": "new_access", "refresh_token": "new_refresh"},
-        }
-        mock_session.return_value.__aenter__.return_value.post.return_value = (
-            mock_response
+        mock_response = json_response(
+            {
+                "code": 1,  # ResponseCodes.SUCCESS.value
+                "data": {"access_token": "new_access", "refresh_token": "new_refresh"},
+            }
         )
+        queue_responses(mock_session, mock_response)
 
         mock_token = Token(
             "old_access", "old_refresh", refresh_time=time.time() - 100
@@ -211,7 +239,7 @@ class TestWyzeAuthLib(unittest.IsolatedAsyncioTestCase):
         mock_token_callback.assert_called_once_with(auth_lib.token)
         mock_check_for_errors_standard.assert_called_once()
 
-    @patch("wyzeapy.wyze_auth_lib.ClientSession")
+    @patch_pooled_session()
     @patch("wyzeapy.wyze_auth_lib.check_for_errors_standard")
     async def test_refresh_access_token_error(
         self, mock_check_for_errors_standard, mock_session
@@ -222,14 +250,13 @@ class TestWyzeAuthLib(unittest.IsolatedAsyncioTestCase):
 
         mock_check_for_errors_standard.side_effect = custom_side_effect
 
-        mock_response = AsyncMock()
-        mock_response.json.return_value = {
-            "code": "2001",  # Access Token Error
-            "msg": "Refresh Token Error",
-        }
-        mock_session.return_value.__aenter__.return_value.post.return_value = (
-            mock_response
+        mock_response = json_response(
+            {
+                "code": "2001",  # Access Token Error
+                "msg": "Refresh Token Error",
+            }
         )
+        queue_responses(mock_session, mock_response)
 
         mock_token = Token("old_access", "old_refresh", refresh_time=time.time() - 100)
         auth_lib = WyzeAuthLib(token=mock_token)
@@ -239,18 +266,15 @@ class TestWyzeAuthLib(unittest.IsolatedAsyncioTestCase):
         self.assertTrue(auth_lib.token.expired)
         mock_check_for_errors_standard.assert_called_once()
 
-    @patch("wyzeapy.wyze_auth_lib.ClientSession")
+    @patch_pooled_session()
     @patch(
         "wyzeapy.wyze_auth_lib.check_for_errors_standard", side_effect=UnknownApiError
     )
     async def test_refresh_unknown_api_error(
         self, mock_check_for_errors_standard, mock_session
     ):
-        mock_response = AsyncMock()
-        mock_response.json.return_value = {"code": 9999, "msg": "Unknown Refresh Error"}
-        mock_session.return_value.__aenter__.return_value.post.return_value = (
-            mock_response
-        )
+        mock_response = json_response({"code": 9999, "msg": "Unknown Refresh Error"})
+        queue_responses(mock_session, mock_response)
 
         mock_token = Token("old_access", "old_refresh", refresh_time=time.time() - 100)
         auth_lib = WyzeAuthLib(token=mock_token)
@@ -307,178 +331,234 @@ class TestWyzeAuthLib(unittest.IsolatedAsyncioTestCase):
         )
         self.assertEqual(sanitized_data["nested"]["non_sensitive"], "value")
         self.assertEqual(sanitized_data["non_sensitive_top"], "another_value")
+        self.assertEqual(data["email"], "test@example.com")
+        self.assertEqual(data["nested"]["refresh_token"], "some_refresh_token")
 
-    @patch("wyzeapy.wyze_auth_lib.ClientSession")
-    async def test_post_success(self, mock_session):
-        mock_response = AsyncMock()
-        mock_response.json.return_value = {"status": "success"}
-        mock_session.return_value.__aenter__.return_value.post.return_value = (
-            mock_response
+    @patch_pooled_session()
+    async def test_response_body_is_read_once(self, mock_session):
+        mock_response = json_response({"status": "success"})
+        queue_responses(mock_session, mock_response)
+
+        auth_lib = WyzeAuthLib()
+        with self.assertLogs("wyzeapy.wyze_auth_lib", level="DEBUG"):
+            result = await auth_lib.post("http://test.com", json={"key": "value"})
+
+        self.assertEqual(result, {"status": "success"})
+        mock_response.read.assert_awaited_once()
+
+    @patch_pooled_session()
+    async def test_sanitize_skipped_without_debug_logging(self, mock_session):
+        queue_responses(mock_session, json_response({"access_token": "secret"}))
+
+        auth_lib = WyzeAuthLib()
+        auth_lib.sanitize = MagicMock()
+        result = await auth_lib.post("http://test.com", json={"password": "pw"})
+
+        self.assertEqual(result, {"access_token": "secret"})
+        auth_lib.sanitize.assert_not_called()
+
+    @patch_pooled_session()
+    async def test_empty_json_body_returns_none(self, mock_session):
+        mock_response = json_response(None)
+        mock_response.read.return_value = b""
+        queue_responses(mock_session, mock_response)
+
+        auth_lib = WyzeAuthLib()
+        self.assertIsNone(await auth_lib.get("http://test.com"))
+
+    async def test_session_is_pooled_and_closed(self):
+        auth_lib = WyzeAuthLib()
+        session = auth_lib.session
+        self.assertIs(auth_lib.session, session)
+
+        await auth_lib.close()
+        self.assertTrue(session.closed)
+
+        new_session = auth_lib.session
+        self.assertIsNot(new_session, session)
+        await auth_lib.close()
+
+    async def test_context_manager_closes_session(self):
+        async with WyzeAuthLib() as auth_lib:
+            session = auth_lib.session
+        self.assertTrue(session.closed)
+
+    @patch_pooled_session()
+    async def test_requests_share_one_session(self, mock_session):
+        mock_response = json_response({"status": "success"})
+        queue_responses(mock_session, mock_response, mock_response)
+
+        auth_lib = WyzeAuthLib()
+        await auth_lib.post("http://test.com", json={"key": "value"})
+        await auth_lib.get("http://test.com")
+
+        mock_session.assert_called_once()
+
+    @patch_pooled_session()
+    async def test_throttled_request_is_retried_after_backoff(self, mock_session):
+        throttled = json_response({"code": 429})
+        throttled.status = 429
+        throttled.headers = {"Retry-After": "0.01"}
+        request = queue_responses(
+            mock_session, throttled, json_response({"status": "success"})
         )
 
+        auth_lib = WyzeAuthLib()
+        result = await auth_lib.get("https://api.wyzecam.com/app/test")
+
+        self.assertEqual(result, {"status": "success"})
+        self.assertEqual(request.call_count, 2)
+        self.assertEqual(auth_lib.rate_limiter.stats.throttled, 1)
+        self.assertEqual(auth_lib.rate_limiter.stats.requests, 2)
+
+    async def test_connection_stats(self):
+        stats = WyzeAuthLib().connection_stats
+        trace_config = stats.trace_config()
+        await trace_config.on_request_start[0](None, None, None)
+        await trace_config.on_request_start[0](None, None, None)
+        await trace_config.on_connection_create_end[0](None, None, None)
+        await trace_config.on_connection_reuseconn[0](None, None, None)
+
+        self.assertEqual(stats.requests, 2)
+        self.assertEqual(stats.connections_created, 1)
+        self.assertEqual(stats.connections_reused, 1)
+        self.assertEqual(stats.reuse_ratio, 0.5)
+
+    @patch_pooled_session()
+    async def test_post_success(self, mock_session):
+        mock_response = json_response({"status": "success"})
+        request = queue_responses(mock_session, mock_response)
+
         auth_lib = WyzeAuthLib()
         result = await auth_lib.post("http://test.com", json={"key": "value"})
         self.assertEqual(result, {"status": "success"})
+        self.assertEqual(request.call_args.args[:2], ("POST", "http://test.com"))
 
-    @patch("wyzeapy.wyze_auth_lib.ClientSession")
+    @patch_pooled_session()
     async def test_put_success(self, mock_session):
-        mock_response = AsyncMock()
-        mock_response.json.return_value = {"status": "success"}
-        mock_session.return_value.__aenter__.return_value.put.return_value = (
-            mock_response
-        )
+        mock_response = json_response({"status": "success"})
+        request = queue_responses(mock_session, mock_response)
 
         auth_lib = WyzeAuthLib()
         result = await auth_lib.put("http://test.com", json={"key": "value"})
         self.assertEqual(result, {"status": "success"})
+        self.assertEqual(request.call_args.args[:2], ("PUT", "http://test.com"))
 
-    @patch("wyzeapy.wyze_auth_lib.ClientSession")
+    @patch_pooled_session()
     async def test_get_success(self, mock_session):
-        mock_response = AsyncMock()
-        mock_response.json.return_value = {"status": "success"}
-        mock_session.return_value.__aenter__.return_value.get.return_value = (
-            mock_response
-        )
+        mock_response = json_response({"status": "success"})
+        request = queue_responses(mock_session, mock_response)
 
         auth_lib = WyzeAuthLib()
         result = await auth_lib.get("http://test.com", params={"key": "value"})
         self.assertEqual(result, {"status": "success"})
+        self.assertEqual(request.call_args.args[:2], ("GET", "http://test.com"))
 
-    @patch("wyzeapy.wyze_auth_lib.ClientSession")
+    @patch_pooled_session()
     async def test_patch_success(self, mock_session):
-        mock_response = AsyncMock()
-        mock_response.json.return_value = {"status": "success"}
-        mock_session.return_value.__aenter__.return_value.patch.return_value = (
-            mock_response
-        )
+        mock_response = json_response({"status": "success"})
+        request = queue_responses(mock_session, mock_response)
 
         auth_lib = WyzeAuthLib()
         result = await auth_lib.patch("http://test.com", json={"key": "value"})
         self.assertEqual(result, {"status": "success"})
+        self.assertEqual(request.call_args.args[:2], ("PATCH", "http://test.com"))
 
-    @patch("wyzeapy.wyze_auth_lib.ClientSession")
+    @patch_pooled_session()
     async def test_delete_success(self, mock_session):
-        mock_response = AsyncMock()
-        mock_response.json.return_value = {"status": "success"}
-        mock_session.return_value.__aenter__.return_value.delete.return_value = (
-            mock_response
-        )
+        mock_response = json_response({"status": "success"})
+        request = queue_responses(mock_session, mock_response)
 
         auth_lib = WyzeAuthLib()
         result = await auth_lib.delete("http://test.com", json={"key": "value"})
         self.assertEqual(result, {"status": "success"})
+        self.assertEqual(request.call_args.args[:2], ("DELETE", "http://test.com"))
 
-    @patch("wyzeapy.wyze_auth_lib.ClientSession")
+    @patch_pooled_session()
     async def test_post_content_type_error(self, mock_session):
-        mock_response = AsyncMock()
-        mock_response.json.side_effect = aiohttp.ContentTypeError(
-            request_info=MagicMock(),
-            history=(),
-            message="Not JSON",
-            headers=MagicMock(),
-        )
-        mock_session.return_value.__aenter__.return_value.post.return_value = (
-            mock_response
-        )
+        mock_response = text_response()
+        queue_responses(mock_session, mock_response)
 
         auth_lib = WyzeAuthLib()
         with self.assertRaises(aiohttp.ContentTypeError):
             await auth_lib.post("http://test.com", json={"key": "value"})
 
-    @patch("wyzeapy.wyze_auth_lib.ClientSession")
+    @patch_pooled_session()
     async def test_put_content_type_error(self, mock_session):
-        mock_response = AsyncMock()
-        mock_response.json.side_effect = aiohttp.ContentTypeError(
-            request_info=MagicMock(),
-            history=(),
-            message="Not JSON",
-            headers=MagicMock(),
-        )
-        mock_session.return_value.__aenter__.return_value.put.return_value = (
-            mock_response
-        )
+        mock_response = text_response()
+        queue_responses(mock_session, mock_response)
 
         auth_lib = WyzeAuthLib()
         with self.assertRaises(aiohttp.ContentTypeError):
             await auth_lib.put("http://test.com", json={"key": "value"})
 
-    @patch("wyzeapy.wyze_auth_lib.ClientSession")
+    @patch_pooled_session()
     async def test_get_content_type_error(self, mock_session):
-        mock_response = AsyncMock()
-        mock_response.json.side_effect = aiohttp.ContentTypeError(
-            request_info=MagicMock(),
-            history=(),
-            message="Not JSON",
-            headers=MagicMock(),
-        )
-        mock_session.return_value.__aenter__.return_value.get.return_value = (
-            mock_response
-        )
+        mock_response = text_response()
+        queue_responses(mock_session, mock_response)
 
         auth_lib = WyzeAuthLib()
         with self.assertRaises(aiohttp.ContentTypeError):
             await auth_lib.get("http://test.com", params={"key": "value"})
 
-    @patch("wyzeapy.wyze_auth_lib.ClientSession")
+    @patch_pooled_session()
     async def test_patch_content_type_error(self, mock_session):
-        mock_response = AsyncMock()
-        mock_response.json.side_effect = aiohttp.ContentTypeError(
-            request_info=MagicMock(),
-            history=(),
-            message="Not JSON",
-            headers=MagicMock(),
-        )
-        mock_session.return_value.__aenter__.return_value.patch.return_value = (
-            mock_response
-        )
+        mock_response = text_response()
+        queue_responses(mock_session, mock_response)
 
         auth_lib = WyzeAuthLib()
         with self.assertRaises(aiohttp.ContentTypeError):
             await auth_lib.patch("http://test.com", json={"key": "value"})
 
-    @patch("wyzeapy.wyze_auth_lib.ClientSession")
+    @patch_pooled_session()
     async def test_delete_content_type_error(self, mock_session):
-        mock_response = AsyncMock()
-        mock_response.json.side_effect = aiohttp.ContentTypeError(
-            request_info=MagicMock(),
-            history=(),
-            message="Not JSON",
-            headers=MagicMock(),
-        )
-        mock_session.return_value.__aenter__.return_value.delete.return_value = (
-            mock_response
-        )
+        mock_response = text_response()
+        queue_responses(mock_session, mock_response)
 
         auth_lib = WyzeAuthLib()
         with self.assertRaises(aiohttp.ContentTypeError):
             await auth_lib.delete("http://test.com", json={"key": "value"})
 
-    @patch("wyzeapy.wyze_auth_lib.ClientSession")
+    @patch_pooled_session()
+    async def test_server_error_with_json_body_counts_as_failure(self, mock_session):
+        mock_response = json_response({"code": "5000", "msg": "internal error"})
+        mock_response.status = 503
+        queue_responses(mock_session, mock_response)
+
+        auth_lib = WyzeAuthLib()
+        with self.assertRaises(aiohttp.ClientResponseError) as cm:
+            await auth_lib.post("http://test.com", json={"key": "value"})
+        self.assertEqual(cm.exception.status, 503)
+        self.assertEqual(auth_lib.circuit_breakers.for_host("test.com").failures, 1)
+
+    @patch_pooled_session()
     async def test_get_token_with_2fa_sms_success(self, mock_session):
         # Mock the initial login response to indicate SMS 2FA is required
-        mock_login_response = AsyncMock()
-        mock_login_response.json.return_value = {
-            "mfa_options": ["PrimaryPhone"],
-            "sms_session_id": "initial_session_id",
-            "user_id": "test_user_id",
-        }
+        mock_login_response = json_response(
+            {
+                "mfa_options": ["PrimaryPhone"],
+                "sms_session_id": "initial_session_id",
+                "user_id": "test_user_id",
+            }
+        )
         # Mock the 2FA verification response
-        mock_2fa_verify_response = AsyncMock()
-        mock_2fa_verify_response.json.return_value = {
-            "access_token": "verified_access_token",
-            "refresh_token": "verified_refresh_token",
-        }
+        mock_2fa_verify_response = json_response(
+            {
+                "access_token": "verified_access_token",
+                "refresh_token": "verified_refresh_token",
+            }
+        )
 
         # Second response for sending the code
-        mock_sms_sent_response = AsyncMock()
-        mock_sms_sent_response.json.return_value = {"session_id": "some_new_session_id"}
+        mock_sms_sent_response = json_response({"session_id": "some_new_session_id"})
 
         # Set up the mock session to return responses for all calls
-        mock_session.return_value.__aenter__.return_value.post.side_effect = [
+        queue_responses(
+            mock_session,
             mock_login_response,  # First post call in get_token_with_username_password
             mock_sms_sent_response,  # Second post call in get_token_with_username_password
             mock_2fa_verify_response,  # Post call in get_token_with_2fa
-        ]
+        )
 
         mock_token_callback = AsyncMock()
         auth_lib = WyzeAuthLib(
@@ -497,6 +577,57 @@ class TestWyzeAuthLib(unittest.IsolatedAsyncioTestCase):
         token = await auth_lib.get_token_with_2fa("123456")
 
         self.assertIsInstance(token, Token)
-        self.assertEqual(token.access_token, auth_lib.SANITIZE_STRING)
-        self.assertEqual(token.refresh_token, auth_lib.SANITIZE_STRING)
+        self.assertEqual(token.access_token, "verified_access_token")
+        self.assertEqual(token.refresh_token, "verified_refresh_token")
         mock_token_callback.assert_called_once_with(token)
+
+
+class TestTokenRefresher(unittest.IsolatedAsyncioTestCase):
+    def make_auth_lib(self, refresh_in, refresh):
+        token = Token("access", "refresh", refresh_time=time.time() + refresh_in)
+        auth_lib = WyzeAuthLib(token=token, token_refresh_margin=0.05)
+
+        async def renew():
+            await refresh()
+            token.access_token = "renewed"
+
+        auth_lib.refresh = AsyncMock(side_effect=renew)
+        return auth_lib
+
+    async def test_refreshes_ahead_of_refresh_time(self):
+        auth_lib = self.make_auth_lib(0.1, AsyncMock())
+        auth_lib.start_token_refresher()
+        try:
+            await asyncio.sleep(0.1)
+            auth_lib.refresh.assert_awaited_once()
+            self.assertEqual(auth_lib.token.access_token, "renewed")
+            # The renewed token is good for another interval
+            self.assertGreater(auth_lib.token.refresh_time, time.time() + 3600)
+        finally:
+            await auth_lib.close()
+        self.assertFalse(auth_lib.token_refresher_running)
+
+    async def test_failed_refresh_is_retried_with_backoff(self):
+        failing = AsyncMock(side_effect=[aiohttp.ClientConnectionError(), None])
+        auth_lib = self.make_auth_lib(-1, failing)
+        with patch("wyzeapy.wyze_auth_lib.TOKEN_REFRESH_BACKOFF_BASE", 0.01):
+            auth_lib.start_token_refresher()
+            try:
+                await asyncio.sleep(0.05)
+            finally:
+                await auth_lib.close()
+
+        self.assertEqual(auth_lib.refresh.await_count, 2)
+        self.assertEqual(auth_lib.token.access_token, "renewed")
+
+    async def test_requests_do_not_wait_while_refresher_runs(self):
+        release = asyncio.Event()
+        auth_lib = self.make_auth_lib(-1, AsyncMock(side_effect=release.wait))
+        auth_lib.start_token_refresher()
+        try:
+            await asyncio.sleep(0)
+            # Past refresh_time but still valid: no request blocks on the refresh
+            await asyncio.wait_for(auth_lib.refresh_if_should(), 0.1)
+            release.set()
+        finally:
+            await auth_lib.close()
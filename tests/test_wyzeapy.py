@@ -179,6 +179,7 @@ async def test_valid_login_success(mock_auth_lib):
         "test@example.com", "password", "key_id", "api_key"
     )
     assert is_valid is True
+    mock_auth_lib.close.assert_awaited_once()
 
 
 @pytest.mark.asyncio
@@ -188,6 +189,17 @@ async def test_valid_login_failure(mock_auth_lib):
         "test@example.com", "password", "key_id", "api_key"
     )
     assert is_valid is False
+    mock_auth_lib.close.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_valid_login_closes_after_failed_login(mock_auth_lib):
+    mock_auth_lib.get_token_with_username_password.side_effect = (
+        TwoFactorAuthenticationEnabled()
+    )
+    with pytest.raises(TwoFactorAuthenticationEnabled):
+        await Wyzeapy.valid_login("test@example.com", "password", "key_id", "api_key")
+    mock_auth_lib.close.assert_awaited_once()
 
 
 @pytest.mark.asyncio
@@ -278,3 +290,17 @@ async def test_switch_usage_service(mock_auth_lib):
     service = await wyze.switch_usage_service
     assert service is not None
     assert wyze._switch_usage_service is service
+
+
+@pytest.mark.asyncio
+async def test_close_releases_auth_lib_session(mock_auth_lib):
+    mock_auth_lib.close = AsyncMock()
+    async with await Wyzeapy.create() as wyze:
+        wyze._auth_lib = mock_auth_lib
+    mock_auth_lib.close.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_close_before_login():
+    wyze = await Wyzeapy.create()
+    await wyze.close()